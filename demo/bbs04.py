@@ -0,0 +1,770 @@
+"""
+BBS04 群签名的核心运算（不做任何输出）
+
+GroupPublicKey 持有群公钥 (P, P2, H, U, V, W)、只依赖公钥的配对常量 e(H,W)、e(H,P2)、e(P,P2)
+及其固定基预计算表，负责挑战值、单个验证与批验证，可以连同配对常量一起保存到文件；
+Opener 持有 opener 私钥 (ξ₁, ξ₂)，负责从签名恢复 A = T₃ - (ξ₁T₁ + ξ₂T₂)。
+两者都可以 pickle，批量追踪时只需向每个工作进程发送一次。
+GroupSignature 把群管理员、成员与验证者的操作组合成完整方案，只返回结果；
+消息按 SHA-256 摘要进入挑战值（message_digest 模块）：字符串签名附带消息，字节缓冲区、文件路径与
+分块迭代器的签名不附带消息（分离式），验证时用 message= / messages= 重新提供，大文件流式哈希；
+save / load 把全部状态（含预计算表与成员登记表）写入或 mmap 加载版本化的密钥库（见 key_store）；
+跟踪信息走 logging（logger 名为 "bbs04"）和 tracing 模块的计时钩子。
+"""
+import hashlib
+import logging
+import os
+import secrets
+import struct
+import tempfile
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from member_registry import Member, MemberRegistry
+from message_digest import MessageSource, digest as message_digest, prehash_many
+from nonces import hedged_drbg
+from opener_index import OpenerIndex
+from pairing_group import FixedBaseTable, GTFixedBaseTable, PairingGroup
+from tracing import Lazy, phase
+
+logger = logging.getLogger("bbs04")
+
+SIGNATURE_FIELDS = ('T1', 'T2', 'T3', 'c', 's_alpha', 's_beta', 's_x', 's_delta1', 's_delta2')
+COMMITMENT_FIELDS = ('R1', 'R2', 'R3', 'R4', 'R5')
+TAG_FIELDS = ('epoch', 'T4', 'R6')  # 可选的撤销标签 T₄ = x_i·H_ε 及其承诺 R₆ = r_x·H_ε
+G1_FIELDS = ('T1', 'T2', 'T3', 'R1', 'R2', 'R4', 'R5', 'T4', 'R6')
+TAG_DOMAIN = b"BBS04 revocation tag|"
+
+# 只依赖群公钥的配对常量：名字 -> (G1 参数, G2 参数)
+GT_CONSTANTS = {'HW': ('H', 'W'), 'HP2': ('H', 'P2'), 'PP2': ('P', 'P2')}
+
+# 公钥文件：魔数、标志位（bit0 表示附带配对常量），随后依次为 P, H, U, V (G1)、P2, W (G2)、GT_CONSTANTS
+KEY_MAGIC = b"BBSGPK01"
+KEY_HEADER = struct.Struct(">8sB")
+KEY_G1 = ('P', 'H', 'U', 'V')
+KEY_G2 = ('P2', 'W')
+
+JOIN_WIDE_TABLE_MIN = 256  # 一次加入不少于这么多成员时，改用宽窗口的 P 表
+JOIN_WINDOW = 8
+
+
+def tag_base_point(group: PairingGroup, epoch: str):
+    """撤销标签的基点 H_ε：同一 epoch 内同一成员的标签相同，验证方据此查本地撤销列表"""
+    return group.hash_to_g1(TAG_DOMAIN + epoch.encode('utf-8'))
+
+
+class GroupPublicKey:
+    """
+    群公钥及其预计算：G1 生成元的固定基窗口表、G2 固定参数的 Miller 循环直线、
+    配对常量 e(H,W)、e(H,P2)、e(P,P2)（创建或加载公钥时只算一次）及其 GT 固定基窗口表
+    """
+
+    def __init__(self, group: PairingGroup, P, P2, H, U, V, W, precompute: bool = True, window: int = 4,
+                 gt_constants: Optional[dict] = None, precomputed: Optional[dict] = None):
+        """precomputed 为现成的 {'tables', 'prepared', 'gt_tables'}（密钥库加载时给出），此时不再构造预计算表"""
+        self.group = group
+        self.points = {'P': P, 'P2': P2, 'H': H, 'U': U, 'V': V, 'W': W}
+        self.precompute = precompute
+        self.window = window
+        self.tables = {}
+        self.tag_bases = {}  # epoch -> (H_ε, 固定基表)
+        self.prepared = {}
+        self.gt_tables = {}
+        if precomputed is not None:
+            self.tables = dict(precomputed['tables'])
+            self.prepared = dict(precomputed['prepared'])
+            self.gt_tables = dict(precomputed['gt_tables'])
+        elif precompute:
+            for name in ('P', 'H', 'U', 'V'):
+                self.tables[name] = FixedBaseTable(group, self.points[name], window)
+            for name in ('P2', 'W'):
+                self.prepared[name] = group.prepare_g2(self.points[name])
+        if gt_constants is None:
+            gt_constants = {name: group.pairing(self.points[g1], self.g2(g2))
+                            for name, (g1, g2) in GT_CONSTANTS.items()}
+        self.gt_constants = dict(gt_constants)
+        if precompute and precomputed is None:
+            for name, value in self.gt_constants.items():
+                self.gt_tables[name] = GTFixedBaseTable(group, value, window)
+        # 公钥指纹：撤销成员后公钥整体更换，用它识别按旧公钥预计算的签名承诺
+        self.fingerprint = hashlib.sha256(self.to_bytes(include_constants=False)).digest()[:16]
+
+    def mul(self, name: str, k: int):
+        """公开生成元的标量乘，有预计算表时查表"""
+        table = self.tables.get(name)
+        if table is not None:
+            return table.mul(k)
+        return self.group.g1_mul(self.points[name], k)
+
+    def combine(self, fixed: Sequence[Tuple[str, int]], points: Sequence = (), scalars: Sequence[int] = ()):
+        """
+        Σ k·生成元 + Σ k_i·P_i，整体只做一次多标量乘
+        有预计算表的生成元先查表，结果以系数 1 并入；其余生成元与签名中的点一起参与 Straus/Pippenger
+        """
+        points, scalars = list(points), list(scalars)
+        for name, k in fixed:
+            table = self.tables.get(name)
+            if table is not None:
+                points.append(table.mul(k))
+                scalars.append(1)
+            else:
+                points.append(self.points[name])
+                scalars.append(k)
+        return self.group.g1_multi_mul(points, scalars)
+
+    def g2(self, name: str):
+        """配对中使用的 G2 固定参数"""
+        return self.prepared.get(name, self.points[name])
+
+    def gt_pow(self, name: str, k: int):
+        """配对常量的幂，有预计算表时查表"""
+        table = self.gt_tables.get(name)
+        if table is not None:
+            return table.pow(k)
+        return self.group.gt_pow(self.gt_constants[name], k)
+
+    def tag_base(self, epoch: str):
+        """撤销标签的基点 H_ε 及其固定基表（无预计算时为 None），按 epoch 缓存"""
+        entry = self.tag_bases.get(epoch)
+        if entry is None:
+            point = tag_base_point(self.group, epoch)
+            table = FixedBaseTable(self.group, point, self.window) if self.precompute else None
+            entry = self.tag_bases[epoch] = (point, table)
+        return entry
+
+    def tag_mul(self, epoch: str, k: int):
+        point, table = self.tag_base(epoch)
+        return table.mul(k) if table is not None else self.group.g1_mul(point, k)
+
+    # ---- 序列化 ----
+    def to_bytes(self, include_constants: bool = True) -> bytes:
+        grp = self.group
+        parts = [KEY_HEADER.pack(KEY_MAGIC, 1 if include_constants else 0)]
+        parts.extend(grp.g1_to_bytes(self.points[name]) for name in KEY_G1)
+        parts.extend(grp.g2_to_bytes(self.points[name]) for name in KEY_G2)
+        if include_constants:
+            parts.extend(grp.gt_to_bytes(self.gt_constants[name]) for name in GT_CONSTANTS)
+        return b"".join(parts)
+
+    @staticmethod
+    def decode(group: PairingGroup, data: bytes) -> Tuple[dict, Optional[dict]]:
+        """解析 to_bytes 的结果，返回 (点, 配对常量)；未附带配对常量时后者为 None"""
+        n = group.field_bytes
+        g1_size, g2_size, gt_size = n, 4 * n, 12 * n
+        if len(data) < KEY_HEADER.size:
+            raise ValueError("公钥文件过短")
+        magic, flags = KEY_HEADER.unpack_from(data)
+        if magic != KEY_MAGIC:
+            raise ValueError("不是 BBS04 公钥文件")
+        has_constants = bool(flags & 1)
+        expected = (KEY_HEADER.size + len(KEY_G1) * g1_size + len(KEY_G2) * g2_size
+                    + (len(GT_CONSTANTS) * gt_size if has_constants else 0))
+        if len(data) != expected:
+            raise ValueError(f"公钥文件长度应为 {expected} 字节，实际 {len(data)}")
+
+        offset = KEY_HEADER.size
+        points = {}
+        for name in KEY_G1:
+            points[name] = group.g1_from_bytes(data[offset:offset + g1_size])
+            offset += g1_size
+        for name in KEY_G2:
+            points[name] = group.g2_from_bytes(data[offset:offset + g2_size])
+            offset += g2_size
+        constants = None
+        if has_constants:
+            constants = {}
+            for name in GT_CONSTANTS:
+                constants[name] = group.gt_from_bytes(data[offset:offset + gt_size])
+                offset += gt_size
+        return points, constants
+
+    @classmethod
+    def from_bytes(cls, group: PairingGroup, data: bytes, precompute: bool = True, window: int = 4,
+                   check: bool = False) -> "GroupPublicKey":
+        """
+        从 to_bytes 的结果恢复公钥；文件附带配对常量时直接使用，不再计算配对
+        check=True 时重新计算配对常量并与文件比对（用于不可信来源的公钥文件）
+        """
+        points, constants = cls.decode(group, data)
+        key = cls(group, points['P'], points['P2'], points['H'], points['U'], points['V'], points['W'],
+                  precompute=precompute, window=window, gt_constants=None if check else constants)
+        if check and constants is not None and constants != key.gt_constants:
+            raise ValueError("公钥文件中的配对常量与公钥不符")
+        return key
+
+    def save(self, path: str):
+        """原子地写入公钥文件（附带配对常量）"""
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, group: PairingGroup, precompute: bool = True, window: int = 4,
+             check: bool = False) -> "GroupPublicKey":
+        with open(path, "rb") as fh:
+            return cls.from_bytes(group, fh.read(), precompute, window, check)
+
+    def encode_commitment(self, T1, T2, T3, R1, R2, R3, R4, R5, tag: Optional[tuple] = None) -> Tuple[bytes, ...]:
+        """挑战值哈希中消息之后的部分，签名时可以离线算好；tag = (epoch, T₄, R₆) 时一并编码"""
+        grp = self.group
+        encoded = (*(grp.g1_to_bytes(T) for T in (T1, T2, T3, R1, R2)), grp.gt_to_bytes(R3),
+                   grp.g1_to_bytes(R4), grp.g1_to_bytes(R5))
+        if tag is not None:
+            epoch, T4, R6 = tag
+            encoded += (epoch.encode('utf-8'), grp.g1_to_bytes(T4), grp.g1_to_bytes(R6))
+        return encoded
+
+    def challenge(self, message: MessageSource, T1, T2, T3, R1, R2, R3, R4, R5, tag: Optional[tuple] = None) -> int:
+        """c = H(SHA-256(M), T₁, T₂, T₃, R₁, R₂, R₃, R₄, R₅[, ε, T₄, R₆]) ∈ Z_p"""
+        return self.group.hash_to_zr(message_digest(message),
+                                     *self.encode_commitment(T1, T2, T3, R1, R2, R3, R4, R5, tag))
+
+    def commit(self, member_id, A_i, x_i: int, e_A, epoch: Optional[str] = None) -> "SignatureCommitment":
+        """
+        签名的离线阶段（只用到公钥和成员私钥，不依赖消息）
+        e_A = e(A_i, P2) 由调用方缓存，这样 R₃ 不需要新的配对；给出 epoch 时附带撤销标签
+        随机数来自以 x_i 与系统随机数为种子的 HMAC-DRBG（hedged）：此时还没有消息，
+        且同一成员对同一消息的两次签名必须不可链接，所以不做完全确定的派生
+        """
+        grp = self.group
+        p = grp.r
+        with phase(logger, "bbs04.sign.commit"):
+            # 选择随机数：α, β 与五个承诺随机数，一次取完
+            alpha, beta, r_alpha, r_beta, r_x, r_delta1, r_delta2 = (
+                value + 1 for value in hedged_drbg(x_i, p, self.fingerprint).many_below(p - 1, 7))
+            delta1 = x_i * alpha % p
+            delta2 = x_i * beta % p
+
+            # 计算签名元素
+            T1 = self.mul('U', alpha)
+            T2 = self.mul('V', beta)
+            T3 = grp.g1_add(A_i, self.mul('H', alpha + beta))
+
+            # 零知识证明的承诺值
+            R1 = self.mul('U', r_alpha)
+            R2 = self.mul('V', r_beta)
+            # R₃ = e(T₃,P2)^{r_x}·e(H,W)^{-r_α-r_β}·e(H,P2)^{-r_δ₁-r_δ₂}，代入 T₃ = A_i + (α+β)H 得
+            # e(A_i,P2)^{r_x}·e(H,P2)^{(α+β)r_x-r_δ₁-r_δ₂}·e(H,W)^{-r_α-r_β}：不再需要新的配对
+            R3 = grp.gt_mul(grp.gt_mul(
+                grp.gt_pow(e_A, r_x),
+                self.gt_pow('HP2', (alpha + beta) * r_x - r_delta1 - r_delta2)),
+                self.gt_pow('HW', -r_alpha - r_beta))
+            R4 = self.combine([('U', -r_delta1)], [T1], [r_x])
+            R5 = self.combine([('V', -r_delta2)], [T2], [r_x])
+            values = {'T1': T1, 'T2': T2, 'T3': T3, 'R1': R1, 'R2': R2, 'R3': R3, 'R4': R4, 'R5': R5}
+            tag = None
+            if epoch is not None:
+                # 撤销标签与 s_x 共用 r_x：s_x·H_ε - c·T₄ = R₆ 证明 T₄ 用的正是签名私钥 x_i
+                tag = (epoch, self.tag_mul(epoch, x_i), self.tag_mul(epoch, r_x))
+                values.update(zip(TAG_FIELDS, tag))
+            encoded = self.encode_commitment(T1, T2, T3, R1, R2, R3, R4, R5, tag)
+        return SignatureCommitment(member_id, self.fingerprint, (alpha, beta, x_i, delta1, delta2),
+                                   (r_alpha, r_beta, r_x, r_delta1, r_delta2), values, encoded)
+
+    def respond(self, commitment: "SignatureCommitment", message: MessageSource) -> dict:
+        """
+        签名的在线阶段：一次哈希和五次乘加 s = r + c·w；承诺用后即作废
+        只有字符串消息随签名附带（'message' 字段），其余类型的签名是分离式的
+        """
+        if commitment.key != self.fingerprint:
+            raise ValueError("预计算承诺属于已更换的群公钥")
+        witness, nonces = commitment.consume()
+        p = self.group.r
+        with phase(logger, "bbs04.sign.challenge"):
+            c = self.group.hash_to_zr(message_digest(message), *commitment.encoded)
+        s_alpha, s_beta, s_x, s_delta1, s_delta2 = ((r + c * w) % p for r, w in zip(nonces, witness))
+        values = commitment.values
+        signature = {
+            'T1': values['T1'],
+            'T2': values['T2'],
+            'T3': values['T3'],
+            'c': c,
+            's_alpha': s_alpha,
+            's_beta': s_beta,
+            's_x': s_x,
+            's_delta1': s_delta1,
+            's_delta2': s_delta2,
+            'R1': values['R1'],  # 承诺值随签名发布，供批验证使用（见 README 的批验证方案）
+            'R2': values['R2'],
+            'R3': values['R3'],
+            'R4': values['R4'],
+            'R5': values['R5'],
+        }
+        if isinstance(message, str):
+            signature['message'] = message
+        for field in TAG_FIELDS:
+            if field in values:
+                signature[field] = values[field]
+        return signature
+
+    def format_error(self, signature, fields: Sequence[str] = SIGNATURE_FIELDS,
+                     message: Optional[MessageSource] = None) -> Optional[str]:
+        """签名格式检查，返回错误原因；格式正确时返回 None。没有另外给出 message 时签名须附带消息"""
+        fields = tuple(fields) + (('message',) if message is None else ())
+        if any(field in signature for field in TAG_FIELDS):
+            fields += TAG_FIELDS
+        for field in fields:
+            if field not in signature:
+                return f"缺少字段 {field}"
+        grp = self.group
+        if not all(grp.g1_is_on_curve(signature[k]) for k in fields if k in G1_FIELDS):
+            return "签名元素不在曲线上"
+        return None
+
+    @staticmethod
+    def signature_tag(signature) -> Optional[tuple]:
+        """签名携带的撤销标签 (epoch, T₄, R₆)，没有时为 None"""
+        if 'T4' not in signature:
+            return None
+        return tuple(signature[field] for field in TAG_FIELDS)
+
+    def proof_holds(self, signature, message: Optional[MessageSource] = None) -> bool:
+        """重算 R̄₁..R̄₅ 并检查 c = H(M, T₁, T₂, T₃, R̄₁, ..., R̄₅)；message 缺省时用签名附带的消息"""
+        grp = self.group
+        T1, T2, T3 = signature['T1'], signature['T2'], signature['T3']
+        c = signature['c']
+        s_alpha, s_beta, s_x = signature['s_alpha'], signature['s_beta'], signature['s_x']
+        s_delta1, s_delta2 = signature['s_delta1'], signature['s_delta2']
+
+        # 每个 R̄ 都是两三项的线性组合，各用一次多标量乘
+        R1 = self.combine([('U', s_alpha)], [T1], [-c])
+        R2 = self.combine([('V', s_beta)], [T2], [-c])
+        R4 = self.combine([('U', -s_delta1)], [T1], [s_x])
+        R5 = self.combine([('V', -s_delta2)], [T2], [s_x])
+        # R̄₃ 按 README 的化简只需两次配对：
+        # e(s_x*T₃ - (s_δ₁+s_δ₂)*H - c*P, P2) · e(c*T₃ - (s_α+s_β)*H, W)
+        left = self.combine([('H', -(s_delta1 + s_delta2)), ('P', -c)], [T3], [s_x])
+        right = self.combine([('H', -(s_alpha + s_beta))], [T3], [c])
+        R3 = grp.multi_pairing([(left, self.g2('P2')), (right, self.g2('W'))])
+
+        tag = self.signature_tag(signature)
+        if tag is not None:
+            # R̄₆ = s_x·H_ε - c·T₄
+            epoch, T4, _ = tag
+            tag = (epoch, T4, grp.g1_multi_mul([self.tag_mul(epoch, s_x), T4], [1, -c]))
+        if message is None:
+            message = signature['message']
+        return self.challenge(message, T1, T2, T3, R1, R2, R3, R4, R5, tag) == c
+
+    def verify(self, signature, message: Optional[MessageSource] = None) -> bool:
+        return self.format_error(signature, message=message) is None and self.proof_holds(signature, message)
+
+    def verify_batch(self, signatures, security_bits: int = 64,
+                     messages: Optional[Sequence[MessageSource]] = None) -> List[int]:
+        """
+        批量验证（README "A proposal of batch verification"），返回无效签名的下标
+        先逐个检查 c = H(M, T, R)，再用随机小指数 ρ 把所有 R₁、R₂、R₄、R₅ 等式合并成一次多标量乘，
+        把所有 R₃ 等式合并成与批大小无关的两次配对；批验证失败时二分定位无效签名。
+        messages 与 signatures 一一对应（分离式签名），其摘要先在线程池中并行计算
+        不带承诺值 R₁..R₅ 的签名（紧凑编码、signature_codec 解码的签名）无法合并，逐个用 verify 检查；
+        R₃ 须在 r 阶子群中，否则随机指数 ρ 可以与它的小阶分量相消，合并前逐个检查
+        """
+        if messages is None:
+            messages = [None] * len(signatures)
+        elif len(messages) != len(signatures):
+            raise ValueError(f"签名数 {len(signatures)} 与消息数 {len(messages)} 不一致")
+        else:
+            messages = prehash_many(messages)
+        bad = []
+        pending = []
+        for index, (sig, message) in enumerate(zip(signatures, messages)):
+            if not all(field in sig for field in COMMITMENT_FIELDS):
+                if not self.verify(sig, message):
+                    bad.append(index)
+                continue
+            if (self.format_error(sig, SIGNATURE_FIELDS + COMMITMENT_FIELDS, message) is not None
+                    or self.challenge(sig['message'] if message is None else message, sig['T1'], sig['T2'], sig['T3'], sig['R1'], sig['R2'],
+                                      sig['R3'], sig['R4'], sig['R5'], self.signature_tag(sig)) != sig['c']
+                    or not self.group.gt_in_subgroup(sig['R3'])):
+                bad.append(index)
+            else:
+                pending.append(index)
+
+        # 二分定位：整批通过则全部有效，否则拆成两半分别检查
+        stack = [pending] if pending else []
+        while stack:
+            chunk = stack.pop()
+            if self._batch_equations_hold([signatures[i] for i in chunk], security_bits):
+                continue
+            if len(chunk) == 1:
+                bad.extend(chunk)
+            else:
+                mid = len(chunk) // 2
+                stack.append(chunk[mid:])
+                stack.append(chunk[:mid])
+        bad.sort()
+        return bad
+
+    def _batch_equations_hold(self, signatures, security_bits):
+        """用随机小指数检查一批签名的 R₁..R₆ 等式（配对次数与批大小无关）；R₃ 须已确认在 r 阶子群中"""
+        grp = self.group
+        p = grp.r
+        points, scalars = [], []
+        coef_tag = {}  # epoch -> H_ε 的系数
+        coef_U = coef_V = coef_H_left = coef_H_right = coef_P = 0
+        r3_values, r3_exps = [], []
+        left_points, left_scalars, right_scalars = [], [], []
+        for sig in signatures:
+            rho1, rho2, rho4, rho5, rho3 = (secrets.randbits(security_bits) | 1 for _ in range(5))
+            c, s_x = sig['c'], sig['s_x']
+            # ρ₁(s_α U - c T₁ - R₁) + ρ₂(s_β V - c T₂ - R₂) + ρ₄(s_x T₁ - s_δ₁ U - R₄) + ρ₅(s_x T₂ - s_δ₂ V - R₅) = O
+            coef_U += rho1 * sig['s_alpha'] - rho4 * sig['s_delta1']
+            coef_V += rho2 * sig['s_beta'] - rho5 * sig['s_delta2']
+            points.extend((sig['T1'], sig['T2'], sig['R1'], sig['R2'], sig['R4'], sig['R5']))
+            scalars.extend((rho4 * s_x - rho1 * c, rho5 * s_x - rho2 * c, -rho1, -rho2, -rho4, -rho5))
+            # Π R₃^ρ = e(Σρ(s_x T₃ - (s_δ₁+s_δ₂)H - cP), P2) · e(Σρ(c T₃ - (s_α+s_β)H), W)
+            left_points.append(sig['T3'])
+            left_scalars.append(rho3 * s_x)
+            right_scalars.append(rho3 * c)
+            coef_H_left += rho3 * (sig['s_delta1'] + sig['s_delta2'])
+            coef_H_right += rho3 * (sig['s_alpha'] + sig['s_beta'])
+            coef_P += rho3 * c
+            r3_values.append(sig['R3'])
+            r3_exps.append(rho3)
+            if 'T4' in sig:
+                # ρ₆(s_x H_ε - c T₄ - R₆) = O
+                rho6 = secrets.randbits(security_bits) | 1
+                coef_tag[sig['epoch']] = coef_tag.get(sig['epoch'], 0) + rho6 * s_x
+                points.extend((sig['T4'], sig['R6']))
+                scalars.extend((-rho6 * c, -rho6))
+
+        for epoch, coef in coef_tag.items():
+            points.append(self.tag_mul(epoch, coef))
+            scalars.append(1)
+        combined = self.combine([('U', coef_U % p), ('V', coef_V % p)], points, scalars)
+        if combined is not None:
+            return False
+
+        left = self.combine([('H', -coef_H_left % p), ('P', -coef_P % p)], left_points, left_scalars)
+        right = self.combine([('H', -coef_H_right % p)], left_points, right_scalars)
+        paired = grp.multi_pairing([(left, self.g2('P2')), (right, self.g2('W'))])
+        return paired == grp.gt_multi_pow(r3_values, r3_exps)
+
+
+class Opener:
+    """opener：持有私钥 (ξ₁, ξ₂)，从签名恢复成员的 A_i"""
+
+    def __init__(self, public_key: GroupPublicKey, xi1: int, xi2: int):
+        self.public_key = public_key
+        self.xi1 = xi1
+        self.xi2 = xi2
+
+    def recover(self, signature):
+        """A = T₃ - (ξ₁T₁ + ξ₂T₂)"""
+        grp = self.public_key.group
+        return grp.g1_sub(signature['T3'], grp.g1_multi_mul((signature['T1'], signature['T2']),
+                                                            (self.xi1, self.xi2)))
+
+    def open(self, signature) -> Tuple[bool, Optional[bytes]]:
+        """验证并打开签名，返回 (是否有效, A 的规范编码)"""
+        if not self.public_key.verify(signature):
+            return False, None
+        return True, self.public_key.group.g1_to_bytes(self.recover(signature))
+
+
+class SignatureCommitment:
+    """
+    签名中与消息无关的部分：秘密 (α, β, x_i, δ₁, δ₂)、随机数 r_*、T₁..T₃、R₁..R₅ 及其哈希编码
+    只能使用一次——同一组 r_* 配上两个不同的挑战值 c、c'，即可解出 x_i = (s_x - s_x')/(c - c')
+    """
+
+    __slots__ = ('member_id', 'key', 'witness', 'nonces', 'values', 'encoded')
+
+    def __init__(self, member_id, key: bytes, witness: Tuple[int, ...], nonces: Tuple[int, ...], values: dict,
+                 encoded: Tuple[bytes, ...]):
+        self.member_id = member_id
+        self.key = key  # 生成时所用群公钥的指纹
+        self.witness = witness
+        self.nonces = nonces
+        self.values = values
+        self.encoded = encoded
+
+    def consume(self) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """取出秘密与随机数并清空引用；重复使用抛出 ValueError"""
+        witness, nonces = self.witness, self.nonces
+        if witness is None:
+            raise ValueError(f"成员 {self.member_id} 的预计算承诺已被使用")
+        self.witness = self.nonces = None
+        return witness, nonces
+
+
+class GroupSignature:
+    """Boneh短群签名方案（BBS04）：群管理员、成员签名、验证与打开"""
+
+    def __init__(self, backend: str = "auto", precompute: bool = True, window: int = 4):
+        with phase(logger, "bbs04.setup"):
+            # 系统参数：f.properties 中的 Type F 配对群
+            self.group = PairingGroup(backend=backend)
+            grp = self.group
+            p = grp.r
+
+            # 生成元（P ∈ G1，P2 ∈ G2）
+            P, P2 = grp.g1, grp.g2
+            H = grp.g1_mul(P, secrets.randbelow(p - 1) + 1)
+
+            # 群管理员密钥
+            xi1 = secrets.randbelow(p - 1) + 1
+            xi2 = secrets.randbelow(p - 1) + 1
+            gamma = secrets.randbelow(p - 1) + 1
+
+            # 计算群公钥：ξ₁*U = ξ₂*V = H，W = γ*P2
+            U = grp.g1_mul(H, grp.zr_inv(xi1))
+            V = grp.g1_mul(H, grp.zr_inv(xi2))
+            W = grp.g2_mul(P2, gamma)
+
+            # 群公钥附带固定基预计算：G1 生成元的窗口表，G2 固定参数的 Miller 循环直线
+            public_key = GroupPublicKey(grp, P, P2, H, U, V, W, precompute=precompute, window=window)
+            self._install(public_key, xi1, xi2, gamma)
+        logger.debug("系统初始化完成 backend=%s precompute=%s", grp.backend, precompute)
+
+    def _install(self, public_key: GroupPublicKey, xi1: int, xi2: int, gamma: int,
+                 members: Optional[MemberRegistry] = None, revoked_x: Iterable[int] = (),
+                 join_table: Optional[FixedBaseTable] = None):
+        """由群公钥与管理员私钥设置其余状态（现场生成与从密钥库加载共用）"""
+        self.group = public_key.group
+        self.p = self.group.r
+        self.P, self.P2, self.H, self.U, self.V, self.W = (public_key.points[name]
+                                                           for name in ('P', 'P2', 'H', 'U', 'V', 'W'))
+        self.xi1, self.xi2, self.gamma = xi1, xi2, gamma
+        self.public_key = public_key
+        self.opener = Opener(public_key, xi1, xi2)
+        self.gpk = public_key.points
+        self.gmsk = {'xi1': xi1, 'xi2': xi2}
+        self.precompute = public_key.precompute
+
+        # 成员信息：列式登记表（含 opener 索引），e(A_i, P2) 只为签过名的成员缓存
+        self.members = members if members is not None else MemberRegistry(self.group)
+        self.member_pairings = {}  # 槽位号 -> e(A_i, P2)
+        self._join_table = join_table  # 批量加入时使用的宽窗口 P 表
+        self.revoked_x = set(revoked_x)  # 已撤销成员的 x_i，不再分配
+
+    @classmethod
+    def from_keys(cls, public_key: GroupPublicKey, xi1: int, xi2: int, gamma: int,
+                  members: Optional[MemberRegistry] = None, revoked_x: Iterable[int] = (),
+                  join_table: Optional[FixedBaseTable] = None) -> "GroupSignature":
+        """由现成的群公钥、管理员私钥与成员登记表构造，不生成任何参数（见 key_store）"""
+        gs = cls.__new__(cls)
+        gs._install(public_key, xi1, xi2, gamma, members, revoked_x, join_table)
+        return gs
+
+    def save(self, directory: str, join_table: bool = False):
+        """
+        把公钥与预计算表、opener 私钥、issuer 私钥、成员登记表分文件写入密钥库目录
+        批量加入用的宽窗口表只在已经建立或 join_table=True 时写出（见 key_store.save_group）
+        """
+        import key_store  # key_store 依赖本模块，延迟导入避免循环
+
+        key_store.save_group(self, directory, join_table)
+
+    @classmethod
+    def load(cls, directory: str, backend: str = "auto", verify: bool = True) -> "GroupSignature":
+        """从密钥库目录加载：mmap 后直接使用，不重新生成密钥或预计算表"""
+        import key_store
+
+        return key_store.load_group(directory, backend, verify)
+
+    def _encode(self, point) -> str:
+        return self.group.g1_to_bytes(point).hex()
+
+    @property
+    def opener_index(self) -> OpenerIndex:
+        return self.members.index
+
+    def member_join(self, member_id) -> Tuple[tuple, int]:
+        """成员加入，返回成员私钥 (A_i, x_i)"""
+        return self.join_many([member_id])[0]
+
+    def join_many(self, member_ids: Sequence) -> List[Tuple[tuple, int]]:
+        """
+        批量加入成员，按顺序返回各自的私钥 (A_i, x_i)
+        x_i 一次抽够并用集合去重（同时排除 γ+x_i = 0），(γ+x_i) 批量求逆，A_i 走固定基表并一起转仿射
+        """
+        ids = list(member_ids)
+        if len(set(ids)) != len(ids) or any(member_id in self.members for member_id in ids):
+            raise ValueError("成员 ID 重复或已存在")
+        if not ids:
+            return []
+        p = self.p
+        with phase(logger, "bbs04.join"):
+            keys: List[Tuple[tuple, int]] = []
+            drawn = set()
+            while len(keys) < len(ids):
+                need = len(ids) - len(keys)
+                xs = []
+                while len(xs) < need:
+                    x_i = secrets.randbelow(p - 1) + 1
+                    if x_i not in drawn and x_i not in self.revoked_x and (self.gamma + x_i) % p != 0:
+                        drawn.add(x_i)
+                        xs.append(x_i)
+                # A_i 与 x_i 一一对应：已登记成员的 x_i 不在 drawn 里，靠 opener 索引排除（概率可忽略）
+                keys.extend((A_i, x_i) for A_i, x_i in zip(self._issue(xs), xs)
+                            if self.members.find(self.group.g1_to_bytes(A_i)) is None)
+            self.members.add_many([(member_id, A_i, x_i) for member_id, (A_i, x_i) in zip(ids, keys)])
+        logger.debug("成员加入 n=%d first=%s A_i=%s", len(ids), ids[0], Lazy(self._encode, keys[0][0]))
+        return keys
+
+    def _issue(self, xs: Sequence[int]) -> list:
+        """计算A_i = 1/(γ+x_i) * P：(γ+x_i) 批量求逆，整批走固定基表并一起转仿射"""
+        grp = self.group
+        inverses = grp.zr_batch_inv([(self.gamma + x_i) % self.p for x_i in xs])
+        table = self.public_key.tables.get('P')
+        if self.precompute and len(xs) >= JOIN_WIDE_TABLE_MIN:
+            table = self._wide_join_table()
+        if table is None:
+            return [grp.g1_mul(self.P, k) for k in inverses]
+        return table.mul_many(inverses)
+
+    def revoke(self, member_ids: Sequence) -> "RevocationToken":
+        """
+        撤销一批成员：公布撤销令牌并换用新公钥 P' = P/Π(γ+x_j)、P2' = P2/Π(γ+x_j)、W' = γ·P2'
+        整批只更新一次公钥；剩余成员可用令牌在本地更新 A_i（见 revocation 模块），
+        这里直接用 γ 重新签发登记表中的 A_i。旧签名只能用旧公钥验证，签名池须调用 reset。
+        """
+        from revocation import RevocationToken  # revocation 依赖本模块，延迟导入避免循环
+
+        ids = list(member_ids)
+        if len(set(ids)) != len(ids) or any(member_id not in self.members for member_id in ids):
+            raise ValueError("待撤销的成员重复或不存在")
+        if not ids:
+            raise ValueError("没有要撤销的成员")
+        grp = self.group
+        p = self.p
+        with phase(logger, "bbs04.revoke"):
+            revoked = [self.members[member_id] for member_id in ids]
+            token = RevocationToken(grp, [member.x_i for member in revoked], [member.A_i for member in revoked])
+
+            product = 1
+            for member in revoked:
+                product = product * (self.gamma + member.x_i) % p
+            scale = grp.zr_inv(product)
+            self.P = self.public_key.mul('P', scale)
+            self.P2 = grp.g2_mul(self.P2, scale)
+            self.W = grp.g2_mul(self.P2, self.gamma)
+            self.public_key = GroupPublicKey(grp, self.P, self.P2, self.H, self.U, self.V, self.W,
+                                             precompute=self.precompute, window=self.public_key.window)
+            self.opener = Opener(self.public_key, self.xi1, self.xi2)
+            self.gpk = self.public_key.points
+            self.revoked_x.update(token.xs)
+            self._join_table = None
+
+            # 剩余成员按原顺序重新登记（槽位号与 opener 索引随之重建）
+            revoked_ids = set(ids)
+            remaining = [self.members.record(slot) for slot in range(len(self.members))
+                         if self.members.member_id(slot) not in revoked_ids]
+            registry = MemberRegistry(grp)
+            registry.add_many([(member.member_id, A_i, member.x_i)
+                               for member, A_i in zip(remaining, self._issue([m.x_i for m in remaining]))])
+            self.members = registry
+            self.member_pairings = {}
+        logger.debug("撤销成员 n=%d 剩余=%d", len(ids), len(registry))
+        return token
+
+    def _wide_join_table(self) -> FixedBaseTable:
+        if self._join_table is None:
+            self._join_table = FixedBaseTable(self.group, self.P, JOIN_WINDOW)
+        return self._join_table
+
+    def _member_pairing(self, member: Member):
+        """成员私钥对应的 e(A_i, P2)，首次签名时计算并按槽位缓存"""
+        value = self.member_pairings.get(member.slot)
+        if value is None:
+            value = self.member_pairings[member.slot] = self.group.pairing(member.A_i, self.public_key.g2('P2'))
+        return value
+
+    def memory_per_member(self) -> float:
+        """登记表（坐标、私钥、ID、opener 索引）平均每个成员占用的字节数"""
+        return self.members.memory_usage()['per_member']
+
+    def commit(self, member_id, epoch: Optional[str] = None) -> "SignatureCommitment":
+        """签名的离线阶段：与消息无关的随机数、T₁..T₃ 和承诺值 R₁..R₅（给出 epoch 时还有撤销标签）"""
+        if member_id not in self.members:
+            raise ValueError(f"成员 {member_id} 不存在")
+        member = self.members[member_id]
+        return self.public_key.commit(member_id, member.A_i, member.x_i, self._member_pairing(member), epoch)
+
+    def sign(self, member_id, message: MessageSource, commitment: Optional["SignatureCommitment"] = None,
+             epoch: Optional[str] = None) -> dict:
+        """
+        生成签名 σ = (T₁, T₂, T₃, c, s_α, s_β, s_x, s_δ₁, s_δ₂)，附带承诺值 R₁..R₅ 供批验证
+        commitment 为 commit 预先生成的离线部分（见 signing_pool），缺省时现场生成
+        epoch 非空时附带撤销标签 T₄ = x_i·H_ε，供验证方查本地撤销列表（同一 epoch 内的签名因此可链接）
+        message 不是字符串时（字节、文件路径、分块迭代器）签名不附带消息，验证时须另外提供
+        """
+        with phase(logger, "bbs04.sign"):
+            if commitment is None:
+                commitment = self.commit(member_id, epoch)
+            elif commitment.member_id != member_id:
+                raise ValueError(f"预计算承诺属于成员 {commitment.member_id}，不能用于 {member_id}")
+            signature = self.public_key.respond(commitment, message)
+        logger.debug("签名完成 c=%s T1=%s T2=%s T3=%s", signature['c'], Lazy(self._encode, signature['T1']),
+                     Lazy(self._encode, signature['T2']), Lazy(self._encode, signature['T3']))
+        return signature
+
+    def verify(self, signature, message: Optional[MessageSource] = None) -> bool:
+        """验证签名；分离式签名由 message 给出消息"""
+        with phase(logger, "bbs04.verify"):
+            error = self.public_key.format_error(signature, message=message)
+            valid = error is None and self.public_key.proof_holds(signature, message)
+        logger.debug("验证签名 valid=%s reason=%s", valid, error)
+        return valid
+
+    def verify_batch(self, signatures, security_bits: int = 64,
+                     messages: Optional[Sequence[MessageSource]] = None) -> Tuple[bool, List[int]]:
+        """
+        批量验证（README "A proposal of batch verification"）
+        合并后的配对次数与批大小无关，批验证失败时二分定位无效签名；分离式签名由 messages 给出消息
+        返回 (是否全部有效, 无效签名下标列表)
+        """
+        with phase(logger, "bbs04.verify_batch"):
+            bad = self.public_key.verify_batch(signatures, security_bits, messages)
+        logger.debug("批量验证 n=%d bad=%s", len(signatures), bad)
+        return not bad, bad
+
+    def open_signature(self, signature, message: Optional[MessageSource] = None) -> Optional[str]:
+        """验证并打开签名，返回签名成员；签名无效或找不到成员时返回 None"""
+        if not self.verify(signature, message):
+            return None
+        with phase(logger, "bbs04.open"):
+            A = self.opener.recover(signature)
+            member_id = self.resolve_member(A)
+        logger.debug("打开签名 A=%s member=%s", Lazy(self._encode, A), member_id)
+        return member_id
+
+    def resolve_member(self, A) -> Optional[str]:
+        """由打开得到的A查找成员，常数时间"""
+        return self.members.find(self.group.g1_to_bytes(A))
+
+    def _member_for(self, encoding, slots):
+        """用完整的A_i编码确认索引给出的候选槽位"""
+        for slot in slots:
+            if self.members.encoding(slot) == encoding:
+                return self.members.member_id(slot)
+        return None
+
+    def open_many(self, signatures: Iterable, workers: Optional[int] = None, chunk_size: int = 16,
+                  max_pending: Optional[int] = None) -> Iterator[Tuple[bool, Optional[str]]]:
+        """
+        批量追踪：在进程池中验证并打开签名，按输入顺序流式产出 (是否有效, 成员ID)
+        opener私钥与预计算表每个工作进程只接收一次，opener索引通过文件 mmap 共享
+        """
+        import bulk_open  # bulk_open 依赖本模块，延迟导入避免循环
+
+        with tempfile.TemporaryDirectory() as workdir:
+            index_path = os.path.join(workdir, "opener.idx")
+            self.opener_index.save(index_path)
+            for valid, encoding, slots in bulk_open.open_many(self.opener, index_path, signatures, workers,
+                                                              chunk_size, max_pending):
+                yield valid, self._member_for(encoding, slots) if valid else None
+
+    def save_public_key(self, path: str):
+        """把群公钥连同配对常量写入磁盘，验证方用 GroupPublicKey.load 加载"""
+        self.public_key.save(path)
+
+    def save_opener_index(self, path: str):
+        """把opener索引写入磁盘"""
+        self.opener_index.save(path)
+
+    def load_opener_index(self, path: str):
+        """从磁盘惰性加载opener索引（槽位号须与成员登记表一致）"""
+        self.members.index.close()
+        self.members.index = OpenerIndex.load(path)
@@ -0,0 +1,46 @@
+"""
+批量追踪吞吐量基准：open_many 在不同工作进程数下每秒打开的签名数
+
+用法: python bench_bulk_open.py [签名数] [工作进程数 ...]
+"""
+import os
+import sys
+import time
+
+from bbs04 import GroupSignature
+
+DISTINCT_SIGNATURES = 50
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    cpus = os.cpu_count() or 1
+    worker_counts = [int(arg) for arg in sys.argv[2:]] or sorted({0, 1, 2, 4, cpus} - {c for c in (2, 4) if c > cpus})
+    gs = GroupSignature()
+    members = [f"member{i}" for i in range(20)]
+    for member in members:
+        gs.member_join(member)
+    distinct = [gs.sign(members[i % len(members)], f"日志记录 {i}") for i in range(DISTINCT_SIGNATURES)]
+
+    def stream():
+        for i in range(total):
+            yield distinct[i % len(distinct)]
+
+    print("=" * 70)
+    print(f"批量追踪吞吐量（{total} 个签名，CPU 核数 {cpus}）")
+    print("=" * 70)
+    print(f"{'工作进程':>8} {'耗时(s)':>10} {'签名/秒':>10} {'相对串行':>10}")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        opened = sum(1 for valid, member in gs.open_many(stream(), workers=workers) if valid and member)
+        elapsed = time.perf_counter() - start
+        assert opened == total
+        rate = total / elapsed
+        baseline = baseline or rate
+        label = "串行" if workers == 0 else str(workers)
+        print(f"{label:>8} {elapsed:>10.2f} {rate:>10.1f} {rate / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
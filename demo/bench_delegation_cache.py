@@ -0,0 +1,65 @@
+"""
+委托缓存基准：验证方反复验证少数几个委托下的代理签名
+
+D 个委托（不保护代理），N 个签名按均匀分布落在这些委托上、打乱顺序逐个验证；
+对比不用缓存、缓存容量小于 D（LRU 会不断淘汰）与容量不小于 D 三种情形的
+平均验证耗时与命中率。命中时 v、K^K 都不再计算，v^R 与 g^m 查固定基表。
+
+用法: python bench_delegation_cache.py [委托数 D] [签名数 N] [参数集 ...]
+"""
+import random
+import sys
+import time
+
+from delegation_cache import DelegationCache
+from muo import ProxySignatureUnprotected, generate_key_pair, generate_system_params
+
+
+def workload(params, delegations: int, count: int):
+    scheme = ProxySignatureUnprotected(params)
+    jobs = []
+    keys = [generate_key_pair(params) for _ in range(delegations)]
+    for x_A, y_A in keys:
+        delta, K, _ = scheme.delegate(x_A, y_A)
+        messages = [f"订单 {y_A % 1000}-{i}" for i in range(-(-count // delegations))]
+        jobs.extend((signature, y_A, message)
+                    for signature, message in zip(scheme.sign_many(delta, K, messages), messages))
+    random.shuffle(jobs)
+    return jobs[:count]
+
+
+def run(label: str, params, jobs, cache=None):
+    scheme = ProxySignatureUnprotected(params, cache=cache)
+    start = time.perf_counter()
+    for signature, y_A, message in jobs:
+        assert scheme.verify(signature, y_A, message)[0]
+    elapsed = (time.perf_counter() - start) / len(jobs)
+    hit_rate = ""
+    if cache is not None:
+        stats = cache.stats()
+        hit_rate = f"{stats['hits'] / (stats['hits'] + stats['misses']):>8.1%}  淘汰 {stats['evictions']}"
+    print(f"  {label:<18} {elapsed * 1e3:>10.3f} ms  {hit_rate}")
+    return elapsed
+
+
+def main():
+    delegations = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    names = sys.argv[3:] or ["demo", "muo-2048-256"]
+    print("=" * 60)
+    print(f"委托缓存：{delegations} 个委托、{count} 个签名逐个验证（平均每个）")
+    print("=" * 60)
+    for name in names:
+        params = generate_system_params(name)
+        jobs = workload(params, delegations, count)
+        print(f"\n参数集 {name}")
+        print(f"  {'':<18} {'验证':>13}  {'命中率':>8}")
+        base = run("不用缓存", params, jobs)
+        small = max(1, delegations // 2)
+        run(f"LRU 容量 {small}", params, jobs, DelegationCache(params, maxsize=small))
+        full = run(f"LRU 容量 {delegations}", params, jobs, DelegationCache(params, maxsize=delegations))
+        print(f"  容量足够时加速 {base / full:.1f}×")
+
+
+if __name__ == "__main__":
+    main()
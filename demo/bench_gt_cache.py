@@ -0,0 +1,86 @@
+"""
+配对常量缓存基准：把签名/验证的耗时拆成配对与 GT 求幂两部分
+
+    配对：Miller 循环（G2 已预计算直线）、最终幂、完整配对、两个配对共享最终幂
+    求幂：可变底数 gt_pow 与 GT 固定基窗口表
+    方案：签名中 R₃ 的旧算法（3 次配对 + 多幂运算）与缓存常量后的算法（无新配对），
+          以及公钥创建、从文件加载（含/不含配对常量复核）的耗时
+
+用法: python bench_gt_cache.py [重复次数]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bbs04 import GroupPublicKey, GroupSignature
+from bench_suite import time_per_op
+from pairing_group import GTFixedBaseTable
+
+
+def row(label, seconds):
+    print(f"  {label:<34} {seconds * 1e3:9.3f} ms")
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    start = time.perf_counter()
+    gs = GroupSignature()
+    create = time.perf_counter() - start
+    gs.member_join("Alice")
+    grp, pk = gs.group, gs.public_key
+    p = grp.r
+    P2 = pk.g2('P2')
+    e_hw = pk.gt_constants['HW']
+    k = random.randrange(p)
+    f = grp.miller_loop([(gs.H, P2)])
+
+    print("=" * 70)
+    print(f"配对常量缓存基准（后端 {grp.backend}，每项 {repeat} 次）")
+    print("=" * 70)
+    print("\n配对")
+    print("-" * 70)
+    row("Miller 循环（预计算直线）", time_per_op(lambda: grp.miller_loop([(gs.H, P2)]), repeat))
+    row("最终幂", time_per_op(lambda: grp._final_exp(f), repeat))
+    row("完整配对 e(P, Q)", time_per_op(lambda: grp.pairing(gs.H, P2), repeat))
+    row("两个配对共享最终幂", time_per_op(lambda: grp.multi_pairing([(gs.H, P2), (gs.P, pk.g2('W'))]), repeat))
+
+    print("\nGT 求幂")
+    print("-" * 70)
+    row("可变底数 gt_pow", time_per_op(lambda: grp.gt_pow(e_hw, k), repeat))
+    row("固定基窗口表", time_per_op(lambda: pk.gt_pow('HW', k), repeat))
+    row("建表（每个常量）", time_per_op(lambda: GTFixedBaseTable(grp, e_hw), max(1, repeat // 10)))
+
+    print("\n签名中的 R₃")
+    print("-" * 70)
+    member = gs.members["Alice"]
+    T3 = grp.g1_add(member.A_i, pk.mul('H', k))
+    exps = [random.randrange(p) for _ in range(3)]
+
+    def r3_pairings():
+        return grp.gt_multi_pow((grp.pairing(T3, P2), grp.pairing(gs.H, pk.g2('W')), grp.pairing(gs.H, P2)), exps)
+
+    def r3_cached():
+        return grp.gt_mul(grp.gt_mul(grp.gt_pow(gs._member_pairing(member), exps[0]), pk.gt_pow('HP2', exps[1])),
+                          pk.gt_pow('HW', exps[2]))
+
+    row("3 次配对 + 多幂运算", time_per_op(r3_pairings, repeat))
+    row("缓存常量（0 次新配对）", time_per_op(r3_cached, repeat))
+    signature = gs.sign("Alice", "基准消息")
+    row("sign", time_per_op(lambda: gs.sign("Alice", "基准消息"), repeat))
+    row("verify（一次两配对乘积）", time_per_op(lambda: gs.verify(signature), repeat))
+
+    print("\n公钥")
+    print("-" * 70)
+    row("创建（含 3 个配对常量与全部预计算表）", create)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "gpk.bin")
+        gs.save_public_key(path)
+        print(f"  {'公钥文件大小':<34} {os.path.getsize(path):9d} 字节")
+        row("加载（使用文件中的配对常量）", time_per_op(lambda: GroupPublicKey.load(path, grp), 3))
+        row("加载（重新计算配对常量复核）", time_per_op(lambda: GroupPublicKey.load(path, grp, check=True), 3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+冷启动基准：重新生成 vs 从密钥库加载
+
+每种启动方式都在新的 Python 进程里执行，计时分四段：
+    导入     导入所需模块（两种方式相同，gmpy2 与 pairing_group 占大头）
+    就绪     导入之后到对象可用（生成密钥与预计算表、加入成员 / 打开并校验密钥库）
+    首次操作 就绪后第一次签名 + 验证 + 打开（加载时预计算表在这里才解码）
+    进程     整个子进程的墙钟时间（含解释器启动）
+"重新生成"的成员用同样的 ID 重新加入（x_i、A_i 与原来不同，只比较耗时）。
+MUO 一侧比较 generate_system_params（读 JSON 缓存并做 Miller–Rabin 复查）+ 生成密钥对与 load_muo。
+
+用法: python bench_key_store.py [成员数] [重复次数]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bbs04 import GroupSignature
+from key_store import save_muo
+from muo import generate_key_pair, generate_system_params
+
+MUO_PARAMETER_SET = "muo-2048-256"
+MUO_KEYS = 16
+
+# 子进程脚本（参数经 sys.argv 传入），最后打印 {"imports": 秒, "ready": 秒, "first": 秒}
+PRELUDE = """
+import json, sys, time
+start = time.perf_counter()
+"""
+REPORT = """
+print(json.dumps({"imports": imported - start, "ready": ready - imported, "first": time.perf_counter() - ready}))
+"""
+GROUP_REGENERATE = PRELUDE + """
+from bbs04 import GroupSignature
+imported = time.perf_counter()
+gs = GroupSignature()
+gs.join_many([f"member-{i}" for i in range(int(sys.argv[1]))])
+ready = time.perf_counter()
+"""
+GROUP_LOAD = PRELUDE + """
+from bbs04 import GroupSignature
+imported = time.perf_counter()
+gs = GroupSignature.load(sys.argv[1], verify=sys.argv[2] == "verify")
+ready = time.perf_counter()
+"""
+GROUP_FIRST_OP = """
+signature = gs.sign("member-0", "冷启动")
+assert gs.verify(signature) and gs.open_signature(signature) == "member-0"
+""" + REPORT
+VERIFIER_REGENERATE = PRELUDE + """
+from bbs04 import GroupPublicKey
+from pairing_group import PairingGroup
+imported = time.perf_counter()
+key = GroupPublicKey.load(sys.argv[1], PairingGroup())
+ready = time.perf_counter()
+"""
+VERIFIER_LOAD = PRELUDE + """
+from key_store import load_public_key
+imported = time.perf_counter()
+key = load_public_key(sys.argv[1])
+ready = time.perf_counter()
+"""
+VERIFIER_FIRST_OP = """
+import pickle
+assert key.verify(pickle.loads(bytes.fromhex(sys.argv[2])))
+""" + REPORT
+MUO_REGENERATE = PRELUDE + """
+from muo import ProxySignatureUnprotected, generate_key_pair, generate_system_params
+imported = time.perf_counter()
+params = generate_system_params(sys.argv[1])
+keys = {f"user-{i}": generate_key_pair(params) for i in range(int(sys.argv[2]))}
+ready = time.perf_counter()
+"""
+MUO_LOAD = PRELUDE + """
+from key_store import load_muo
+from muo import ProxySignatureUnprotected
+imported = time.perf_counter()
+params, keys = load_muo(sys.argv[1])
+ready = time.perf_counter()
+"""
+MUO_FIRST_OP = """
+scheme = ProxySignatureUnprotected(params)
+x_A, y_A = keys["user-0"]
+delta, K, _ = scheme.delegate(x_A, y_A)
+assert scheme.verify(scheme.sign(delta, K, "冷启动"), y_A, "冷启动")[0]
+""" + REPORT
+
+
+def run_child(code: str, args, repeat: int):
+    """重复运行子进程，返回 (导入, 就绪, 首次操作, 进程) 的中位数（秒）"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    imports, ready, first, wall = [], [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", code, *map(str, args)], cwd=here, check=True,
+                                capture_output=True, text=True).stdout
+        wall.append(time.perf_counter() - start)
+        result = json.loads(output.strip().splitlines()[-1])
+        imports.append(result["imports"])
+        ready.append(result["ready"])
+        first.append(result["first"])
+    return tuple(statistics.median(values) for values in (imports, ready, first, wall))
+
+
+def row(label: str, timings):
+    print(f"  {label:<24}" + "".join(f" {value * 1e3:>10.1f}" for value in timings))
+
+
+def main():
+    members = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    import pickle
+
+    print("=" * 70)
+    print(f"冷启动：重新生成 vs 加载密钥库（{members} 个成员，各 {repeat} 次取中位数，ms）")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as workdir:
+        gs = GroupSignature()
+        gs.join_many([f"member-{i}" for i in range(members)])
+        directory = os.path.join(workdir, "store")
+        start = time.perf_counter()
+        gs.save(directory)
+        saved = time.perf_counter() - start
+        sizes = {name: os.path.getsize(os.path.join(directory, name)) for name in sorted(os.listdir(directory))}
+        print(f"写出密钥库 {saved * 1e3:.1f} ms："
+              + "，".join(f"{name} {size / 1024:.0f} KiB" for name, size in sizes.items()))
+        key_path = os.path.join(workdir, "group.pk")
+        gs.save_public_key(key_path)
+        signature = pickle.dumps(gs.sign("member-0", "验证方")).hex()
+
+        print(f"\n  {'':<24}" + "".join(f" {title:>8}" for title in ("导入", "就绪", "首次操作", "进程")))
+        print("BBS04 完整状态（签名 + 验证 + 打开）")
+        row("重新生成并加入成员", run_child(GROUP_REGENERATE + GROUP_FIRST_OP, [members], repeat))
+        row("加载密钥库", run_child(GROUP_LOAD + GROUP_FIRST_OP, [directory, "verify"], repeat))
+        row("加载密钥库（不校验）", run_child(GROUP_LOAD + GROUP_FIRST_OP, [directory, "trust"], repeat))
+
+        print("验证方（只有公钥）")
+        row("公钥文件 + 重建预计算表", run_child(VERIFIER_REGENERATE + VERIFIER_FIRST_OP, [key_path, signature], repeat))
+        row("加载 public.bks", run_child(VERIFIER_LOAD + VERIFIER_FIRST_OP, [directory, signature], repeat))
+
+        print(f"MUO（{MUO_PARAMETER_SET}，{MUO_KEYS} 个密钥对）")
+        params = generate_system_params(MUO_PARAMETER_SET)  # 保证参数缓存已经存在
+        muo_path = os.path.join(workdir, "muo.bks")
+        save_muo(muo_path, params, {f"user-{i}": generate_key_pair(params) for i in range(MUO_KEYS)})
+        row("参数缓存 + 生成密钥对", run_child(MUO_REGENERATE + MUO_FIRST_OP, [MUO_PARAMETER_SET, MUO_KEYS], repeat))
+        row("加载 muo.bks", run_child(MUO_LOAD + MUO_FIRST_OP, [muo_path], repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+成员批量加入基准：逐个 member_join 与分块 join_many 的吞吐，以及登记表每个成员的内存占用
+
+内存：登记表自报的各部分占用与 tracemalloc 实测的增量；对照组为同样的成员按原来的方式
+存成 {member_id: {'A_i': Point, 'x_i': int, 'desc': str}}，再加一个以 A_i 为键的反查字典。
+
+用法: python bench_member_registry.py [成员数] [每块成员数]
+"""
+import sys
+import time
+import tracemalloc
+
+from bbs04 import GroupSignature
+
+SINGLE_JOINS = 1000
+
+
+def dict_layout_bytes(gs, count):
+    """按旧布局重建 count 个成员记录，返回 tracemalloc 测得的字节数"""
+    records = [gs.members.record(slot) for slot in range(count)]
+    tracemalloc.start()
+    members = {}
+    opener_table = {}
+    for member in records:
+        A_i = (int(member.A_i[0]), int(member.A_i[1]))
+        members[member.member_id] = {'A_i': A_i, 'x_i': member.x_i, 'desc': "私钥: A_i=1/(γ+x_i)*P"}
+        opener_table[A_i] = member.member_id
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def registry_bytes(count):
+    """新建一个方案，用 tracemalloc 实测登记表加入 count 个成员后的增量（先建好宽窗口表）"""
+    gs = GroupSignature()
+    gs._wide_join_table()
+    tracemalloc.start()
+    gs.join_many([f"member-{i}" for i in range(count)])
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    chunk = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    gs = GroupSignature()
+    print("=" * 70)
+    print(f"成员批量加入（后端 {gs.group.backend}，{total} 个成员，每块 {chunk}）")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    for i in range(SINGLE_JOINS):
+        gs.member_join(f"single-{i}")
+    single = (time.perf_counter() - start) / SINGLE_JOINS
+    print(f"  {'逐个 member_join':<18} {single * 1e6:9.1f} µs/成员")
+
+    start = time.perf_counter()
+    for base in range(0, total, chunk):
+        gs.join_many([f"member-{i}" for i in range(base, min(total, base + chunk))])
+    bulk = (time.perf_counter() - start) / total
+    print(f"  {'分块 join_many':<18} {bulk * 1e6:9.1f} µs/成员 ({single / bulk:4.1f}x)，"
+          f"{total} 个成员共 {bulk * total:.1f} s")
+
+    usage = gs.members.memory_usage()
+    count = len(gs.members)
+    print("\n每个成员的内存（字节）")
+    print("-" * 70)
+    for key in ('points', 'scalars', 'ids', 'index'):
+        print(f"  {key:<18} {usage[key] / count:9.1f}")
+    print(f"  {'登记表合计':<18} {usage['per_member']:9.1f}")
+    sample = min(count, 50000)
+    print(f"  {'tracemalloc 实测':<18} {registry_bytes(sample) / sample:9.1f}（新建方案加入 {sample} 个成员）")
+    print(f"  {'旧 dict 布局':<18} {dict_layout_bytes(gs, sample) / sample:9.1f}（抽样 {sample} 个成员）")
+
+    signature = gs.sign(f"member-{total - 1}", "抽查")
+    assert gs.open_signature(signature) == f"member-{total - 1}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+多幂运算基准：Straus / Pippenger 对比逐个求幂再相乘
+
+    Z_m^*：MUO 验证中的 R^s·v^R 与 y_A·K^K·y_B^{y_B}，模数取演示参数与 1024/2048 比特
+           multi_pow_mod 在模数不超过 SMALL_MODULUS_BITS（256 比特）时直接用内建 pow 连乘，
+           演示参数 p = 83 因此从不经过 Straus / Pippenger，只有 muo_params 的正式规模参数才用到它们
+    G1   ：BBS04 验证中的 Σ k_i·P_i，k = 2（R̄₁..R̄₅）到上百（批验证）
+    GT   ：批验证中的 Π R₃^ρ（64 比特随机指数）
+
+用法: python bench_multiexp.py [重复次数]
+"""
+import random
+import sys
+
+from bench_suite import time_per_op
+from multiexp import MultiExpOps, multi_pow_mod, pippenger, straus
+from pairing_group import PairingGroup
+
+
+def report(label, chained, engines):
+    cells = "   ".join(f"{name}: {t * 1e3:9.3f} ms ({chained / t:5.2f}x)" for name, t in engines)
+    print(f"  {label:<22} 逐个: {chained * 1e3:9.3f} ms   {cells}")
+
+
+def bench_modular(repeat):
+    print("\nZ_m^*（MUO 验证等式）")
+    print("-" * 70)
+    for bits in (7, 1024, 2048):
+        m = random.getrandbits(bits) | 1 | (1 << (bits - 1))
+        ops = MultiExpOps(1, lambda a, b: a * b % m, lambda a: a * a % m)
+        for k in (2, 3):
+            bases = [random.randrange(2, m) for _ in range(k)]
+            exps = [random.randrange(1, m) for _ in range(k)]
+
+            def chained():
+                result = 1
+                for x, e in zip(bases, exps):
+                    result = result * pow(x, e, m) % m
+                return result
+
+            report(f"{bits:>4} 比特模数, k={k}", time_per_op(chained, repeat),
+                   [("Straus", time_per_op(lambda: straus(ops, bases, exps), repeat)),
+                    ("multi_pow_mod", time_per_op(lambda: multi_pow_mod(bases, exps, m), repeat))])
+
+
+def bench_g1(grp, repeat):
+    print("\nG1（Σ k_i·P_i）")
+    print("-" * 70)
+    ops = grp._g1_ops()
+    for k in (2, 3, 8, 24, 64, 192):
+        points = [grp.g1_mul(grp.g1, random.randrange(1, grp.r)) for _ in range(k)]
+        scalars = [random.randrange(1, grp.r) for _ in range(k)]
+
+        def chained():
+            acc = None
+            for P, s in zip(points, scalars):
+                acc = grp.g1_add(acc, grp.g1_mul(P, s))
+            return acc
+
+        rounds = max(1, repeat * 2 // k)
+        report(f"k={k}", time_per_op(chained, rounds),
+               [("Straus", time_per_op(lambda: straus(ops, points, scalars), rounds)),
+                ("Pippenger", time_per_op(lambda: pippenger(ops, points, scalars), rounds))])
+
+
+def bench_gt(grp, repeat):
+    print("\nGT（Π x_i^{ρ_i}，64 比特指数）")
+    print("-" * 70)
+    ops = MultiExpOps(grp.gt_one(), grp._fq12_mul, grp._fq12_sqr)
+    base = grp.pairing(grp.g1, grp.g2)
+    for k in (3, 10, 30, 100):
+        elements = [grp.gt_pow(base, random.randrange(1, grp.r)) for _ in range(k)]
+        exps = [random.getrandbits(64) for _ in range(k)]
+
+        def chained():
+            acc = grp.gt_one()
+            for x, e in zip(elements, exps):
+                acc = grp.gt_mul(acc, grp.gt_pow(x, e))
+            return acc
+
+        rounds = max(1, repeat // k)
+        report(f"k={k}", time_per_op(chained, rounds),
+               [("Straus", time_per_op(lambda: straus(ops, elements, exps), rounds)),
+                ("Pippenger", time_per_op(lambda: pippenger(ops, elements, exps), rounds))])
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    grp = PairingGroup()
+    print("=" * 70)
+    print(f"多幂运算基准（后端 {grp.backend}）")
+    print("=" * 70)
+    bench_modular(repeat)
+    bench_g1(grp, repeat)
+    bench_gt(grp, repeat)
+
+
+if __name__ == "__main__":
+    main()
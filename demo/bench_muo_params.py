@@ -0,0 +1,67 @@
+"""
+MUO 参数规模基准：各命名参数集的生成耗时、缓存加载耗时，以及委托/签名/验证/批验证的单次耗时
+
+参数生成在临时目录中进行，不影响默认缓存。
+用法: python bench_muo_params.py [批验证签名数]
+"""
+import sys
+import tempfile
+import time
+
+from bench_suite import time_per_op
+from muo import ProxySignatureProtected, ProxySignatureUnprotected, generate_key_pair
+from muo_params import PARAMETER_SETS, load_parameter_set
+
+
+def bench_operations(params, batch_size):
+    x_A, y_A = generate_key_pair(params)
+    x_B, y_B = generate_key_pair(params)
+    repeat = 5
+    messages = [f"合同条款 {i}" for i in range(batch_size)]
+    results = {"密钥生成": time_per_op(lambda: generate_key_pair(params), repeat)}
+
+    unprotected = ProxySignatureUnprotected(params)
+    delta, K, _ = unprotected.delegate(x_A, y_A)
+    signatures = [unprotected.sign(delta, K, msg) for msg in messages]
+    results["委托(不保护)"] = time_per_op(lambda: unprotected.delegate(x_A, y_A), repeat)
+    results["签名(不保护)"] = time_per_op(lambda: unprotected.sign(delta, K, messages[0]), repeat)
+    results["验证(不保护)"] = time_per_op(lambda: unprotected.verify(signatures[0], y_A, messages[0]), repeat)
+    results["批验证/签名(不保护)"] = time_per_op(
+        lambda: unprotected.verify_batch(signatures, y_A, messages), 1) / batch_size
+
+    protected = ProxySignatureProtected(params)
+    _, delta_bar, K, _ = protected.delegate(x_A, y_A, x_B, y_B)
+    signatures = [protected.sign(delta_bar, K, msg)[:3] for msg in messages]
+    results["签名(保护)"] = time_per_op(lambda: protected.sign(delta_bar, K, messages[0]), repeat)
+    results["验证(保护)"] = time_per_op(lambda: protected.verify(signatures[0], y_A, y_B, messages[0]), repeat)
+    results["批验证/签名(保护)"] = time_per_op(
+        lambda: protected.verify_batch(signatures, y_A, y_B, messages), 1) / batch_size
+    return results
+
+
+def main():
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print("=" * 70)
+    print(f"MUO 参数规模基准（批验证 {batch_size} 个签名）")
+    print("=" * 70)
+
+    sizes = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name in PARAMETER_SETS:
+            start = time.perf_counter()
+            sizes[name] = load_parameter_set(name, cache_dir)
+            generated = time.perf_counter() - start
+            start = time.perf_counter()
+            load_parameter_set(name, cache_dir)
+            loaded = time.perf_counter() - start
+            print(f"{name:<14} 生成: {generated:8.2f} s   从缓存加载（含校验）: {loaded * 1e3:8.1f} ms")
+
+    for name, params in sizes.items():
+        print(f"\n{name}（p {params['p'].bit_length()} 比特, q {params['q'].bit_length()} 比特）")
+        print("-" * 70)
+        for label, seconds in bench_operations(params, batch_size).items():
+            print(f"  {label:<20} {seconds * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+签名随机数基准：MUO 委托、MUO 签名与 BBS04 签名的单次耗时分布（p50/p90/p99/p99.9/最大值）
+
+委托和签名的随机数由 HMAC-DRBG 按 (私钥, 消息) 派生，取值次数固定，
+尾部延迟只来自模幂本身；委托失败次数一栏应始终为 0。
+
+用法: python bench_nonce_latency.py [演示参数下的次数] [2048 比特参数下的次数] [BBS04 签名次数]
+"""
+import sys
+import time
+
+from bbs04 import GroupSignature
+from bench_suite import percentile
+from muo import ProxySignatureProtected, ProxySignatureUnprotected, generate_key_pair, generate_system_params
+
+
+def distribution(label, func, repeat):
+    """逐次计时 func()，返回失败（抛出 RuntimeError）次数"""
+    samples = []
+    failures = 0
+    for i in range(repeat):
+        start = time.perf_counter()
+        try:
+            func(i)
+        except RuntimeError:
+            failures += 1
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    cells = "  ".join(f"{name} {percentile(samples, q) * 1e6:9.1f}"
+                      for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p99.9", 0.999)))
+    print(f"  {label:<22} {cells}  最大 {samples[-1] * 1e6:9.1f} µs  失败 {failures}")
+
+
+def bench_muo(name, params, repeat):
+    print(f"\nMUO（{name}，各 {repeat} 次）")
+    print("-" * 70)
+    unprotected = ProxySignatureUnprotected(params)
+    protected = ProxySignatureProtected(params)
+    keys = [generate_key_pair(params) for _ in range(repeat)]
+    x_B, y_B = generate_key_pair(params)
+    distribution("委托（不保护）", lambda i: unprotected.delegate(*keys[i]), repeat)
+    distribution("委托（保护）", lambda i: protected.delegate(*keys[i], x_B, y_B), repeat)
+
+    x_A, y_A = keys[0]
+    delta, K, _ = unprotected.delegate(x_A, y_A)
+    _, delta_bar, K_p, _ = protected.delegate(x_A, y_A, x_B, y_B)
+    distribution("签名（不保护）", lambda i: unprotected.sign(delta, K, f"订单 {i}"), repeat)
+    distribution("签名（保护）", lambda i: protected.sign(delta_bar, K_p, f"订单 {i}"), repeat)
+    signature = unprotected.sign(delta, K, "订单 0")
+    assert unprotected.verify(signature, y_A, "订单 0")[0]
+    assert protected.verify(protected.sign(delta_bar, K_p, "订单 0")[:3], y_A, y_B, "订单 0")[0]
+
+
+def bench_bbs04(repeat):
+    print(f"\nBBS04（各 {repeat} 次）")
+    print("-" * 70)
+    gs = GroupSignature()
+    gs.join_many(["alice"])
+    distribution("签名", lambda i: gs.sign("alice", f"消息 {i}"), repeat)
+    assert gs.verify(gs.sign("alice", "抽查"))
+
+
+def main():
+    small = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    large = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    signs = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+    print("=" * 70)
+    print("签名随机数：单次耗时分布（µs）")
+    print("=" * 70)
+    bench_muo("demo", generate_system_params(), small)
+    bench_muo("muo-2048-256", generate_system_params("muo-2048-256"), large)
+    bench_bbs04(signs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+opener 索引扩展性基准：成员数 10³ ~ 10⁶ 时的查找耗时与存储开销
+
+真实生成 10⁶ 个 A_i 代价太高，基准用随机 20 字节串代替 A_i 的压缩编码
+（索引只看编码字节，与编码是否为曲线点无关），并与按成员逐个比较的线性扫描对比。
+
+用法: python bench_opener_index.py [成员数 ...]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from opener_index import OpenerIndex
+
+LOOKUPS = 2000
+SCAN_LOOKUPS = 20
+
+
+def bench(n, workdir):
+    encodings = [os.urandom(20) for _ in range(n)]
+
+    start = time.perf_counter()
+    index = OpenerIndex()
+    for slot, encoding in enumerate(encodings):
+        index.add(encoding, slot)
+    build = time.perf_counter() - start
+
+    path = os.path.join(workdir, f"opener-{n}.idx")
+    index.save(path)
+    start = time.perf_counter()
+    lazy = OpenerIndex.load(path)
+    load = time.perf_counter() - start
+
+    probes = [random.randrange(n) for _ in range(LOOKUPS)]
+    start = time.perf_counter()
+    for slot in probes:
+        assert slot in lazy.lookup(encodings[slot])
+    lookup = (time.perf_counter() - start) / LOOKUPS
+    lazy.close()
+
+    start = time.perf_counter()
+    for slot in probes[:SCAN_LOOKUPS]:
+        target = encodings[slot]
+        next(i for i, encoding in enumerate(encodings) if encoding == target)
+    scan = (time.perf_counter() - start) / SCAN_LOOKUPS
+
+    size = os.path.getsize(path)
+    print(f"{n:>9} {build:>10.2f} {load * 1e6:>12.1f} {lookup * 1e6:>12.2f} {scan * 1e6:>14.1f}"
+          f" {size / 2 ** 20:>10.2f} {size / n:>10.1f}")
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+    print("=" * 84)
+    print("opener 索引扩展性基准")
+    print("=" * 84)
+    print(f"{'成员数':>9} {'构建(s)':>10} {'惰性加载(µs)':>12} {'索引查找(µs)':>12} {'线性扫描(µs)':>14}"
+          f" {'文件(MiB)':>10} {'字节/成员':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            bench(n, workdir)
+
+
+if __name__ == "__main__":
+    main()
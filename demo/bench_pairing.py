@@ -0,0 +1,56 @@
+"""
+BBS04 签名/验证性能基准：对比有无固定基预计算表时的每秒操作数
+
+用法: python bench_pairing.py [签名次数]
+"""
+import random
+import sys
+import time
+
+from bbs04 import GroupSignature
+from bench_suite import time_per_op
+from pairing_group import FixedBaseTable, PairingGroup, available_backends
+
+
+def bench_exponentiation(backend, repeat=200):
+    grp = PairingGroup(backend=backend)
+    table = FixedBaseTable(grp, grp.g1)
+    k = random.randint(1, grp.r - 1)
+    naive = time_per_op(lambda: grp.g1_mul(grp.g1, k), repeat)
+    fixed = time_per_op(lambda: table.mul(k), repeat)
+    print(f"  G1 标量乘  朴素: {naive * 1e3:8.3f} ms   固定基表: {fixed * 1e3:8.3f} ms   加速比: {naive / fixed:.1f}x")
+
+
+def bench_scheme(backend, precompute, repeat):
+    gs = GroupSignature(backend=backend, precompute=precompute)
+    gs.member_join("Alice")
+    signatures = []
+    start = time.perf_counter()
+    for i in range(repeat):
+        signatures.append(gs.sign("Alice", f"消息 {i}"))
+    sign_time = (time.perf_counter() - start) / repeat
+    start = time.perf_counter()
+    assert all(gs.verify(sig) for sig in signatures)
+    verify_time = (time.perf_counter() - start) / repeat
+    label = "开启" if precompute else "关闭"
+    print(f"  预计算{label}  sign: {1 / sign_time:8.1f} ops/s ({sign_time * 1e3:7.2f} ms)"
+          f"   verify: {1 / verify_time:8.1f} ops/s ({verify_time * 1e3:7.2f} ms)")
+    return sign_time, verify_time
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print("=" * 70)
+    print(f"BBS04 性能基准（每项 {repeat} 次）")
+    print("=" * 70)
+    for backend in available_backends():
+        print(f"\n后端: {backend}")
+        print("-" * 70)
+        bench_exponentiation(backend)
+        slow = bench_scheme(backend, False, repeat)
+        fast = bench_scheme(backend, True, repeat)
+        print(f"  固定基预计算加速比  sign: {slow[0] / fast[0]:.2f}x   verify: {slow[1] / fast[1]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+重放检测基准：吞吐量、实测误判率与内存 / 磁盘占用，并推算 10^8 个条目时的规模
+
+实测部分向一代 ReplayGuard（第一级容量 N/8，会扩展到四级）登记 N 个随机键，再分别查询 N 个新键
+（走布隆过滤器快速路径，误判时才查磁盘索引）与已登记的键（重放，必查磁盘索引），与 Python set 对比。
+推算部分按可扩展布隆过滤器的分级规则（第一级容量 capacity，之后每级 ×2、误判率 ×1/2）
+计算 10^8 个条目所需的级数、内存与误判率上界；磁盘索引为装载因子 ≤ 1/2 的 16 字节键表。
+
+用法: python bench_replay_guard.py [实测条目数 N] [推算条目数]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from replay_guard import KEY_SIZE, MIN_CAPACITY, INDEX_HEADER, ReplayGuard, ScalableBloomFilter
+
+ERROR_RATES = (1e-2, 1e-3, 1e-4, 1e-6)
+CAPACITY = 1 << 20
+
+
+def timed(label: str, func, count: int):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26} {elapsed / count * 1e6:>8.2f} µs/次 {count / elapsed:>12,.0f} 次/秒")
+    return result
+
+
+def index_bytes(entries: int) -> int:
+    capacity = MIN_CAPACITY
+    while 2 * entries > capacity:
+        capacity *= 2
+    return INDEX_HEADER.size + capacity * KEY_SIZE
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    target = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 8
+    keys = [os.urandom(KEY_SIZE) for _ in range(count)]
+    fresh = [os.urandom(KEY_SIZE) for _ in range(count)]
+
+    print("=" * 70)
+    print(f"重放检测：实测 {count:,} 个条目，推算 {target:,} 个条目")
+    print("=" * 70)
+    with tempfile.TemporaryDirectory() as directory:
+        guard = ReplayGuard(directory, capacity=max(count // 8, 1), error_rate=1e-3)
+        print("\n吞吐量（ReplayGuard，误判率上界 1e-3）")
+        timed("登记新签名 record", lambda: [guard.record(key) for key in keys], count)
+        before = guard.stats()['false_positives']
+        timed("查询新签名 check", lambda: [guard.check(key) for key in fresh], count)
+        false_positives = guard.stats()['false_positives'] - before
+        replays = timed("查询重放 check", lambda: sum(guard.check(key) is not None for key in keys), count)
+        assert replays == count
+        stats = guard.stats()
+        exact = set()
+        timed("Python set 登记（对照）", lambda: [exact.add(key) for key in keys], count)
+        guard.close()
+
+    print("\n实测误判率与占用")
+    print(f"  新签名被布隆过滤器误判、由磁盘索引排除: {false_positives:,} / {count:,} "
+          f"= {false_positives / count:.2e}（估计 {stats['estimated_error_rate']:.2e}）")
+    set_bytes = sys.getsizeof(exact) + sum(map(sys.getsizeof, exact))
+    print(f"  布隆过滤器内存 {stats['bloom_bytes'] / 2 ** 20:.2f} MiB（{stats['bloom_bytes'] * 8 / count:.1f} 比特/条）"
+          f"  磁盘索引 {stats['index_bytes'] / 2 ** 20:.1f} MiB"
+          f"  Python set {set_bytes / 2 ** 20:.1f} MiB（{set_bytes / count:.0f} 字节/条）")
+
+    print(f"\n推算 {target:,} 个条目（第一级容量 {CAPACITY:,}）")
+    print(f"  {'误判率上界':>10} {'级数':>6} {'布隆过滤器':>12} {'比特/条':>8} {'磁盘索引':>12} {'Python set':>12}")
+    for rate in ERROR_RATES:
+        stages, nbytes, bound = ScalableBloomFilter(CAPACITY, rate).plan(target)
+        print(f"  {bound:>12.0e} {stages:>6} {nbytes / 2 ** 30:>10.2f} GiB {nbytes * 8 / target:>8.1f}"
+              f" {index_bytes(target) / 2 ** 30:>10.1f} GiB {set_bytes / count * target / 2 ** 30:>10.1f} GiB")
+
+
+if __name__ == "__main__":
+    main()
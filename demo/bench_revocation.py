@@ -0,0 +1,77 @@
+"""
+成员撤销基准：批量撤销 k 个成员的公钥更新、成员本地更新私钥，以及验证方本地撤销列表的检查
+
+    群管理员  revoke(k 个成员)：公布令牌、换公钥并为全部剩余成员重新签发 A_i（一次更新）；
+              逐个撤销需要 k 次这样的更新（按单次实测耗时 × k 估算）
+    成员      用一个含 k 个成员的令牌更新 A_i（一次 k+1 点多标量乘），对照 k 个单成员令牌依次更新
+    验证方    撤销列表长度从 10 到全部成员，单个签名的检查耗时（集合查找）
+
+用法: python bench_revocation.py [成员数] [每块加入的成员数]
+"""
+import random
+import sys
+import time
+
+from bbs04 import GroupSignature
+from bench_suite import time_per_op
+from revocation import RevocationList, RevocationToken
+
+BATCH_SIZES = (1, 10, 100)
+EPOCH = "2026-10"
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    chunk = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    gs = GroupSignature()
+    grp = gs.group
+    for base in range(0, total, chunk):
+        gs.join_many([f"member-{i}" for i in range(base, min(total, base + chunk))])
+
+    print("=" * 70)
+    print(f"成员撤销（后端 {grp.backend}，{total} 个成员）")
+    print("=" * 70)
+    print(f"  {'k':>4} {'批量撤销':>12} {'逐个撤销(估)':>14} {'成员更新(批)':>14} {'成员更新(逐个)':>16}")
+    single_revoke = None
+    for k in BATCH_SIZES:
+        victims = random.sample(list(gs.members), k)
+        survivor = next(member_id for member_id in gs.members if member_id not in set(victims))
+        member = gs.members[survivor]
+
+        start = time.perf_counter()
+        token = gs.revoke(victims)
+        revoke = time.perf_counter() - start
+        single_revoke = single_revoke or revoke
+        assert token.matches(gs.public_key)
+
+        updated = token.update(member.A_i, member.x_i)
+        assert updated == gs.members[survivor].A_i
+        batch_update = time_per_op(lambda: token.update(member.A_i, member.x_i), 5)
+        singles = [RevocationToken(grp, [x], [A]) for x, A in zip(token.xs, token.A_stars)]
+
+        def sequential():
+            for single in singles:
+                single.update(member.A_i, member.x_i)
+
+        print(f"  {k:>4} {revoke:>10.2f} s {single_revoke * k:>12.2f} s {batch_update * 1e3:>11.2f} ms "
+              f"{time_per_op(sequential, 2) * 1e3:>13.2f} ms")
+
+    print("\n验证方本地撤销列表（单个签名的检查耗时）")
+    print("-" * 70)
+    signer = next(iter(gs.members))
+    signature = gs.sign(signer, "撤销列表抽查", epoch=EPOCH)
+    xs = [random.randrange(1, gs.p) for _ in range(total)]
+    for size in (10, 1000, total):
+        rl = RevocationList(grp, EPOCH)
+        start = time.perf_counter()
+        rl.add_many(xs[:size])
+        build = time.perf_counter() - start
+        assert rl.check(signature) is None
+        check = time_per_op(lambda: rl.check(signature), 1000)
+        print(f"  列表长度 {size:>7}   建表 {build:8.2f} s   检查 {check * 1e6:7.2f} µs")
+    rl.add_many([gs.members[signer].x_i])
+    assert rl.check(signature) == "签名成员已被撤销"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+签名服务压测：启动 service.py（Unix 套接字），并发客户端循环执行 sign -> verify，
+报告每种操作的吞吐与延迟分位数（p50/p90/p99），以及服务端的批处理统计和事件循环最大延迟
+
+分别在不合并（窗口 0）与合并验证请求（默认 5 ms 窗口）两种配置下运行。
+用法: python bench_service.py [并发客户端数] [每个客户端的轮数] [MUO 参数集]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_suite import percentile
+from service import ServiceClient
+
+MEMBERS = 16
+
+
+async def wait_for_socket(path, process, timeout=300.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"服务进程退出，返回码 {process.returncode}")
+        if os.path.exists(path):
+            try:
+                return await ServiceClient.connect(path)
+            except (ConnectionError, FileNotFoundError):
+                pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError("等待服务启动超时")
+
+
+async def client_loop(client, index, rounds, latencies):
+    async def timed(op, **params):
+        start = time.perf_counter()
+        result = await client.call(op, **params)
+        latencies.setdefault(op, []).append(time.perf_counter() - start)
+        return result
+
+    for i in range(rounds):
+        message = f"客户端 {index} 请求 {i}"
+        if i % 2 == 0:
+            signature = (await timed("bbs04.sign", member=f"member-{(index + i) % MEMBERS}",
+                                     message=message))['signature']
+            assert (await timed("bbs04.verify", signature=signature))['valid']
+        else:
+            scheme = ("unprotected", "protected")[(i // 2) % 2]
+            signature = (await timed("muo.sign", scheme=scheme, message=message))['signature']
+            assert (await timed("muo.verify", scheme=scheme, signature=signature, message=message))['valid']
+
+
+async def run_load(socket_path, process, concurrency, rounds):
+    clients = [await wait_for_socket(socket_path, process) for _ in range(concurrency)]
+    latencies = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop(client, i, rounds, latencies) for i, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+    stats = await clients[0].call("stats")
+    for client in clients:
+        await client.close()
+    return elapsed, latencies, stats
+
+
+def bench(label, concurrency, rounds, muo_params, window_ms):
+    with tempfile.TemporaryDirectory() as workdir:
+        socket_path = os.path.join(workdir, "service.sock")
+        process = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                 "service.py"),
+                                    "--socket", socket_path, "--members", str(MEMBERS),
+                                    "--muo-params", muo_params, "--window-ms", str(window_ms)],
+                                   stderr=subprocess.DEVNULL)
+        try:
+            elapsed, latencies, stats = asyncio.run(run_load(socket_path, process, concurrency, rounds))
+        finally:
+            process.terminate()
+            process.wait(60)
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"\n{label}：{total} 个请求 {elapsed:.2f} s，吞吐 {total / elapsed:7.1f} 次/秒，"
+          f"事件循环最大延迟 {stats['max_loop_lag_ms']:.1f} ms")
+    print("-" * 70)
+    for op in ("bbs04.sign", "bbs04.verify", "muo.sign", "muo.verify"):
+        values = sorted(latencies.get(op, []))
+        if not values:
+            continue
+        print(f"  {op:<13} {len(values):5d} 次  {len(values) / elapsed:7.1f} 次/秒  "
+              f"p50 {percentile(values, 0.5) * 1e3:8.2f}  p90 {percentile(values, 0.9) * 1e3:8.2f}  "
+              f"p99 {percentile(values, 0.99) * 1e3:8.2f} ms")
+    for name, counts in stats['coalescers'].items():
+        print(f"  合并 {name:<16} {counts['items']:5d} 个验证请求 / {counts['batches']:4d} 批 "
+              f"（平均 {counts['items'] / max(1, counts['batches']):.1f}）")
+    if stats['pool']:
+        pool = stats['pool']
+        print(f"  签名池命中 {pool['hits']}/{pool['hits'] + pool['misses']}")
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    muo_params = sys.argv[3] if len(sys.argv) > 3 else "muo-2048-256"
+    print("=" * 70)
+    print(f"签名服务压测（{concurrency} 个并发客户端 × {rounds} 轮 sign+verify，MUO 参数 {muo_params}）")
+    print("=" * 70)
+    bench("不合并（窗口 0）", concurrency, rounds, muo_params, 0)
+    bench("合并验证（窗口 5 ms）", concurrency, rounds, muo_params, 5)
+
+
+if __name__ == "__main__":
+    main()
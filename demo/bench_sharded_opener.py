@@ -0,0 +1,78 @@
+"""
+分片 opener 基准：分片数增加时的查找吞吐量与扩容迁移量
+
+本机启动分片进程（Unix 域套接字），先用 1 个分片登记全部成员，之后每次加入一个分片直到 S 个：
+    迁移     加入分片时从旧分片迁到新分片的记录数与耗时（一致性哈希下约为 1/N）
+    查找     协调者按 A 编码批量查成员（每批 B 个，按分片合并成请求并发发送）的吞吐量
+    打开     恢复 A（不验证）+ 批量查找的端到端吞吐量，协调者的群运算在各分片数下相同
+    最大分片 各分片记录数的最大值（单个分片需要容纳的登记表规模）
+分片都在同一台机器上，CPU 核数少于分片数时吞吐量受限于协调者与分片共享的核。
+
+用法: python bench_sharded_opener.py [成员数] [最大分片数] [每批查找数 B]
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bbs04 import GroupSignature
+from sharded_opener import LocalCluster, ShardedOpener, registry_entries
+
+ROUNDS = 20
+OPEN_SIGNATURES = 64
+
+
+async def run(members: int, max_shards: int, batch: int):
+    gs = GroupSignature()
+    gs.join_many([f"member-{i}" for i in range(members)])
+    encodings = [encoding for encoding, _ in registry_entries(gs.members)]
+    expected = {encoding: member_id for encoding, member_id in registry_entries(gs.members)}
+    signers = random.sample(range(members), OPEN_SIGNATURES)
+    signatures = [gs.sign(f"member-{i}", "分片追踪") for i in signers]
+
+    print(f"\n  {'分片':>4} {'迁移条数':>10} {'迁移 ms':>9} {'查找/秒':>12} {'打开/秒':>10} {'最大分片':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        async with LocalCluster(directory) as cluster:
+            coordinator = ShardedOpener(gs.opener)
+            for shards in range(1, max_shards + 1):
+                name, path = await cluster.start_shard()
+                moved_before = coordinator.moved
+                start = time.perf_counter()
+                await coordinator.add_shard(name, path)
+                migrate = time.perf_counter() - start
+                if shards == 1:
+                    await coordinator.put_many(registry_entries(gs.members))
+
+                lookups = [random.sample(encodings, batch) for _ in range(ROUNDS)]
+                start = time.perf_counter()
+                for keys in lookups:
+                    found = await coordinator.lookup_many(keys)
+                lookup_rate = ROUNDS * batch / (time.perf_counter() - start)
+                assert found == [expected[key] for key in keys]
+
+                start = time.perf_counter()
+                results = await coordinator.open_many(signatures, verify=False)
+                open_rate = len(signatures) / (time.perf_counter() - start)
+                assert [member_id for _, member_id in results] == [f"member-{i}" for i in signers]
+
+                counts = (await coordinator.stats())['shards']
+                assert sum(counts.values()) == members
+                print(f"  {shards:>4} {coordinator.moved - moved_before:>10} {migrate * 1e3:>9.1f}"
+                      f" {lookup_rate:>12,.0f} {open_rate:>10,.0f} {max(counts.values()):>10}")
+            await coordinator.close()
+
+
+def main():
+    members = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    max_shards = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    batch = int(sys.argv[3]) if len(sys.argv) > 3 else 512
+    print("=" * 64)
+    print(f"分片 opener：{members} 个成员，1..{max_shards} 个分片，每批查找 {batch} 个，{os.cpu_count()} 个 CPU")
+    print("=" * 64)
+    asyncio.run(run(members, max_shards, batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+离线/在线签名基准：逐个签名请求的延迟分布（均值、p50、p99、最大值）
+
+    现场签名      每次 sign 都生成随机数、T₁..T₃ 与 R₁..R₅
+    签名池/线程   后台线程填充承诺池（与请求线程共享 GIL）
+    签名池/进程   后台线程把预计算交给进程池
+请求按固定间隔到达（模拟在线服务），只统计 sign 调用本身的耗时；池在计时前先补满。
+
+用法: python bench_signing_pool.py [请求数] [请求间隔毫秒] [低水位] [高水位]
+"""
+import sys
+import time
+
+from bbs04 import GroupSignature
+from bench_suite import percentile
+from signing_pool import SigningPool
+
+MEMBERS = ("Alice", "Bob", "Charlie")
+
+
+def run(sign, count, gap):
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        sign(MEMBERS[i % len(MEMBERS)], f"在线请求 {i}")
+        elapsed = time.perf_counter() - start
+        latencies.append(elapsed)
+        if gap > elapsed:
+            time.sleep(gap - elapsed)
+    return sorted(latencies)
+
+
+def report(label, latencies, extra=""):
+    mean = sum(latencies) / len(latencies)
+    print(f"  {label:<14} 均值 {mean * 1e3:7.3f}  p50 {percentile(latencies, 0.5) * 1e3:7.3f}  "
+          f"p99 {percentile(latencies, 0.99) * 1e3:7.3f}  最大 {latencies[-1] * 1e3:7.3f} ms  {extra}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    gap = (float(sys.argv[2]) if len(sys.argv) > 2 else 10.0) / 1e3
+    low = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    high = int(sys.argv[4]) if len(sys.argv) > 4 else 32
+    gs = GroupSignature()
+    for member in MEMBERS:
+        gs.member_join(member)
+
+    print("=" * 70)
+    print(f"离线/在线签名延迟（{count} 个请求，间隔 {gap * 1e3:.1f} ms，水位 {low}/{high}）")
+    print("=" * 70)
+    report("现场签名", run(gs.sign, count, gap))
+    for label, processes in (("签名池/线程", 0), ("签名池/进程", 2)):
+        with SigningPool(gs, low=low, high=high, processes=processes).start(MEMBERS) as pool:
+            pool.wait_ready()
+            start = time.perf_counter()
+            latencies = run(pool.sign, count, gap)
+            elapsed = time.perf_counter() - start
+            stats = pool.stats()
+            signature = pool.sign(MEMBERS[0], "抽查")
+        assert gs.verify(signature)
+        report(label, latencies, f"命中 {stats['hits']}/{stats['hits'] + stats['misses']}  "
+                                 f"吞吐 {count / elapsed:6.1f} 次/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,521 @@
+"""
+基准与性能剖析套件：覆盖 BBS04 与 MUO 的每个操作，结果写成 JSON 并与基线比较
+
+    python bench_suite.py                      运行全部用例并打印表格
+    python bench_suite.py --quick              缩小群规模、批大小与参数集，几分钟内跑完
+    python bench_suite.py -k bbs04.sign        只运行名字包含子串的用例（可重复给出）
+    python bench_suite.py --json out.json      保存本次结果
+    python bench_suite.py --baseline           与 results/bench_baseline.json 比较，有回归时返回码为 1
+    python bench_suite.py --save-baseline      把本次结果写成新的基线
+    python bench_suite.py --phases             用 tracing 的计时钩子汇总每个用例内各阶段的耗时
+    python bench_suite.py --profile DIR        每个用例一份 cProfile 文件，并打印累计耗时最高的函数
+    python bench_suite.py --tracemalloc        每个用例的内存峰值与分配最多的代码行
+    python bench_suite.py --counters           每个用例平均每次调用的原语次数（instrumentation 模块）
+    python bench_suite.py --prometheus FILE    整次运行的原语计数写成 Prometheus 文本（隐含 --counters）
+
+计时方式同 timeit：先热身一次，自动确定每轮的调用次数使一轮不少于 --min-time 秒，
+取各轮平均值的中位数。剖析与内存统计各自另跑一轮，不影响计时结果。
+用例名中的 @ 后缀为群规模、批大小或 MUO 参数集；批操作另给出平均到每个元素的耗时。
+基线记录了运行环境，只有同一台机器上的结果才有比较意义。
+"""
+import argparse
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import instrumentation
+import muo
+import tracing
+from bbs04 import GroupSignature, SignatureCommitment
+from delegation_cache import DelegationCache
+from muo import ProxySignatureProtected, ProxySignatureUnprotected, generate_key_pair, generate_system_params
+from revocation import RevocationList
+from signature_codec import SignatureCodec
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "bench_baseline.json")
+DEFAULT_THRESHOLD = 0.25
+PROFILE_TOP = 12
+TRACEMALLOC_TOP = 5
+EPOCH = "2026-10"
+
+# 用例：名字 -> 工厂；工厂做准备工作并返回 (被计时的无参函数, 每次调用处理的元素个数)
+Factory = Callable[[], Tuple[Callable[[], object], int]]
+
+
+# -------------------------- 用例 --------------------------
+def bbs04_cases(quick: bool) -> Iterator[Tuple[str, Factory]]:
+    group_sizes = (10, 1000) if quick else (10, 1000, 100000)
+    batch_sizes = (16,) if quick else (16, 128)
+    schemes: Dict[int, GroupSignature] = {}
+    counter = iter(range(1 << 62))
+
+    def scheme(size: int = group_sizes[0]) -> GroupSignature:
+        if size not in schemes:
+            gs = GroupSignature()
+            gs.join_many([f"member-{i}" for i in range(size)])
+            schemes[size] = gs
+        return schemes[size]
+
+    def signatures(count: int, epoch: Optional[str] = None) -> List[dict]:
+        gs = scheme()
+        return [gs.sign(f"member-{i % group_sizes[0]}", f"消息 {i}", epoch=epoch) for i in range(count)]
+
+    yield "bbs04.keygen", lambda: (GroupSignature, 1)
+
+    def member_join(size):
+        gs = scheme(size)
+        return lambda: gs.member_join(f"join-{next(counter)}"), 1
+
+    def join_many(size):
+        gs = scheme(size)
+        count = batch_sizes[-1]
+        return lambda: gs.join_many([f"join-{next(counter)}" for _ in range(count)]), count
+
+    for size in group_sizes:
+        yield f"bbs04.member_join@{size}", lambda size=size: member_join(size)
+        yield f"bbs04.join_many@{size}", lambda size=size: join_many(size)
+
+    def sign():
+        gs = scheme()
+        return lambda: gs.sign("member-0", "基准消息"), 1
+
+    def sign_epoch():
+        gs = scheme()
+        return lambda: gs.sign("member-0", "基准消息", epoch=EPOCH), 1
+
+    def sign_commit():
+        gs = scheme()
+        return lambda: gs.commit("member-0"), 1
+
+    def sign_respond():
+        gs = scheme()
+        c = gs.commit("member-0")
+        fields = (c.member_id, c.key, c.witness, c.nonces, c.values, c.encoded)
+        # 承诺只能用一次，每次调用复制一份（计时只为测在线阶段，签名不会发布）
+        return lambda: gs.public_key.respond(SignatureCommitment(*fields), "基准消息"), 1
+
+    yield "bbs04.sign", sign
+    yield "bbs04.sign.epoch", sign_epoch
+    yield "bbs04.sign.commit", sign_commit
+    yield "bbs04.sign.respond", sign_respond
+
+    def verify():
+        gs = scheme()
+        signature = signatures(1)[0]
+        return lambda: gs.verify(signature), 1
+
+    yield "bbs04.verify", verify
+
+    def verify_batch(count):
+        gs = scheme()
+        batch = signatures(count, EPOCH)
+        return lambda: gs.verify_batch(batch), count
+
+    for count in batch_sizes:
+        yield f"bbs04.verify_batch@{count}", lambda count=count: verify_batch(count)
+
+    def open_signature(size):
+        gs = scheme(size)
+        signature = gs.sign(f"member-{size - 1}", "打开")
+        return lambda: gs.open_signature(signature), 1
+
+    for size in group_sizes:
+        yield f"bbs04.open_signature@{size}", lambda size=size: open_signature(size)
+
+    def open_many(count):
+        gs = scheme()
+        batch = signatures(count)
+        return lambda: list(gs.open_many(batch)), count
+
+    yield f"bbs04.open_many@{batch_sizes[-1]}", lambda: open_many(batch_sizes[-1])
+
+    def codec():
+        gs = scheme()
+        codec = SignatureCodec(gs.group)
+        signature = signatures(1)[0]
+        return lambda: codec.decode(codec.encode(signature)), 1
+
+    yield "bbs04.codec.roundtrip", codec
+
+    def revoke():
+        size = group_sizes[1]
+        gs = GroupSignature()
+        gs.join_many([f"member-{i}" for i in range(size)])
+        victims = iter(range(size))
+        return lambda: gs.revoke([f"member-{next(victims)}"]), 1
+
+    def revocation_update(count):
+        gs = GroupSignature()
+        gs.join_many([f"member-{i}" for i in range(count + 1)])
+        member = gs.members[f"member-{count}"]
+        A_i, x_i = member.A_i, member.x_i
+        token = gs.revoke([f"member-{i}" for i in range(count)])
+        return lambda: token.update(A_i, x_i), 1
+
+    def revocation_check():
+        gs = scheme()
+        rl = RevocationList(gs.group, EPOCH)
+        rl.add_many(range(1, 1001))
+        signature = signatures(1, EPOCH)[0]
+        return lambda: rl.check(signature), 1
+
+    yield f"bbs04.revoke@{group_sizes[1]}", revoke
+    for count in (1, batch_sizes[0]):
+        yield f"bbs04.revocation.update@{count}", lambda count=count: revocation_update(count)
+    yield "bbs04.revocation.check", revocation_check
+
+
+def muo_cases(quick: bool) -> Iterator[Tuple[str, Factory]]:
+    names = ("demo", "muo-2048-256") if quick else ("demo", "muo-2048-256", "muo-3072-256")
+    batch = 64 if quick else 256
+
+    for name in names:
+        state = {}
+
+        def setup(name=name, state=state):
+            if not state:
+                params = generate_system_params(name)
+                x_A, y_A = generate_key_pair(params)
+                x_B, y_B = generate_key_pair(params)
+                unprotected = ProxySignatureUnprotected(params)
+                protected = ProxySignatureProtected(params)
+                cache = DelegationCache(params)
+                delta, K, _ = unprotected.delegate(x_A, y_A)
+                _, delta_bar, K_p, _ = protected.delegate(x_A, y_A, x_B, y_B)
+                messages = [f"订单 {i}" for i in range(batch)]
+                state.update(params=params, keys=(x_A, y_A, x_B, y_B), unprotected=unprotected,
+                             protected=protected, delegation=(delta, K), protected_delegation=(delta_bar, K_p),
+                             cached=ProxySignatureUnprotected(params, cache=cache),
+                             protected_cached=ProxySignatureProtected(params, cache=cache),
+                             messages=messages, signatures=unprotected.sign_many(delta, K, messages),
+                             protected_signatures=protected.sign_many(delta_bar, K_p, messages))
+            return state
+
+        def keygen(setup=setup):
+            params = setup()['params']
+            return lambda: generate_key_pair(params), 1
+
+        def delegate(setup=setup):
+            s = setup()
+            x_A, y_A, x_B, y_B = s['keys']
+            return lambda: s['unprotected'].delegate(x_A, y_A), 1
+
+        def delegate_protected(setup=setup):
+            s = setup()
+            return lambda: s['protected'].delegate(*s['keys']), 1
+
+        def sign(setup=setup, protected=False):
+            s = setup()
+            scheme = s['protected' if protected else 'unprotected']
+            key, K = s['protected_delegation' if protected else 'delegation']
+            return lambda: scheme.sign(key, K, "订单"), 1
+
+        def sign_many(setup=setup, numpy=True):
+            s = setup()
+            delta, K = s['delegation']
+            messages = s['messages']
+
+            def run():
+                saved = muo.np
+                if not numpy:
+                    muo.np = None
+                try:
+                    return s['unprotected'].sign_many(delta, K, messages)
+                finally:
+                    muo.np = saved
+
+            return run, len(messages)
+
+        def verify(setup=setup, protected=False, cached=False):
+            s = setup()
+            x_A, y_A, x_B, y_B = s['keys']
+            if protected:
+                scheme = s['protected_cached' if cached else 'protected']
+                signature = s['protected_signatures'][0]
+                return lambda: scheme.verify(signature, y_A, y_B, s['messages'][0]), 1
+            scheme = s['cached' if cached else 'unprotected']
+            signature = s['signatures'][0]
+            return lambda: scheme.verify(signature, y_A, s['messages'][0]), 1
+
+        def verify_batch(setup=setup, protected=False):
+            s = setup()
+            x_A, y_A, x_B, y_B = s['keys']
+            messages = s['messages']
+            if protected:
+                signatures = s['protected_signatures']
+                return lambda: s['protected'].verify_batch(signatures, y_A, y_B, messages), len(messages)
+            signatures = s['signatures']
+            return lambda: s['unprotected'].verify_batch(signatures, y_A, messages), len(messages)
+
+        yield f"muo.keygen@{name}", keygen
+        yield f"muo.delegate@{name}", delegate
+        yield f"muo.delegate.protected@{name}", delegate_protected
+        yield f"muo.sign@{name}", sign
+        yield f"muo.sign.protected@{name}", lambda sign=sign: sign(protected=True)
+        yield f"muo.sign_many@{name}/{batch}", sign_many
+        if name == "demo" and muo.np is not None:
+            yield f"muo.sign_many.int@{name}/{batch}", lambda sign_many=sign_many: sign_many(numpy=False)
+        yield f"muo.verify@{name}", verify
+        yield f"muo.verify.protected@{name}", lambda verify=verify: verify(protected=True)
+        yield f"muo.verify.cached@{name}", lambda verify=verify: verify(cached=True)
+        yield f"muo.verify.protected.cached@{name}", lambda verify=verify: verify(protected=True, cached=True)
+        yield f"muo.verify_batch@{name}/{batch}", verify_batch
+        yield f"muo.verify_batch.protected@{name}/{batch}", lambda verify_batch=verify_batch: verify_batch(
+            protected=True)
+
+
+# -------------------------- 计时与剖析 --------------------------
+def time_per_op(func: Callable[[], object], repeat: int) -> float:
+    """连续调用 repeat 次的平均耗时（秒）；各 bench_*.py 的简单计时共用"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """已排序样本的分位数（取不超过该比例位置的样本，不插值）"""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_rounds(func: Callable[[], object], min_time: float, rounds: int) -> Tuple[int, List[float]]:
+    """热身一次，按 timeit.autorange 的方式定出每轮调用次数，返回 (次数, 每轮的平均耗时)"""
+    func()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed * 10 < min_time else 2
+    timings = [elapsed / number]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return number, timings
+
+
+def collect_phases(func: Callable[[], object], number: int) -> Dict[str, dict]:
+    """用 tracing 的计时钩子累计每个阶段的调用次数与总耗时（平均到每次 func 调用）"""
+    totals: Dict[str, List[float]] = {}
+
+    def hook(name, seconds):
+        entry = totals.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    tracing.set_timing_hook(hook)
+    try:
+        for _ in range(number):
+            func()
+    finally:
+        tracing.set_timing_hook(None)
+    return {name: {'calls': calls / number, 'seconds': seconds / number}
+            for name, (calls, seconds) in sorted(totals.items(), key=lambda item: -item[1][1])}
+
+
+def profile_case(name: str, func: Callable[[], object], number: int, directory: str) -> str:
+    """cProfile 跑一轮，写出 <目录>/<用例名>.prof，返回累计耗时最高的函数表"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        for _ in range(number):
+            func()
+    finally:
+        profiler.disable()
+    os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(os.path.join(directory, name.replace("/", "_") + ".prof"))
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    return out.getvalue()
+
+
+def count_primitives(func: Callable[[], object], number: int) -> Dict[str, float]:
+    """开启原语计数跑一轮，返回平均每次调用的原语次数（计数在整次运行中累计，供 --prometheus 导出）"""
+    before = instrumentation.snapshot()['primitives']
+    instrumentation.enable()
+    try:
+        for _ in range(number):
+            func()
+    finally:
+        instrumentation.disable()
+    after = instrumentation.snapshot()['primitives']
+    counts = {name: (entry['calls'] - before.get(name, {'calls': 0})['calls']) / number
+              for name, entry in after.items()}
+    return {name: calls for name, calls in counts.items() if calls}
+
+
+def trace_memory(func: Callable[[], object], number: int) -> Tuple[int, int, List[str]]:
+    """tracemalloc 跑一轮，返回 (峰值字节, 留存字节, 分配最多的代码行)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(number):
+            func()
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    top = [str(stat) for stat in after.compare_to(before, "lineno")[:TRACEMALLOC_TOP]]
+    return peak, current, top
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.1f} ns"
+
+
+# -------------------------- 结果文件与基线比较 --------------------------
+def environment(quick: bool) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': getattr(muo.np, "__version__", None),
+        'commit': commit,
+        'quick': quick,
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_json(path: str, data: dict):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, ensure_ascii=False, indent=2, sort_keys=True)
+        fh.write("\n")
+    os.replace(tmp, path)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> Tuple[list, list]:
+    """按中位数比较，返回 (回归, 改进) 列表，元素为 (用例名, 本次/基线)"""
+    regressions, improvements = [], []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        ratio = result['median'] / reference['median']
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio))
+        elif ratio < 1 / (1 + threshold):
+            improvements.append((name, ratio))
+    return regressions, improvements
+
+
+# -------------------------- 主程序 --------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BBS04 / MUO 基准与性能剖析套件")
+    parser.add_argument("--quick", action="store_true", help="小规模运行")
+    parser.add_argument("-k", dest="filters", action="append", default=[], help="只运行名字包含该子串的用例")
+    parser.add_argument("--list", action="store_true", help="只列出用例名")
+    parser.add_argument("--rounds", type=int, default=None, help="每个用例的轮数（默认 5，--quick 时 3）")
+    parser.add_argument("--min-time", type=float, default=None, help="每轮最短秒数（默认 0.2，--quick 时 0.05）")
+    parser.add_argument("--json", help="把结果写入该 JSON 文件")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="与基线 JSON 比较（缺省路径见文档）")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, help="把本次结果写成基线")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="判为回归的相对变慢比例")
+    parser.add_argument("--phases", action="store_true", help="汇总各阶段耗时（tracing 计时钩子）")
+    parser.add_argument("--profile", metavar="DIR", help="cProfile 输出目录")
+    parser.add_argument("--tracemalloc", action="store_true", help="统计内存峰值与分配热点")
+    parser.add_argument("--counters", action="store_true", help="统计每次调用的原语次数")
+    parser.add_argument("--prometheus", metavar="FILE", help="把原语计数写成 Prometheus 文本文件")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    rounds = args.rounds or (3 if args.quick else 5)
+    min_time = args.min_time or (0.05 if args.quick else 0.2)
+    cases = [(name, factory) for name, factory in (*bbs04_cases(args.quick), *muo_cases(args.quick))
+             if not args.filters or any(f in name for f in args.filters)]
+    if args.list:
+        for name, _ in cases:
+            print(name)
+        return 0
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)['results']
+
+    print("=" * 78)
+    print(f"基准套件（{len(cases)} 个用例，{rounds} 轮，每轮 ≥ {min_time} s{'，quick' if args.quick else ''}）")
+    print("=" * 78)
+    results: Dict[str, dict] = {}
+    for name, factory in cases:
+        func, items = factory()
+        number, timings = run_rounds(func, min_time, rounds)
+        median = statistics.median(timings)
+        result = {'median': median, 'min': min(timings), 'max': max(timings), 'rounds': rounds,
+                  'number': number, 'items': items}
+        line = f"  {name:<44} {format_seconds(median)}  ±{(max(timings) - min(timings)) / median * 50:4.1f}%"
+        if items > 1:
+            result['per_item'] = median / items
+            line += f"  {format_seconds(median / items)}/个"
+        reference = baseline.get(name)
+        if reference is not None:
+            line += f"  基线 {(median / reference['median'] - 1) * 100:+6.1f}%"
+        print(line)
+
+        if args.phases:
+            result['phases'] = collect_phases(func, number)
+            for phase_name, entry in result['phases'].items():
+                print(f"      {phase_name:<34} {format_seconds(entry['seconds'])}  × {entry['calls']:g}")
+        if args.counters or args.prometheus:
+            result['primitives'] = count_primitives(func, number)
+            print("      " + "  ".join(f"{primitive} {calls:g}" for primitive, calls in result['primitives'].items()))
+        if args.tracemalloc:
+            peak, retained, top = trace_memory(func, number)
+            result['peak_bytes'] = peak
+            result['retained_bytes'] = retained
+            print(f"      内存峰值 {peak / 1024:.1f} KiB，留存 {retained / 1024:.1f} KiB")
+            for entry in top:
+                print(f"        {entry}")
+        if args.profile:
+            print("      " + profile_case(name, func, number, args.profile).strip().replace("\n", "\n      "))
+        results[name] = result
+
+    data = {'environment': environment(args.quick), 'results': results}
+    if args.prometheus:
+        instrumentation.write_prometheus(args.prometheus)
+        print(f"\n原语计数已写入 {args.prometheus}")
+    for path in (args.json, args.save_baseline):
+        if path:
+            write_json(path, data)
+            print(f"\n结果已写入 {path}")
+
+    if baseline:
+        regressions, improvements = compare(results, baseline, args.threshold)
+        print(f"\n与基线比较（阈值 {args.threshold:.0%}）：{len(regressions)} 项回归，{len(improvements)} 项改进")
+        for label, entries in (("回归", regressions), ("改进", improvements)):
+            for name, ratio in entries:
+                print(f"  {label} {name:<40} {ratio:5.2f}x")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+批量追踪：在进程池中流式地验证、打开签名并查 opener 索引
+
+Opener（含 ξ₁、ξ₂ 和全部固定基预计算表）与 opener 索引文件路径通过进程池的 initializer
+发送给每个工作进程一次，之后的任务只携带签名本身；索引文件在各工作进程中 mmap 共享。
+输入按 chunk_size 切块提交，同时最多保留 max_pending 个未完成的块，
+结果严格按输入顺序产出，内存占用与输入总量无关。
+"""
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from bbs04 import SIGNATURE_FIELDS, TAG_FIELDS, Opener
+from opener_index import OpenerIndex
+
+OpenResult = Tuple[bool, Optional[bytes], List[int]]
+
+_worker_opener = None
+_worker_index = None
+
+
+def _init_worker(opener: Opener, index_path: str):
+    global _worker_opener, _worker_index
+    _worker_opener = opener
+    _worker_index = OpenerIndex.load(index_path)
+
+
+def _open_one(opener: Opener, index: OpenerIndex, signature) -> OpenResult:
+    valid, encoding = opener.open(signature)
+    if not valid:
+        return False, None, []
+    return True, encoding, list(index.lookup(encoding))
+
+
+def _open_chunk(chunk) -> List[OpenResult]:
+    return [_open_one(_worker_opener, _worker_index, signature) for signature in chunk]
+
+
+def _wire_fields(signature):
+    """只把验证和打开需要的字段发给工作进程（带撤销标签的签名还需要 epoch、T4、R6）"""
+    return {field: signature[field] for field in SIGNATURE_FIELDS + TAG_FIELDS + ("message",) if field in signature}
+
+
+def open_many(opener: Opener, index_path: str, signatures: Iterable, workers: Optional[int] = None,
+              chunk_size: int = 16, max_pending: Optional[int] = None) -> Iterator[OpenResult]:
+    """
+    逐个产出 (是否有效, A 的规范编码, 索引中的候选槽位)，顺序与输入一致
+    workers=0 时在当前进程内串行处理（便于调试和作为基准对照）
+    """
+    source = iter(signatures)
+    chunks = iter(lambda: [_wire_fields(sig) for sig in itertools.islice(source, chunk_size)], [])
+
+    if workers == 0:
+        index = OpenerIndex.load(index_path)
+        try:
+            for chunk in chunks:
+                for signature in chunk:
+                    yield _open_one(opener, index, signature)
+        finally:
+            index.close()
+        return
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(opener, index_path)) as pool:
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(_open_chunk, chunk))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,591 @@
+"""
+命令行批处理：对 JSONL 或二进制日志流式地签名、验证与打开
+
+    python cli.py bbs04 keygen     --store DIR
+    python cli.py bbs04 join       --store DIR [成员ID ...] [-i 每行一个ID的文件]
+    python cli.py bbs04 sign       --store DIR --member ID [--epoch E]   < 消息 > 签名
+    python cli.py bbs04 verify     --store DIR                            < 签名 > 结果
+    python cli.py bbs04 open       --store DIR                            < 签名 > 结果
+    python cli.py muo keygen       --store FILE [--params 参数集] 名字 ...
+    python cli.py muo delegate     --store FILE --from A [--to B] [--warrant W] -o 委托文件
+    python cli.py muo proxy-sign   --store FILE --delegation 委托文件    < 消息 > 签名
+    python cli.py muo verify       --store FILE --from A [--to B]         < 签名 > 结果
+
+记录格式（--format）：
+    jsonl   每行一个 JSON 对象。消息 {"message": 字符串[, "id", "member", "epoch"]}；
+            签名 {"signature": ...[, "id"]}（BBS04 为 signature_to_wire 的形式且附带消息，MUO 为 [R, s, K]
+            并另有 "message" 字段）；结果 {"valid"[, "member"]}。解析失败的记录输出 {"error": 原因}，不中断处理。
+            sign 的输出可以直接作为 verify / open 的输入，"id" 原样带到输出。
+    binary  消息为 4 字节大端长度 + 原始字节的帧；签名为定长编码首尾相接的签名日志
+            （BBS04 见 signature_codec，不含撤销标签；MUO 为 R、s、K 各占 p 的字节长度），
+            verify / open 从 --messages 按同样的顺序读取消息帧（签名是分离式的）；结果仍为 JSONL。
+
+输入逐条读取、按 --batch 条切块交给 --workers 个工作进程（0 表示在当前进程内处理），
+同时最多 --max-pending 块在途，结果严格按输入顺序写出：内存占用与输入总量无关。
+工作进程各自 mmap 加载密钥库，之后的任务只携带记录本身。
+结束时在标准错误上报告记录数、吞吐量与批延迟（提交到写出，按蓄水池抽样估计分位数）。
+有无效或无法解析的记录时退出码为 1。
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from bbs04 import GroupSignature
+from key_store import load_members, load_muo, load_opener, load_public_key, save_muo
+from muo import ProxySignatureProtected, ProxySignatureUnprotected, generate_key_pair, generate_system_params
+from nonces import int_to_octets
+from service import FRAME
+from signature_codec import SignatureCodec, signature_from_wire, signature_to_wire
+
+LATENCY_SAMPLES = 4096
+
+
+# -------------------------- 记录读写 --------------------------
+def read_frames(fh) -> Iterator[bytes]:
+    """4 字节大端长度 + 内容的帧，逐个读出"""
+    while True:
+        header = fh.read(FRAME.size)
+        if not header:
+            return
+        if len(header) < FRAME.size:
+            raise ValueError("帧头不完整")
+        (length,) = FRAME.unpack(header)
+        payload = fh.read(length)
+        if len(payload) < length:
+            raise ValueError("帧内容不完整")
+        yield payload
+
+
+def read_fixed(fh, size: int) -> Iterator[bytes]:
+    """定长记录（签名日志）逐个读出"""
+    while True:
+        record = fh.read(size)
+        if not record:
+            return
+        if len(record) < size:
+            raise ValueError(f"签名日志末尾不完整（{len(record)} / {size} 字节）")
+        yield record
+
+
+def _open_input(path: str, binary: bool):
+    if path == "-":
+        return sys.stdin.buffer if binary else io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    return open(path, "rb") if binary else open(path, encoding="utf-8")
+
+
+def _open_output(path: str, binary: bool):
+    if path == "-":
+        return sys.stdout.buffer if binary else io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8",
+                                                                write_through=False)
+    return open(path, "wb") if binary else open(path, "w", encoding="utf-8")
+
+
+def _lines(fh) -> Iterator[str]:
+    return (line for line in fh if line.strip())
+
+
+def _json_line(result: dict) -> str:
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _with_id(record: dict, result: dict) -> dict:
+    return {'id': record['id'], **result} if 'id' in record else result
+
+
+def _error(exc: Exception, record=None) -> dict:
+    """出错记录的结果；record 已解析为 JSON 对象时带上它的 id"""
+    result = {'error': f"{type(exc).__name__}: {exc}"}
+    return _with_id(record, result) if isinstance(record, dict) else result
+
+
+# -------------------------- 有界有序流水线 --------------------------
+class PipelineStats:
+    """记录数、耗时与批延迟；延迟只保留固定大小的蓄水池样本"""
+
+    def __init__(self):
+        self.records = 0
+        self.batches = 0
+        self.start = time.perf_counter()
+        self._samples: List[float] = []
+
+    def add(self, records: int, latency: float):
+        self.records += records
+        self.batches += 1
+        if len(self._samples) < LATENCY_SAMPLES:
+            self._samples.append(latency)
+        else:
+            slot = random.randrange(self.batches)
+            if slot < LATENCY_SAMPLES:
+                self._samples[slot] = latency
+
+    def report(self) -> str:
+        elapsed = time.perf_counter() - self.start
+        samples = sorted(self._samples) or [0.0]
+        p50 = samples[len(samples) // 2]
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return (f"{self.records} 条记录，{self.batches} 批，耗时 {elapsed:.2f} s，"
+                f"{self.records / elapsed if elapsed else 0:,.0f} 条/秒；"
+                f"批延迟 p50 {p50 * 1e3:.1f} ms，p99 {p99 * 1e3:.1f} ms")
+
+
+_state = None
+
+
+def _init_worker(setup: Callable, options: dict):
+    global _state
+    _state = setup(options)
+
+
+def _run_chunk(process: Callable, chunk: list) -> list:
+    return process(_state, chunk)
+
+
+def run_pipeline(setup: Callable, process: Callable, options: dict, records: Iterable, batch: int,
+                 workers: int, max_pending: Optional[int], stats: PipelineStats) -> Iterator:
+    """
+    records 按 batch 条切块，process(state, chunk) 在工作进程中处理（state 由 setup(options) 在每个进程建立一次），
+    逐条产出结果，顺序与输入一致；同时最多 max_pending 块在途
+    """
+    source = iter(records)
+    chunks = iter(lambda: list(itertools.islice(source, batch)), [])
+    if workers == 0:
+        state = setup(options)
+        for chunk in chunks:
+            start = time.perf_counter()
+            results = process(state, chunk)
+            stats.add(len(chunk), time.perf_counter() - start)
+            yield from results
+        return
+
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(setup, options)) as pool:
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append((time.perf_counter(), len(chunk), pool.submit(_run_chunk, process, chunk)))
+                if len(pending) >= max_pending:
+                    submitted, count, future = pending.popleft()
+                    results = future.result()
+                    stats.add(count, time.perf_counter() - submitted)
+                    yield from results
+            while pending:
+                submitted, count, future = pending.popleft()
+                results = future.result()
+                stats.add(count, time.perf_counter() - submitted)
+                yield from results
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+
+
+# -------------------------- BBS04 --------------------------
+def _require_member(members, member_id):
+    if member_id is not None and member_id not in members:
+        raise ValueError(f"签名成员 {member_id} 不存在")
+
+
+def _bbs04_signer(options: dict) -> dict:
+    """签名方只需要 public.bks 与 members.bks（成员私钥），不加载 issuer 私钥 γ"""
+    public_key = load_public_key(options['store'])
+    members = load_members(options['store'], public_key.group, public_key.fingerprint)
+    _require_member(members, options['member'])
+    return {'public_key': public_key, 'members': members, 'pairings': {},
+            'codec': SignatureCodec(public_key.group)}
+
+
+def _bbs04_sign_one(state: dict, member_id, message, epoch: Optional[str]) -> dict:
+    """成员私钥签名：e(A_i, P2) 按槽位缓存，其余与 GroupSignature.sign 相同"""
+    public_key, members = state['public_key'], state['members']
+    if member_id not in members:
+        raise ValueError(f"成员 {member_id} 不存在")
+    member = members[member_id]
+    e_A = state['pairings'].get(member.slot)
+    if e_A is None:
+        e_A = state['pairings'][member.slot] = public_key.group.pairing(member.A_i, public_key.g2('P2'))
+    return public_key.respond(public_key.commit(member_id, member.A_i, member.x_i, e_A, epoch), message)
+
+
+def _bbs04_sign(state: dict, records: list) -> list:
+    codec, options = state['codec'], state['options']
+    group = state['public_key'].group
+    results = []
+    for record in records:
+        try:
+            if options['format'] == "binary":
+                results.append(codec.encode(_bbs04_sign_one(state, options['member'], record, options['epoch'])))
+                continue
+            record = json.loads(record)
+            signature = _bbs04_sign_one(state, record.get('member', options['member']), record['message'],
+                                        record.get('epoch', options['epoch']))
+            results.append(_with_id(record, {'signature': signature_to_wire(group, signature)}))
+        except (KeyError, TypeError, ValueError, AttributeError) as exc:
+            results.append(_error(exc, record))
+    return results
+
+
+def _bbs04_verifier(options: dict) -> dict:
+    public_key = load_public_key(options['store'])
+    return {'public_key': public_key, 'group': public_key.group, 'codec': SignatureCodec(public_key.group)}
+
+
+def _bbs04_parse(state: dict, record) -> Tuple[Optional[dict], object, dict]:
+    """(签名, 分离式签名的消息, 原始记录)；解析或解码失败时签名为 None、消息为异常"""
+    raw: object = {}
+    try:
+        if isinstance(record, tuple):
+            message, data = record
+            return state['codec'].decode(data), message, {}
+        raw = json.loads(record)
+        return signature_from_wire(state['group'], raw['signature']), None, raw
+    except (KeyError, TypeError, ValueError, AttributeError) as exc:
+        return None, exc, raw if isinstance(raw, dict) else {}
+
+
+def _bbs04_verify(state: dict, records: list) -> list:
+    public_key = state['public_key']
+    parsed = [_bbs04_parse(state, record) for record in records]
+    results: list = [None] * len(parsed)
+    batch = [index for index, (signature, _, _) in enumerate(parsed) if signature is not None]
+    if batch:
+        # 同一块的记录格式相同：JSONL 签名自带消息，二进制日志的消息是分离的
+        detached = [parsed[index][1] for index in batch]
+        bad = set(public_key.verify_batch([parsed[index][0] for index in batch],
+                                          messages=None if detached[0] is None else detached))
+        for position, index in enumerate(batch):
+            results[index] = position not in bad
+    for index, (signature, message, record) in enumerate(parsed):
+        results[index] = (_error(message, record) if signature is None
+                          else _with_id(record, {'valid': results[index]}))
+    return results
+
+
+def _bbs04_opener(options: dict) -> dict:
+    """追踪方只加载 public.bks、opener.bks 与 members.bks（key_store.load_opener），不接触 issuer 私钥 γ"""
+    opener, members = load_opener(options['store'])
+    group = opener.public_key.group
+    return {'opener': opener, 'members': members, 'group': group, 'codec': SignatureCodec(group)}
+
+
+def _bbs04_open(state: dict, records: list) -> list:
+    opener, members, group = state['opener'], state['members'], state['group']
+    results = []
+    for record in records:
+        signature, message, raw = _bbs04_parse(state, record)
+        if signature is None:
+            results.append(_error(message, raw))
+            continue
+        valid = opener.public_key.verify(signature, message)
+        member = members.find(group.g1_to_bytes(opener.recover(signature))) if valid else None
+        results.append(_with_id(raw, {'valid': valid, 'member': member}))
+    return results
+
+
+# -------------------------- MUO --------------------------
+def _muo_width(params: dict) -> int:
+    return (int(params['p']).bit_length() + 7) // 8
+
+
+def _muo_signer(options: dict) -> dict:
+    params, _ = load_muo(options['store'])
+    with open(options['delegation'], encoding="utf-8") as fh:
+        delegation = json.load(fh)
+    protected = delegation['scheme'] == "protected"
+    scheme = (ProxySignatureProtected if protected else ProxySignatureUnprotected)(params)
+    return {'scheme': scheme, 'key': delegation['delta_bar' if protected else 'delta'], 'K': delegation['K'],
+            'width': _muo_width(params)}
+
+
+def _muo_sign(state: dict, records: list) -> list:
+    options, p = state['options'], state['scheme'].p
+    if options['format'] == "binary":
+        signatures = state['scheme'].sign_many(state['key'], state['K'], records)
+        return [b"".join(int_to_octets(value, p) for value in signature[:3]) for signature in signatures]
+    parsed, results = [], []
+    for record in records:
+        try:
+            record = json.loads(record)
+            if not isinstance(record['message'], str):
+                raise TypeError("message 应为字符串")
+            parsed.append(record)
+        except (KeyError, TypeError, ValueError, AttributeError) as exc:
+            parsed.append(_error(exc, record))
+    valid = [record for record in parsed if 'error' not in record]
+    signatures = iter(state['scheme'].sign_many(state['key'], state['K'], [record['message'] for record in valid]))
+    for record in parsed:
+        if 'error' in record:
+            results.append(record)
+        else:
+            results.append(_with_id(record, {'signature': list(next(signatures)[:3]),
+                                             'message': record['message']}))
+    return results
+
+
+def _muo_verifier(options: dict) -> dict:
+    params, keys = load_muo(options['store'])
+    y_A = keys[options['from_']][1]
+    y_B = keys[options['to']][1] if options['to'] else None
+    scheme = ProxySignatureProtected(params) if y_B is not None else ProxySignatureUnprotected(params)
+    return {'scheme': scheme, 'y_A': y_A, 'y_B': y_B, 'width': _muo_width(params)}
+
+
+def _muo_verify(state: dict, records: list) -> list:
+    scheme, width = state['scheme'], state['width']
+    parsed = []
+    for record in records:
+        try:
+            if isinstance(record, tuple):
+                message, data = record
+                signature = tuple(int.from_bytes(data[i * width:(i + 1) * width], "big") for i in range(3))
+                parsed.append((signature, message, {}))
+                continue
+            record = json.loads(record)
+            signature = tuple(int(value) for value in record['signature'])
+            if len(signature) != 3 or not isinstance(record['message'], str):
+                raise ValueError("签名应为 [R, s, K]，消息应为字符串")
+            parsed.append((signature, record['message'], record))
+        except (KeyError, TypeError, ValueError, AttributeError) as exc:
+            parsed.append((None, exc, record if isinstance(record, dict) else {}))
+    valid = [index for index, (signature, _, _) in enumerate(parsed) if signature is not None]
+    signatures = [parsed[index][0] for index in valid]
+    messages = [parsed[index][1] for index in valid]
+    bad = set()
+    if valid:
+        if state['y_B'] is None:
+            _, bad = scheme.verify_batch(signatures, state['y_A'], messages)
+        else:
+            _, bad = scheme.verify_batch(signatures, state['y_A'], state['y_B'], messages)
+        bad = {valid[position] for position in bad}
+    return [_error(message, record) if signature is None else _with_id(record, {'valid': index not in bad})
+            for index, (signature, message, record) in enumerate(parsed)]
+
+
+# -------------------------- 子命令 --------------------------
+class _SetupWithOptions:
+    """把命令行选项放进工作进程的 state（可 pickle，发送给进程池的 initializer）"""
+
+    def __init__(self, setup: Callable):
+        self.setup = setup
+
+    def __call__(self, options: dict) -> dict:
+        state = self.setup(options)
+        state['options'] = options
+        return state
+
+
+def _stream(args, setup: Callable, process: Callable, records: Iterable, binary_output: bool = False) -> int:
+    """运行流水线并写出结果；返回无效或出错的记录数"""
+    options = {key: value for key, value in vars(args).items() if not callable(value)}
+    stats = PipelineStats()
+    failed = 0
+    out = _open_output(args.output, binary_output)
+    try:
+        for result in run_pipeline(_SetupWithOptions(setup), process, options, records, args.batch,
+                                   args.workers, args.max_pending, stats):
+            if isinstance(result, bytes):
+                out.write(result)
+                continue
+            failed += 'error' in result or result.get('valid') is False
+            if binary_output:
+                # 二进制签名日志里没有放错误的位置：出错的记录报告在标准错误上，不写入日志
+                sys.stderr.write(_json_line(result))
+            else:
+                out.write(_json_line(result))
+        out.flush()
+    finally:
+        if args.output != "-":
+            out.close()
+    if not args.quiet:
+        print(stats.report(), file=sys.stderr)
+    return failed
+
+
+def _signature_records(args, signature_size: Callable[[], int]) -> Iterable:
+    """verify / open 的输入：JSONL 行，或 (消息, 定长签名) 对"""
+    fh = _open_input(args.input, args.format == "binary")
+    if args.format == "jsonl":
+        return _lines(fh)
+    if not args.messages:
+        raise SystemExit("二进制签名日志须用 --messages 给出消息帧文件")
+    return _paired_records(args.messages, fh, signature_size())
+
+
+def _paired_records(messages_path: str, fh, size: int) -> Iterator[Tuple[bytes, bytes]]:
+    """消息帧文件与签名日志按顺序配对；消息文件在读完或流水线结束时关闭"""
+    with open(messages_path, "rb") as messages:
+        yield from zip(read_frames(messages), read_fixed(fh, size))
+
+
+def cmd_bbs04_keygen(args) -> int:
+    gs = GroupSignature(backend=args.backend)
+    gs.save(args.store)
+    print(f"群密钥已写入 {args.store}", file=sys.stderr)
+    return 0
+
+
+def cmd_bbs04_join(args) -> int:
+    gs = GroupSignature.load(args.store)
+    ids = iter(args.ids)
+    if args.input:
+        fh = _open_input(args.input, False)
+        ids = itertools.chain(ids, (line.strip() for line in _lines(fh)))
+    joined = 0
+    for chunk in iter(lambda: list(itertools.islice(ids, args.batch)), []):
+        gs.join_many(chunk)
+        joined += len(chunk)
+    gs.save(args.store)
+    print(f"加入 {joined} 个成员，共 {len(gs.members)} 个", file=sys.stderr)
+    return 0
+
+
+def cmd_bbs04_sign(args) -> int:
+    if args.format == "binary":
+        if args.epoch or not args.member:
+            raise SystemExit("二进制格式须用 --member 指定签名成员，且定长签名不包含撤销标签（不能用 --epoch）")
+        records = read_frames(_open_input(args.input, True))
+    else:
+        records = _lines(_open_input(args.input, False))
+    # 工作进程建立时同样检查；先在这里检查，进程池里的初始化失败只会表现为 BrokenProcessPool
+    public_key = load_public_key(args.store)
+    try:
+        _require_member(load_members(args.store, public_key.group, public_key.fingerprint), args.member)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from None
+    return 1 if _stream(args, _bbs04_signer, _bbs04_sign, records, args.format == "binary") else 0
+
+
+def _bbs04_signature_size(args) -> int:
+    return SignatureCodec(load_public_key(args.store).group).size
+
+
+def cmd_bbs04_verify(args) -> int:
+    records = _signature_records(args, lambda: _bbs04_signature_size(args))
+    return 1 if _stream(args, _bbs04_verifier, _bbs04_verify, records) else 0
+
+
+def cmd_bbs04_open(args) -> int:
+    records = _signature_records(args, lambda: _bbs04_signature_size(args))
+    return 1 if _stream(args, _bbs04_opener, _bbs04_open, records) else 0
+
+
+def cmd_muo_keygen(args) -> int:
+    params = generate_system_params(args.params)
+    save_muo(args.store, params, {name: generate_key_pair(params) for name in args.names})
+    print(f"参数集 {args.params} 与 {len(args.names)} 个密钥对已写入 {args.store}", file=sys.stderr)
+    return 0
+
+
+def cmd_muo_delegate(args) -> int:
+    params, keys = load_muo(args.store)
+    x_A, y_A = keys[args.from_]
+    delegation = {'scheme': "protected" if args.to else "unprotected", 'from': args.from_, 'to': args.to}
+    if args.to:
+        x_B, y_B = keys[args.to]
+        delta, delta_bar, K, _ = ProxySignatureProtected(params).delegate(x_A, y_A, x_B, y_B, args.warrant)
+        delegation.update(delta=delta, delta_bar=delta_bar, K=K)
+    else:
+        delta, K, _ = ProxySignatureUnprotected(params).delegate(x_A, y_A, args.warrant)
+        delegation.update(delta=delta, K=K)
+    # 委托文件含 δ（或 δ̄），与密钥库一样只允许所有者读写
+    tmp = args.output + ".tmp"
+    with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as fh:
+        json.dump(delegation, fh)
+    os.replace(tmp, args.output)
+    print(f"{delegation['scheme']} 委托 {args.from_} -> {args.to or '代理人'} 已写入 {args.output}", file=sys.stderr)
+    return 0
+
+
+def cmd_muo_proxy_sign(args) -> int:
+    if args.format == "binary":
+        records = read_frames(_open_input(args.input, True))
+    else:
+        records = _lines(_open_input(args.input, False))
+    return 1 if _stream(args, _muo_signer, _muo_sign, records, args.format == "binary") else 0
+
+
+def cmd_muo_verify(args) -> int:
+    records = _signature_records(args, lambda: 3 * _muo_width(load_muo(args.store)[0]))
+    return 1 if _stream(args, _muo_verifier, _muo_verify, records) else 0
+
+
+def _stream_options(parser: argparse.ArgumentParser, messages: bool = False):
+    parser.add_argument("-i", "--input", default="-", help="输入文件，- 为标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，- 为标准输出")
+    parser.add_argument("--format", choices=("jsonl", "binary"), default="jsonl", help="记录格式")
+    if messages:
+        parser.add_argument("--messages", help="二进制格式下与签名日志一一对应的消息帧文件")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="工作进程数，0 表示在当前进程内处理")
+    parser.add_argument("--batch", type=int, default=64, help="每块记录数")
+    parser.add_argument("--max-pending", type=int, default=None, help="同时在途的块数，默认 2×workers")
+    parser.add_argument("--quiet", action="store_true", help="不在标准错误上报告吞吐量与延迟")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="BBS04 群签名与 MUO 代理签名的批处理命令行")
+    schemes = parser.add_subparsers(dest="scheme", required=True)
+
+    bbs04 = schemes.add_parser("bbs04", help="BBS04 群签名").add_subparsers(dest="command", required=True)
+    keygen = bbs04.add_parser("keygen", help="生成群密钥并写入密钥库目录")
+    keygen.add_argument("--store", required=True)
+    keygen.add_argument("--backend", default="auto", help="配对群后端（auto / gmpy2 / python）")
+    keygen.set_defaults(func=cmd_bbs04_keygen)
+    join = bbs04.add_parser("join", help="加入成员")
+    join.add_argument("--store", required=True)
+    join.add_argument("ids", nargs="*", help="成员 ID")
+    join.add_argument("-i", "--input", help="每行一个成员 ID 的文件，- 为标准输入")
+    join.add_argument("--batch", type=int, default=4096, help="每批加入的成员数")
+    join.set_defaults(func=cmd_bbs04_join)
+    sign = bbs04.add_parser("sign", help="对消息流签名")
+    sign.add_argument("--store", required=True)
+    sign.add_argument("--member", help="签名成员（jsonl 记录中的 member 优先）")
+    sign.add_argument("--epoch", help="附带该 epoch 的撤销标签（仅 jsonl）")
+    _stream_options(sign)
+    sign.set_defaults(func=cmd_bbs04_sign)
+    for name, func, text in (("verify", cmd_bbs04_verify, "验证签名流（只需 public.bks）"),
+                             ("open", cmd_bbs04_open, "验证并打开签名流")):
+        command = bbs04.add_parser(name, help=text)
+        command.add_argument("--store", required=True)
+        _stream_options(command, messages=True)
+        command.set_defaults(func=func)
+
+    muo = schemes.add_parser("muo", help="MUO 代理签名").add_subparsers(dest="command", required=True)
+    keygen = muo.add_parser("keygen", help="生成系统参数与命名密钥对")
+    keygen.add_argument("--store", required=True)
+    keygen.add_argument("--params", default="demo", help="参数集（demo 或 muo_params 中的名字）")
+    keygen.add_argument("names", nargs="+", help="用户名")
+    keygen.set_defaults(func=cmd_muo_keygen)
+    delegate = muo.add_parser("delegate", help="原始签名人委托代理人（给出 --to 时为保护代理）")
+    delegate.add_argument("--store", required=True)
+    delegate.add_argument("--from", dest="from_", required=True, help="原始签名人")
+    delegate.add_argument("--to", help="代理人（保护代理）")
+    delegate.add_argument("--warrant", default="", help="委托说明")
+    delegate.add_argument("-o", "--output", required=True, help="委托文件（含 δ，权限 0600）")
+    delegate.set_defaults(func=cmd_muo_delegate)
+    proxy_sign = muo.add_parser("proxy-sign", help="用委托对消息流做代理签名")
+    proxy_sign.add_argument("--store", required=True)
+    proxy_sign.add_argument("--delegation", required=True)
+    _stream_options(proxy_sign)
+    proxy_sign.set_defaults(func=cmd_muo_proxy_sign)
+    verify = muo.add_parser("verify", help="验证代理签名流（给出 --to 时为保护代理）")
+    verify.add_argument("--store", required=True)
+    verify.add_argument("--from", dest="from_", required=True, help="原始签名人")
+    verify.add_argument("--to", help="代理人（保护代理）")
+    _stream_options(verify, messages=True)
+    verify.set_defaults(func=cmd_muo_verify)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
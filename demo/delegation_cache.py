@@ -0,0 +1,145 @@
+"""
+已验证委托的缓存：验证方反复见到同一批委托 (y_A, K[, y_B])，与委托有关的运算只做一次
+
+    cache = DelegationCache(params)
+    scheme = ProxySignatureUnprotected(params, cache=cache)
+    scheme.verify(signature, y_A, message)      # 第二次起不再计算 K^K、y_B^{y_B} 与 v
+    cache.stats()                               # {'hits', 'misses', 'evictions', 'size', 'maxsize'}
+
+每个条目保存 v = y_A·K^K[·y_B^{y_B}]、v 的指数可以约化到的模数（v^q ≡ 1 时为 q，否则为 p-1），
+以及 v 的固定基窗口表：验证等式右侧的 v^R 原本是 p 长度的指数，命中后只剩 ⌈log₂q / w⌉ 次模乘；
+g 的固定基表整个缓存共用一张（g^m、g^δ）。模数不超过 multiexp.SMALL_MODULUS_BITS 时
+内建 pow 比 Python 层查表更快，不建表，只缓存 v 与约化模数。
+
+容量有界，按最近使用淘汰（LRU）；查找、插入与计数在锁内完成，可被多个验证线程共享。
+未命中时在锁外构造条目，两个线程同时未命中同一委托时各算一次，只保留先插入的那个。
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from multiexp import SMALL_MODULUS_BITS, multi_pow_mod
+from muo import exponent_order
+
+
+class FixedBasePowTable:
+    """
+    Z_p^* 固定基窗口表：table[i][d-1] = x^{d·2^{w·i}} mod p
+    x^e（e < 2^bits）只需 ⌈bits/w⌉ 次模乘，不再需要平方
+    """
+
+    def __init__(self, base: int, modulus: int, bits: int, window: int = 4):
+        self.base = base
+        self.modulus = modulus
+        self.window = window
+        self.table = []
+        point = base % modulus
+        for _ in range(-(-bits // window)):
+            row = [point]
+            for _ in range((1 << window) - 2):
+                row.append(row[-1] * point % modulus)
+            self.table.append(row)
+            point = row[-1] * point % modulus  # x^{2^{w(i+1)}}
+
+    def pow(self, e: int) -> int:
+        """e 须已约化到 2^bits 以内（调用方按元素的阶约化）"""
+        p = self.modulus
+        w = self.window
+        mask = (1 << w) - 1
+        acc = 1
+        for row in self.table:
+            digit = e & mask
+            if digit:
+                acc = acc * row[digit - 1] % p
+            e >>= w
+            if not e:
+                break
+        return acc
+
+
+class DelegationEntry:
+    """一个委托的验证数据：v、v 的指数约化模数与固定基表（小模数时为 None）"""
+
+    __slots__ = ('v', 'order', 'table')
+
+    def __init__(self, v: int, order: int, table: Optional[FixedBasePowTable]):
+        self.v = v
+        self.order = order
+        self.table = table
+
+    def pow(self, e: int, p: int) -> int:
+        """v^e mod p"""
+        e %= self.order
+        return self.table.pow(e) if self.table is not None else pow(self.v, e, p)
+
+
+class DelegationCache:
+    """以 (y_A, K) 或 (y_A, K, y_B) 为键的有界 LRU 缓存，绑定一组系统参数"""
+
+    def __init__(self, params: Dict[str, int], maxsize: int = 128, window: int = 4):
+        if maxsize < 1:
+            raise ValueError(f"缓存容量须为正数: {maxsize}")
+        self.p, self.q, self.g = params["p"], params["q"], params["g"]
+        self.order = exponent_order(self.p, self.q, self.g)
+        self.maxsize = maxsize
+        self.window = window
+        self._tables = int(self.p).bit_length() > SMALL_MODULUS_BITS
+        self._g_table = FixedBasePowTable(self.g, self.p, self.order.bit_length(), window) if self._tables else None
+        self._entries: "OrderedDict[Tuple[int, ...], DelegationEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def matches(self, p: int, q: int, g: int) -> bool:
+        return (self.p, self.q, self.g) == (p, q, g)
+
+    def g_pow(self, e: int) -> int:
+        """g^e mod p，指数按 g 的阶约化后查 g 的固定基表"""
+        e %= self.order
+        return self._g_table.pow(e) if self._g_table is not None else pow(self.g, e, self.p)
+
+    def entry(self, y_A: int, K: int, y_B: Optional[int] = None) -> DelegationEntry:
+        """取出（或计算并插入）委托的验证数据；不保护代理与委托验证用 (y_A, K)，保护代理的签名验证另带 y_B"""
+        key = (y_A, K) if y_B is None else (y_A, K, y_B)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = self._build(key)
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            self._entries[key] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def _build(self, key: Tuple[int, ...]) -> DelegationEntry:
+        p = self.p
+        # v = y_A · K^K [· y_B^{y_B}]：键的第一项指数为 1，其余各项以自身为指数
+        v = multi_pow_mod(key, (1,) + key[1:], p)
+        # v 落在 q 阶子群时指数可以按 q 约化（诚实的 y_A、K、y_B 都在子群中），否则只能按 p-1
+        order = self.q if pow(v, self.q, p) == 1 else p - 1
+        table = FixedBasePowTable(v, p, order.bit_length(), self.window) if self._tables else None
+        return DelegationEntry(v, order, table)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def clear(self):
+        """清空条目（计数保留）"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,275 @@
+"""
+群运算、配对与哈希的调用计数（可选开启）
+
+    import instrumentation
+    instrumentation.enable()
+    gs.sign(...); gs.verify(...)
+    instrumentation.snapshot()                      # {'primitives': {...}, 'operations': {...}}
+    instrumentation.write_prometheus("groupsig.prom")
+    instrumentation.disable()
+
+enable() 给下列原语套上计数包装，disable() 换回原来的函数，关闭时没有任何额外开销：
+    PairingGroup      G1/G2 加法与标量乘、多标量乘、配对与 Miller 循环、GT 乘法与幂、
+                      Z_r 求逆与批量求逆、hash_to_zr / hash_to_g1、点与 GT 元素的编码
+    固定基表          FixedBaseTable.mul / mul_many、GTFixedBaseTable.pow、FixedBasePowTable.pow（Z_p^*）
+    muo 模块          模幂 pow、多幂 multi_pow_mod、模逆与批量求逆、消息哈希、Jacobi 符号
+    nonces 模块       HMAC（派生签名随机数）
+每次调用记下次数、元素个数（批量原语为批大小，其余为 1）与耗时；原语内部再调用的原语不重复计数，
+所以耗时之和不会超过实际耗时。Python 表达式里内联的模乘（a * b % p）不在统计之内。
+
+按操作归类依靠 tracing 的阶段：一次原语调用记到当前所在的每一个阶段上（bbs04.sign 包含
+bbs04.sign.commit 的计数），各阶段还记下自身的调用次数与耗时。只统计本进程，
+进程池中的工作进程（open_many、签名服务）需要在各自进程里开启。
+"""
+import builtins
+import os
+import threading
+import time
+from functools import wraps
+from typing import Dict, List, Optional
+
+import muo
+import nonces
+import tracing
+from delegation_cache import FixedBasePowTable
+from pairing_group import FixedBaseTable, GTFixedBaseTable, PairingGroup
+
+# ([所属类,] 属性名, 原语名, 批量参数的位置)；批量参数位置为 None 时元素个数记 1
+PAIRING_PRIMITIVES = (
+    ('g1_add', 'g1_add', None), ('g1_sub', 'g1_sub', None), ('g1_neg', 'g1_neg', None),
+    ('g1_mul', 'g1_mul', None), ('g1_multi_mul', 'g1_multi_mul', 0),
+    ('g1_is_on_curve', 'g1_is_on_curve', None), ('hash_to_g1', 'hash_to_g1', None),
+    ('g1_to_bytes', 'g1_encode', None), ('g1_from_bytes', 'g1_decode', None),
+    ('g2_add', 'g2_add', None), ('g2_mul', 'g2_mul', None), ('hash_to_g2', 'hash_to_g2', None),
+    ('prepare_g2', 'prepare_g2', None), ('miller_loop', 'miller_loop', 0),
+    ('pairing', 'pairing', None), ('multi_pairing', 'pairing', 0),
+    ('gt_mul', 'gt_mul', None), ('gt_inv', 'gt_inv', None), ('gt_pow', 'gt_pow', None),
+    ('gt_multi_pow', 'gt_multi_pow', 0), ('gt_to_bytes', 'gt_encode', None), ('gt_from_bytes', 'gt_decode', None),
+    ('hash_to_zr', 'hash_to_zr', None), ('zr_inv', 'zr_inv', None), ('zr_batch_inv', 'zr_batch_inv', 0),
+)
+TABLE_PRIMITIVES = (
+    (FixedBaseTable, 'mul', 'g1_mul_fixed', None), (FixedBaseTable, 'mul_many', 'g1_mul_fixed', 0),
+    (GTFixedBaseTable, 'pow', 'gt_pow_fixed', None), (FixedBasePowTable, 'pow', 'modexp_fixed', None),
+)
+MUO_PRIMITIVES = (
+    ('pow', 'modexp', None), ('multi_pow_mod', 'multi_modexp', 0), ('mod_inverse', 'mod_inverse', None),
+    ('batch_inverse', 'batch_inverse', 0), ('hash_message', 'hash', None), ('_digest', 'hash', None),
+    ('_digests', 'hash', 0), ('jacobi', 'jacobi', None),
+)
+NONCE_PRIMITIVES = ((nonces.HmacDrbg, '_mac', 'hmac', None),)
+
+PROMETHEUS_PREFIX = "groupsig"
+
+
+class _Counters:
+    """计数器与阶段观察者：线程各自维护阶段栈与原语嵌套深度，计数写入时加锁"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.primitives: Dict[str, List] = {}  # 原语 -> [次数, 元素个数, 秒]
+        self.operations: Dict[str, dict] = {}  # 阶段 -> {'calls', 'seconds', 'primitives': {原语: [...]}}
+
+    def _state(self):
+        local = self.local
+        if not hasattr(local, 'stack'):
+            local.stack = []
+            local.depth = 0
+        return local
+
+    # ---- tracing 阶段观察者 ----
+    def enter(self, name: str):
+        self._state().stack.append(name)
+
+    def exit(self, name: str, seconds: float):
+        stack = self._state().stack
+        if stack and stack[-1] == name:
+            stack.pop()
+        with self.lock:
+            entry = self.operations.setdefault(name, {'calls': 0, 'seconds': 0.0, 'primitives': {}})
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+
+    # ---- 原语计数 ----
+    def wrap(self, func, primitive: str, batch_arg: Optional[int]):
+        counters = self
+
+        @wraps(func)
+        def counted(*args, **kwargs):
+            state = counters._state()
+            if state.depth:
+                return func(*args, **kwargs)
+            state.depth = 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                state.depth = 0
+                items = 1
+                if batch_arg is not None:
+                    try:
+                        items = len(args[batch_arg])
+                    except (IndexError, TypeError):
+                        pass
+                counters.record(primitive, items, elapsed, state.stack)
+
+        counted.__wrapped_primitive__ = func
+        return counted
+
+    def record(self, primitive: str, items: int, seconds: float, stack: List[str]):
+        with self.lock:
+            entry = self.primitives.setdefault(primitive, [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += items
+            entry[2] += seconds
+            for name in set(stack):
+                operation = self.operations.setdefault(name, {'calls': 0, 'seconds': 0.0, 'primitives': {}})
+                entry = operation['primitives'].setdefault(primitive, [0, 0, 0.0])
+                entry[0] += 1
+                entry[1] += items
+                entry[2] += seconds
+
+    def reset(self):
+        with self.lock:
+            self.primitives.clear()
+            self.operations.clear()
+
+
+_counters = _Counters()
+_patched = []  # (对象, 属性名, 原值；None 表示原本不存在)
+
+
+def _patch(target, attr: str, primitive: str, batch_arg: Optional[int], method: bool):
+    # muo 里的 pow 是内置函数：在模块命名空间放一个同名包装即可拦截，关闭时删除
+    original = vars(target).get(attr)
+    func = original if original is not None else getattr(builtins, attr)
+    # 方法的第 0 个参数是 self，批量参数位置顺延一位
+    wrapped = _counters.wrap(func, primitive, None if batch_arg is None else batch_arg + (1 if method else 0))
+    setattr(target, attr, wrapped)
+    _patched.append((target, attr, original))
+
+
+def enabled() -> bool:
+    return bool(_patched)
+
+
+def enable():
+    """安装计数包装并开始按阶段归类（重复调用无效果）"""
+    if _patched:
+        return
+    for attr, primitive, batch_arg in PAIRING_PRIMITIVES:
+        _patch(PairingGroup, attr, primitive, batch_arg, True)
+    for cls, attr, primitive, batch_arg in TABLE_PRIMITIVES + NONCE_PRIMITIVES:
+        _patch(cls, attr, primitive, batch_arg, True)
+    for attr, primitive, batch_arg in MUO_PRIMITIVES:
+        _patch(muo, attr, primitive, batch_arg, False)
+    tracing.set_phase_observer(_counters)
+
+
+def disable():
+    """换回原来的函数（已有的计数保留，直到 reset）"""
+    tracing.set_phase_observer(None)
+    while _patched:
+        target, attr, original = _patched.pop()
+        if original is None:
+            delattr(target, attr)
+        else:
+            setattr(target, attr, original)
+
+
+def reset():
+    _counters.reset()
+
+
+class instrumented:
+    """with instrumented() as counters: ... 期间开启计数，退出时关闭；counters.snapshot() 取结果"""
+
+    def __enter__(self):
+        self.was_enabled = enabled()
+        enable()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.was_enabled:
+            disable()
+        return False
+
+    @staticmethod
+    def snapshot() -> dict:
+        return snapshot()
+
+
+def _entry(values: List) -> dict:
+    calls, items, seconds = values
+    return {'calls': calls, 'items': items, 'seconds': seconds}
+
+
+def snapshot() -> dict:
+    """
+    当前计数的副本：
+        {'primitives': {原语: {'calls', 'items', 'seconds'}},
+         'operations': {阶段: {'calls', 'seconds', 'primitives': {原语: {'calls', 'items', 'seconds'}}}}}
+    """
+    with _counters.lock:
+        return {
+            'primitives': {name: _entry(values) for name, values in sorted(_counters.primitives.items())},
+            'operations': {
+                name: {'calls': entry['calls'], 'seconds': entry['seconds'],
+                       'primitives': {p: _entry(v) for p, v in sorted(entry['primitives'].items())}}
+                for name, entry in sorted(_counters.operations.items())
+            },
+        }
+
+
+def per_call(data: Optional[dict] = None) -> Dict[str, Dict[str, float]]:
+    """每个阶段平均每次调用的原语次数 {阶段: {原语: 次数}}，用于核对缓存与批处理是否减少了运算"""
+    data = data or snapshot()
+    return {name: {p: v['calls'] / entry['calls'] for p, v in entry['primitives'].items()}
+            for name, entry in data['operations'].items() if entry['calls']}
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(data: Optional[dict] = None) -> str:
+    """Prometheus 文本格式（计数器，按原语与阶段打标签）"""
+    data = data or snapshot()
+    prefix = PROMETHEUS_PREFIX
+    lines = []
+
+    def family(name: str, help_text: str, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        for labels, value in samples:
+            rendered = ",".join(f'{key}="{_label(val)}"' for key, val in labels)
+            lines.append(f"{prefix}_{name}{{{rendered}}} {value}")
+
+    primitives = data['primitives'].items()
+    family("primitive_calls_total", "Primitive calls in this process.",
+           [((('primitive', p),), v['calls']) for p, v in primitives])
+    family("primitive_items_total", "Elements processed by primitive calls (batch size for batched primitives).",
+           [((('primitive', p),), v['items']) for p, v in primitives])
+    family("primitive_seconds_total", "Time spent in primitive calls.",
+           [((('primitive', p),), repr(v['seconds'])) for p, v in primitives])
+
+    operations = data['operations'].items()
+    family("operation_calls_total", "Completed operations (tracing phases).",
+           [((('operation', o),), e['calls']) for o, e in operations])
+    family("operation_seconds_total", "Time spent in operations (tracing phases).",
+           [((('operation', o),), repr(e['seconds'])) for o, e in operations])
+    nested = [(o, p, v) for o, e in operations for p, v in e['primitives'].items()]
+    family("operation_primitive_calls_total", "Primitive calls made inside an operation, nested phases included.",
+           [((('operation', o), ('primitive', p)), v['calls']) for o, p, v in nested])
+    family("operation_primitive_seconds_total", "Time spent in primitives inside an operation.",
+           [((('operation', o), ('primitive', p)), repr(v['seconds'])) for o, p, v in nested])
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str, data: Optional[dict] = None):
+    """原子地写出 Prometheus 文本文件（可供 node_exporter 的 textfile 收集器读取）"""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(prometheus_text(data))
+    os.replace(tmp, path)
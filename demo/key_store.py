@@ -0,0 +1,307 @@
+"""
+版本化的密钥库：打开即用，进程重启时不再生成密钥、重建预计算表或逐个解码成员
+
+一个 BBS04 密钥库是一个目录，按角色分文件，部署时只分发需要的部分：
+    public.bks    群公钥、G1 固定基表、G2 的 Miller 循环直线、配对常量及其 GT 固定基表（验证方）
+    opener.bks    opener 私钥 (ξ₁, ξ₂)
+    issuer.bks    issuer 私钥 γ、已撤销成员的 x_i、批量加入用的宽窗口 P 表
+    members.bks   成员登记表的四列：A_i 坐标、x_i、成员 ID、opener 索引
+私钥文件（opener、issuer、members、MUO 密钥对）以 0600 权限创建。
+
+文件格式（大端）：
+    文件头   magic "BBSKSTOR"、格式版本、文件种类、群公钥指纹、段数、段表的 SHA-256
+    段表     每段一条：段名、偏移、长度、段数据的 SHA-256
+    段数据   按 64 字节对齐，与内存中的定长布局相同
+打开文件时 mmap 并校验文件头与段表，每段在第一次取用时校验 SHA-256（verify=False 跳过，用于可信的本地文件）；
+同一目录下各文件的公钥指纹必须一致，混用不同群（或撤销前后）的文件会被拒绝。
+段以只读 memoryview 交给使用方：成员登记表与 opener 索引直接在 mmap 上查找，
+固定基表在第一次查表时才把坐标解码成整数（pairing_group._StoredTable），其余部分只有几十字节。
+
+MUO 一侧用同样的文件格式保存系统参数与命名密钥对（save_muo / load_muo），
+加载时既不生成参数，也不再做 Miller–Rabin 复查（完整性由 SHA-256 保证）。
+"""
+import hashlib
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from bbs04 import GT_CONSTANTS, KEY_G1, KEY_G2, JOIN_WINDOW, GroupPublicKey, GroupSignature, Opener
+from member_registry import MemberRegistry, StoredIds, encode_ids
+from nonces import int_to_octets
+from pairing_group import FixedBaseTable, GTFixedBaseTable, PairingGroup
+
+STORE_MAGIC = b"BBSKSTOR"
+STORE_VERSION = 1
+HEADER = struct.Struct(">8sH8s16sI2x32s")  # magic, 版本, 文件种类, 群公钥指纹, 段数, 段表的 SHA-256
+SECTION = struct.Struct(">32sQQ32s")  # 段名, 偏移, 长度, 段数据的 SHA-256
+ALIGNMENT = 64
+
+PUBLIC_FILE = "public.bks"
+OPENER_FILE = "opener.bks"
+ISSUER_FILE = "issuer.bks"
+MEMBERS_FILE = "members.bks"
+MEMBER_COLUMNS = ('points', 'scalars', 'ids', 'index')
+
+PUBLIC_PARAMS = struct.Struct(">BB")  # 窗口宽度, 是否附带预计算表
+MUO_PARAMS = struct.Struct(">I")  # p、q、g 的定长编码宽度（字节）
+
+
+# -------------------------- 文件格式 --------------------------
+def _padding(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def write_store(path: str, kind: str, fingerprint: bytes, sections: Sequence[Tuple[str, object]],
+                secret: bool = False):
+    """按文件格式写出各段（bytes 或任意缓冲区），先写临时文件再原子替换；secret=True 时权限为 0600"""
+    names = [name.encode("utf-8") for name, _ in sections]
+    if len(set(names)) != len(names) or any(len(name) > 32 for name in names):
+        raise ValueError("段名重复或超过 32 字节")
+    views = [memoryview(data).cast("B") for _, data in sections]
+
+    table_end = HEADER.size + len(views) * SECTION.size
+    offset = table_end + _padding(table_end)
+    entries = []
+    for name, view in zip(names, views):
+        entries.append(SECTION.pack(name, offset, view.nbytes, hashlib.sha256(view).digest()))
+        offset += view.nbytes + _padding(view.nbytes)
+    table = b"".join(entries)
+    header = HEADER.pack(STORE_MAGIC, STORE_VERSION, kind.encode("ascii"), fingerprint, len(views),
+                         hashlib.sha256(table).digest())
+
+    tmp = path + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600 if secret else 0o644)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(header)
+        fh.write(table)
+        fh.write(bytes(_padding(table_end)))
+        for view in views:
+            fh.write(view)
+            fh.write(bytes(_padding(view.nbytes)))
+    os.replace(tmp, path)
+
+
+class KeyStoreFile:
+    """
+    一个密钥库文件：mmap 后按段名取只读 memoryview
+    段数据归 mmap 所有；close() 之后已经取出的段仍然可用，映射随最后一个引用一起释放
+    """
+
+    def __init__(self, path: str, kind: Optional[str] = None, verify: bool = True):
+        self.path = path
+        self.verify = verify
+        self._verified = set()
+        with open(path, "rb") as fh:
+            try:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # 空文件无法 mmap
+                raise ValueError(f"{path} 不是密钥库文件") from None
+        self._view = memoryview(self._map)
+        try:
+            self._read_header(kind)
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_header(self, kind: Optional[str]):
+        buf, path = self._view, self.path
+        if len(buf) < HEADER.size:
+            raise ValueError(f"{path} 不是密钥库文件")
+        magic, version, stored_kind, fingerprint, count, table_digest = HEADER.unpack_from(buf, 0)
+        if magic != STORE_MAGIC:
+            raise ValueError(f"{path} 不是密钥库文件")
+        if version != STORE_VERSION:
+            raise ValueError(f"{path} 的格式版本为 {version}，当前只支持 {STORE_VERSION}")
+        self.kind = stored_kind.rstrip(b"\0").decode("ascii")
+        if kind is not None and self.kind != kind:
+            raise ValueError(f"{path} 是 {self.kind} 文件，需要的是 {kind}")
+        table_end = HEADER.size + count * SECTION.size
+        if len(buf) < table_end or hashlib.sha256(buf[HEADER.size:table_end]).digest() != table_digest:
+            raise ValueError(f"{path} 的段表校验失败")
+        self.fingerprint = fingerprint
+        self.sections: Dict[str, Tuple[int, int, bytes]] = {}
+        for i in range(count):
+            name, offset, length, digest = SECTION.unpack_from(buf, HEADER.size + i * SECTION.size)
+            if offset < table_end or offset + length > len(buf):
+                raise ValueError(f"{path} 的段超出文件范围")
+            self.sections[name.rstrip(b"\0").decode("utf-8")] = (offset, length, digest)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sections
+
+    def section(self, name: str) -> memoryview:
+        """段数据的只读视图；第一次取用时校验 SHA-256，不符时抛出 ValueError"""
+        try:
+            offset, length, digest = self.sections[name]
+        except KeyError:
+            raise KeyError(f"{self.path} 中没有段 {name}") from None
+        view = self._view[offset:offset + length]
+        if self.verify and name not in self._verified:
+            if hashlib.sha256(view).digest() != digest:
+                raise ValueError(f"{self.path} 的段 {name} 校验失败")
+            self._verified.add(name)
+        return view
+
+    def verify_all(self):
+        """校验全部段（不论 verify 设置）"""
+        for name, (offset, length, digest) in self.sections.items():
+            if hashlib.sha256(self._view[offset:offset + length]).digest() != digest:
+                raise ValueError(f"{self.path} 的段 {name} 校验失败")
+            self._verified.add(name)
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        try:
+            self._map.close()
+        except BufferError:  # 仍有段被引用：映射留给这些视图，随它们一起释放
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _open(directory: str, filename: str, kind: str, verify: bool, fingerprint: Optional[bytes]) -> KeyStoreFile:
+    store = KeyStoreFile(os.path.join(directory, filename), kind, verify)
+    if fingerprint is not None and store.fingerprint != fingerprint:
+        store.close()
+        raise ValueError(f"{store.path} 属于另一把群公钥")
+    return store
+
+
+def _scalars(data, width: int) -> list:
+    if len(data) % width:
+        raise ValueError("标量段长度不是编码宽度的整数倍")
+    return [int.from_bytes(data[i:i + width], "big") for i in range(0, len(data), width)]
+
+
+# -------------------------- BBS04 --------------------------
+def save_group(gs: GroupSignature, directory: str, join_table: bool = False):
+    """
+    写出 GroupSignature 的全部状态；预计算表只写已有的（precompute=False 的公钥不带表）
+    批量加入用的宽窗口 P 表（窗口 8）只在已经建立时写出（join_many 或加载时才会有），
+    join_table=True 时先建好再写出，加载方的第一次批量加入就不必再建表
+    """
+    os.makedirs(directory, exist_ok=True)
+    key = gs.public_key
+    r = gs.group.r
+    fingerprint = key.fingerprint
+
+    public = [('key', key.to_bytes()), ('params', PUBLIC_PARAMS.pack(key.window, int(bool(key.tables))))]
+    public.extend((f"g1:{name}", table.to_bytes()) for name, table in key.tables.items())
+    public.extend((f"g2:{name}", gs.group.g2_prepared_to_bytes(prepared)) for name, prepared in key.prepared.items())
+    public.extend((f"gt:{name}", table.to_bytes()) for name, table in key.gt_tables.items())
+
+    issuer = [('secret', int_to_octets(gs.gamma, r)),
+              ('revoked', b"".join(int_to_octets(x, r) for x in sorted(gs.revoked_x)))]
+    if gs.precompute and (join_table or gs._join_table is not None):
+        issuer.append(('join', gs._wide_join_table().to_bytes()))
+
+    write_store(os.path.join(directory, MEMBERS_FILE), "members", fingerprint,
+                list(gs.members.columns().items()), secret=True)
+    write_store(os.path.join(directory, ISSUER_FILE), "issuer", fingerprint, issuer, secret=True)
+    write_store(os.path.join(directory, OPENER_FILE), "opener", fingerprint,
+                [('secret', int_to_octets(gs.xi1, r) + int_to_octets(gs.xi2, r))], secret=True)
+    write_store(os.path.join(directory, PUBLIC_FILE), "public", fingerprint, public)
+
+
+def _read_public_key(store: KeyStoreFile, group: PairingGroup) -> GroupPublicKey:
+    window, has_tables = PUBLIC_PARAMS.unpack(store.section('params'))
+    points, constants = GroupPublicKey.decode(group, store.section('key'))
+    if constants is None:
+        raise ValueError(f"{store.path} 缺少配对常量")
+    precomputed = None
+    if has_tables:
+        precomputed = {
+            'tables': {name: FixedBaseTable.from_buffer(group, points[name], window, store.section(f"g1:{name}"))
+                       for name in KEY_G1},
+            'prepared': {name: group.g2_prepared_from_bytes(points[name], store.section(f"g2:{name}"))
+                         for name in KEY_G2},
+            'gt_tables': {name: GTFixedBaseTable.from_buffer(group, constants[name], window,
+                                                             store.section(f"gt:{name}"))
+                          for name in GT_CONSTANTS},
+        }
+    key = GroupPublicKey(group, points['P'], points['P2'], points['H'], points['U'], points['V'], points['W'],
+                         precompute=bool(has_tables), window=window, gt_constants=constants,
+                         precomputed=precomputed)
+    if key.fingerprint != store.fingerprint:
+        raise ValueError(f"{store.path} 的文件头与公钥不符")
+    return key
+
+
+def load_public_key(directory: str, group: Optional[PairingGroup] = None, verify: bool = True) -> GroupPublicKey:
+    """验证方只需要 public.bks：公钥连同预计算表，不做任何配对或标量乘"""
+    group = group or PairingGroup()
+    with _open(directory, PUBLIC_FILE, "public", verify, None) as store:
+        return _read_public_key(store, group)
+
+
+def load_members(directory: str, group: PairingGroup, fingerprint: Optional[bytes] = None,
+                 verify: bool = True) -> MemberRegistry:
+    with _open(directory, MEMBERS_FILE, "members", verify, fingerprint) as store:
+        return MemberRegistry.from_columns(group, {name: store.section(name) for name in MEMBER_COLUMNS})
+
+
+def load_opener(directory: str, group: Optional[PairingGroup] = None,
+                verify: bool = True) -> Tuple[Opener, MemberRegistry]:
+    """追踪方需要 public.bks、opener.bks 与 members.bks，不接触 issuer 私钥"""
+    public_key = load_public_key(directory, group, verify)
+    group = public_key.group
+    with _open(directory, OPENER_FILE, "opener", verify, public_key.fingerprint) as store:
+        xi1, xi2 = _scalars(store.section('secret'), (int(group.r).bit_length() + 7) // 8)
+    return Opener(public_key, xi1, xi2), load_members(directory, group, public_key.fingerprint, verify)
+
+
+def load_group(directory: str, backend: str = "auto", verify: bool = True) -> GroupSignature:
+    """加载 save_group 写出的完整状态，返回可以继续加入、签名、验证、打开与撤销的 GroupSignature"""
+    group = PairingGroup(backend=backend)
+    opener, members = load_opener(directory, group, verify)
+    public_key = opener.public_key
+    width = (int(group.r).bit_length() + 7) // 8
+    with _open(directory, ISSUER_FILE, "issuer", verify, public_key.fingerprint) as store:
+        (gamma,) = _scalars(store.section('secret'), width)
+        revoked = _scalars(store.section('revoked'), width)
+        join_table = None
+        if 'join' in store:
+            join_table = FixedBaseTable.from_buffer(group, public_key.points['P'], JOIN_WINDOW, store.section('join'))
+    return GroupSignature.from_keys(public_key, opener.xi1, opener.xi2, gamma, members, revoked, join_table)
+
+
+# -------------------------- MUO --------------------------
+def _muo_fingerprint(params_section) -> bytes:
+    return hashlib.sha256(params_section).digest()[:16]
+
+
+def save_muo(path: str, params: Dict[str, int], keys: Optional[Dict[str, Tuple[int, int]]] = None):
+    """MUO 系统参数与命名密钥对 {名字: (x, y)} 写入一个文件（含私钥，权限 0600）"""
+    keys = keys or {}
+    p = int(params['p'])
+    width = (p.bit_length() + 7) // 8
+    encoded = MUO_PARAMS.pack(width) + b"".join(int(params[name]).to_bytes(width, "big") for name in ('p', 'q', 'g'))
+    pairs = b"".join(int_to_octets(x, p) + int_to_octets(y, p) for x, y in keys.values())
+    write_store(path, "muo", _muo_fingerprint(encoded),
+                [('params', encoded), ('names', encode_ids(list(keys))), ('keys', pairs)], secret=True)
+
+
+def load_muo(path: str, verify: bool = True) -> Tuple[Dict[str, int], Dict[str, Tuple[int, int]]]:
+    """读取 save_muo 写出的参数与密钥对；不生成参数，也不做素性复查"""
+    with KeyStoreFile(path, "muo", verify) as store:
+        encoded = store.section('params')
+        if _muo_fingerprint(encoded) != store.fingerprint:
+            raise ValueError(f"{path} 的文件头与参数不符")
+        (width,) = MUO_PARAMS.unpack_from(encoded, 0)
+        p, q, g = _scalars(encoded[MUO_PARAMS.size:], width)
+        if (p.bit_length() + 7) // 8 != width:
+            raise ValueError(f"{path} 的参数编码宽度不符")
+        names = list(StoredIds(store.section('names')))
+        values = _scalars(store.section('keys'), width)
+        if len(values) != 2 * len(names):
+            raise ValueError(f"{path} 的密钥对个数与名字不符")
+    keys = {name: (values[2 * i], values[2 * i + 1]) for i, name in enumerate(names)}
+    return {'p': p, 'q': q, 'g': g}, keys
@@ -0,0 +1,230 @@
+"""
+成员登记表：按槽位号连续存放的列式存储
+
+每个成员只占定长字节：A_i 的仿射坐标 (x, y) 与私钥 x_i 分别写在两个 bytearray 里，
+成员 ID 存在按槽位排列的列表中，另有 ID -> 槽位的字典；opener 索引（A_i 摘要 -> 槽位）也归登记表所有。
+读取时才按需构造 Member（__slots__ 对象），不为每个成员常驻 Point、dict 或描述字符串。
+
+columns() 给出四列的原始字节（ID 列为偏移表 + UTF-8 串），from_columns 直接在这些缓冲区上工作：
+密钥库 mmap 之后不复制、不逐个解码，ID -> 槽位的字典在第一次按 ID 查找时才建立，追加成员前才复制到内存。
+"""
+import struct
+import sys
+from collections import abc
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from opener_index import OpenerIndex
+from pairing_group import G1Point, PairingGroup
+
+
+class Member:
+    """一个成员的私钥视图：槽位号、A_i = 1/(γ+x_i)·P 与 x_i"""
+
+    __slots__ = ('member_id', 'slot', 'A_i', 'x_i')
+
+    def __init__(self, member_id, slot: int, A_i: G1Point, x_i: int):
+        self.member_id = member_id
+        self.slot = slot
+        self.A_i = A_i
+        self.x_i = x_i
+
+    def __repr__(self):
+        return f"Member({self.member_id!r}, slot={self.slot})"
+
+
+ID_COUNT = struct.Struct(">I")
+
+
+def encode_ids(member_ids: Sequence) -> bytes:
+    """ID 列：成员数、count+1 个大端偏移、UTF-8 串；只接受字符串 ID"""
+    blobs = []
+    for member_id in member_ids:
+        if not isinstance(member_id, str):
+            raise TypeError(f"只能保存字符串成员 ID: {member_id!r}")
+        blobs.append(member_id.encode("utf-8"))
+    offsets = [0]
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+    return ID_COUNT.pack(len(blobs)) + struct.pack(f">{len(offsets)}I", *offsets) + b"".join(blobs)
+
+
+class StoredIds(abc.Sequence):
+    """ID 列上的只读序列：按槽位取 ID 时只解码这一项"""
+
+    def __init__(self, data):
+        if len(data) < ID_COUNT.size:
+            raise ValueError("成员 ID 列过短")
+        (count,) = ID_COUNT.unpack_from(data, 0)
+        self._count = count
+        self._data = data
+        self._base = ID_COUNT.size + 4 * (count + 1)
+        if len(data) < self._base or self._offset(count) != len(data) - self._base:
+            raise ValueError("成员 ID 列长度与偏移表不符")
+
+    def _offset(self, i: int) -> int:
+        start = ID_COUNT.size + 4 * i
+        return int.from_bytes(self._data[start:start + 4], "big")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, slot: int) -> str:
+        if not 0 <= slot < self._count:
+            raise IndexError(slot)
+        base = self._base
+        return str(self._data[base + self._offset(slot):base + self._offset(slot + 1)], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        data, base, count = self._data, self._base, self._count
+        offsets = struct.unpack_from(f">{count + 1}I", data, ID_COUNT.size)
+        for i in range(count):
+            yield str(data[base + offsets[i]:base + offsets[i + 1]], "utf-8")
+
+    @property
+    def data(self):
+        """ID 列的原始字节（encode_ids 的格式）"""
+        return self._data
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._data)
+
+
+class MemberRegistry:
+    """成员 ID -> Member 的只增映射（支持 in、len、迭代 ID 和按 ID 取 Member）"""
+
+    def __init__(self, group: PairingGroup):
+        self.group = group
+        self._coord_bytes = group.field_bytes
+        self._scalar_bytes = (int(group.r).bit_length() + 7) // 8
+        self._points = bytearray()  # 槽位 i 占 [2w·i, 2w·(i+1))：x 坐标 | y 坐标
+        self._scalars = bytearray()  # 槽位 i 的 x_i
+        self._ids: Sequence = []  # 槽位号 -> member_id（from_columns 时为 StoredIds）
+        self._slots: Optional[Dict] = {}  # member_id -> 槽位号（from_columns 时首次使用才建立）
+        self.index = OpenerIndex()  # A_i 编码摘要 -> 槽位号
+
+    # ---- 映射接口 ----
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, member_id) -> bool:
+        return member_id in self._slot_map()
+
+    def __iter__(self) -> Iterator:
+        return iter(self._ids)
+
+    def keys(self) -> List:
+        return list(self._ids)
+
+    def __getitem__(self, member_id) -> Member:
+        return self.record(self._slot_map()[member_id])
+
+    def get(self, member_id, default=None):
+        slot = self._slot_map().get(member_id)
+        return default if slot is None else self.record(slot)
+
+    def _slot_map(self) -> Dict:
+        if self._slots is None:
+            self._slots = {member_id: slot for slot, member_id in enumerate(self._ids)}
+        return self._slots
+
+    # ---- 按槽位访问 ----
+    def record(self, slot: int) -> Member:
+        w, s = self._coord_bytes, self._scalar_bytes
+        num = self.group._num
+        offset = 2 * w * slot
+        A_i = (num(int.from_bytes(self._points[offset:offset + w], "big")),
+               num(int.from_bytes(self._points[offset + w:offset + 2 * w], "big")))
+        x_i = int.from_bytes(self._scalars[s * slot:s * (slot + 1)], "big")
+        return Member(self._ids[slot], slot, A_i, x_i)
+
+    def member_id(self, slot: int):
+        return self._ids[slot]
+
+    def encoding(self, slot: int) -> bytes:
+        """槽位上 A_i 的规范（压缩）编码，与 PairingGroup.g1_to_bytes 一致"""
+        w = self._coord_bytes
+        offset = 2 * w * slot
+        x = int.from_bytes(self._points[offset:offset + w], "big")
+        y_odd = self._points[offset + 2 * w - 1] & 1
+        return (x | y_odd << (8 * w - 2)).to_bytes(w, "big")
+
+    def find(self, encoding: bytes):
+        """由 A_i 的编码查成员 ID，用完整编码排除摘要碰撞；找不到返回 None"""
+        for slot in self.index.lookup(encoding):
+            if self.encoding(slot) == encoding:
+                return self._ids[slot]
+        return None
+
+    # ---- 写入 ----
+    def add_many(self, entries: Sequence[Tuple[object, G1Point, int]]) -> List[int]:
+        """追加 (member_id, A_i, x_i)，返回分配的槽位号；调用方负责 ID 与 A_i 的唯一性"""
+        w, s = self._coord_bytes, self._scalar_bytes
+        self._make_writable()
+        slots = []
+        for member_id, (x, y), x_i in entries:
+            slot = len(self._ids)
+            self._points += int(x).to_bytes(w, "big") + int(y).to_bytes(w, "big")
+            self._scalars += int(x_i).to_bytes(s, "big")
+            self._ids.append(member_id)
+            self._slots[member_id] = slot
+            self.index.add(self.group.g1_to_bytes((x, y)), slot)
+            slots.append(slot)
+        return slots
+
+    def _make_writable(self):
+        """from_columns 得到的只读列在第一次追加前复制到内存"""
+        if not isinstance(self._points, bytearray):
+            self._points = bytearray(self._points)
+            self._scalars = bytearray(self._scalars)
+        if not isinstance(self._ids, list):
+            self._slot_map()
+            self._ids = list(self._ids)
+
+    # ---- 列式存储的原始字节 ----
+    def columns(self) -> Dict[str, object]:
+        """{'points', 'scalars', 'ids', 'index'} 的原始字节（ID 须为字符串），供密钥库写出"""
+        return {
+            'points': memoryview(self._points).toreadonly(),
+            'scalars': memoryview(self._scalars).toreadonly(),
+            'ids': self._ids.data if isinstance(self._ids, StoredIds) else encode_ids(self._ids),
+            'index': self.index.view(),
+        }
+
+    @classmethod
+    def from_columns(cls, group: PairingGroup, columns: Dict[str, object]) -> "MemberRegistry":
+        """在 columns() 格式的缓冲区（可以是 mmap 上的 memoryview）上直接构造，不复制；长度不符时抛出 ValueError"""
+        registry = cls(group)
+        ids = StoredIds(columns['ids'])
+        count = len(ids)
+        if len(columns['points']) != 2 * registry._coord_bytes * count:
+            raise ValueError("A_i 坐标列长度与成员数不符")
+        if len(columns['scalars']) != registry._scalar_bytes * count:
+            raise ValueError("x_i 列长度与成员数不符")
+        registry._points = columns['points']
+        registry._scalars = columns['scalars']
+        registry._ids = ids
+        registry._slots = None
+        registry.index = OpenerIndex.from_buffer(columns['index'], "成员登记表的 opener 索引")
+        if len(registry.index) != count:
+            raise ValueError("opener 索引的记录数与成员数不符")
+        return registry
+
+    # ---- 内存统计 ----
+    def memory_usage(self) -> dict:
+        """各部分占用的字节数（ID 对象按 sys.getsizeof 计，映射的 ID 列按字节数计）及每个成员的平均值"""
+        if isinstance(self._ids, StoredIds):
+            ids = self._ids.nbytes
+        else:
+            ids = sys.getsizeof(self._ids) + sum(map(sys.getsizeof, self._ids))
+        if self._slots is not None:
+            ids += sys.getsizeof(self._slots)
+        usage = {
+            'points': len(self._points),
+            'scalars': len(self._scalars),
+            'ids': ids,
+            'index': self.index.nbytes,
+        }
+        usage['total'] = sum(usage.values())
+        usage['per_member'] = usage['total'] / len(self._ids) if self._ids else 0.0
+        return usage
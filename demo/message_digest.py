@@ -0,0 +1,122 @@
+"""
+消息摘要：签名与验证只用消息的 SHA-256，大消息流式哈希、常数内存
+
+消息可以是：
+    str                      UTF-8 编码后哈希（与原来的 hash_message 相同）
+    bytes / bytearray / memoryview 等缓冲区    直接哈希，不复制
+    os.PathLike（如 pathlib.Path）  普通文件按 REGION_SIZE 分段 mmap 后哈希，管道等不能 mmap 的按块读取
+    二进制文件对象（有 readinto）     按 CHUNK_SIZE 读入同一块缓冲区
+    分块迭代器（产出 bytes 类对象）    逐块哈希
+    Prehashed                已经算好的摘要（digest_many 的结果），原样使用
+字符串永远是消息正文，文件路径须用 pathlib.Path 等 PathLike 给出，以免与消息混淆。
+迭代器与文件对象只能读一次，验证时要重新提供。
+
+hashlib 对不小于 2 KiB 的数据在计算时释放 GIL，mmap 的每一段都一次交给 update，
+所以 digest_many 可以在线程池里同时哈希多个文件（受限于 CPU 核数与磁盘带宽）。
+"""
+import hashlib
+import mmap
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, List, Optional, Sequence, Union
+
+DIGEST_SIZE = 32
+REGION_SIZE = 64 << 20  # 每次 mmap 的区段（ALLOCATIONGRANULARITY 的整数倍），限制地址空间占用
+CHUNK_SIZE = 1 << 20  # 不能 mmap 时每次读取的块
+PARALLEL_MIN_BYTES = 1 << 20  # 内存中的消息都小于该值时，digest_many 不开线程
+
+
+class Prehashed:
+    """已经算好的消息摘要：签名与验证直接使用，不再读取消息"""
+
+    __slots__ = ('digest',)
+
+    def __init__(self, digest: bytes):
+        if len(digest) != DIGEST_SIZE:
+            raise ValueError(f"摘要应为 {DIGEST_SIZE} 字节")
+        self.digest = bytes(digest)
+
+    def __repr__(self):
+        return f"Prehashed({self.digest.hex()})"
+
+
+MessageSource = Union[str, bytes, bytearray, memoryview, "os.PathLike[str]", BinaryIO, Iterable[bytes], Prehashed]
+
+
+def _update_from_file(h, fh: BinaryIO):
+    """文件对象：普通文件分段 mmap，其余按块读入同一块缓冲区"""
+    try:
+        fd = fh.fileno()
+        info = os.fstat(fd)
+    except (AttributeError, OSError, ValueError):  # io.BytesIO 等没有文件描述符
+        fd, info = None, None
+    if info is not None and stat.S_ISREG(info.st_mode):
+        offset = fh.tell()
+        size = info.st_size
+        advise = getattr(mmap, "MADV_SEQUENTIAL", None)
+        while offset < size:
+            start = offset - offset % mmap.ALLOCATIONGRANULARITY
+            length = min(REGION_SIZE, size - start)
+            with mmap.mmap(fd, length, access=mmap.ACCESS_READ, offset=start) as region:
+                if advise is not None:
+                    region.madvise(advise)
+                with memoryview(region) as view:
+                    h.update(view[offset - start:])
+            offset = start + length
+        fh.seek(size)
+        return
+    buf = bytearray(CHUNK_SIZE)
+    view = memoryview(buf)
+    while True:
+        n = fh.readinto(buf)
+        if not n:
+            return
+        h.update(view[:n])
+
+
+def digest(message: MessageSource) -> bytes:
+    """消息的 SHA-256 摘要（类型见模块说明）；不支持的类型抛出 TypeError"""
+    if isinstance(message, Prehashed):
+        return message.digest
+    h = hashlib.sha256()
+    if isinstance(message, str):
+        h.update(message.encode('utf-8'))
+    elif isinstance(message, (bytes, bytearray, memoryview)):
+        h.update(message)
+    elif isinstance(message, os.PathLike):
+        with open(message, "rb", buffering=0) as fh:
+            _update_from_file(h, fh)
+    elif hasattr(message, "readinto"):
+        _update_from_file(h, message)
+    else:
+        try:
+            chunks = iter(message)
+        except TypeError:
+            raise TypeError(f"不支持的消息类型: {type(message).__name__}") from None
+        for chunk in chunks:
+            h.update(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    return h.digest()
+
+
+def _in_memory_small(message) -> bool:
+    if isinstance(message, (str, Prehashed)):
+        return True
+    return isinstance(message, (bytes, bytearray, memoryview)) and memoryview(message).nbytes < PARALLEL_MIN_BYTES
+
+
+def digest_many(messages: Sequence[MessageSource], workers: Optional[int] = None) -> List[bytes]:
+    """
+    一批消息的摘要，顺序与输入一致
+    有文件、迭代器或较大的缓冲区时在线程池中并行（workers 缺省同 ThreadPoolExecutor），否则逐个计算
+    """
+    messages = list(messages)
+    if len(messages) < 2 or workers == 1 or all(map(_in_memory_small, messages)):
+        return [digest(message) for message in messages]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="digest") as pool:
+        return list(pool.map(digest, messages))
+
+
+def prehash_many(messages: Sequence[MessageSource], workers: Optional[int] = None) -> List[Prehashed]:
+    """digest_many 的结果包成 Prehashed，可以直接交给签名与验证接口"""
+    return [Prehashed(value) for value in digest_many(messages, workers)]
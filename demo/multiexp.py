@@ -0,0 +1,129 @@
+"""
+同时多幂运算：Π x_i^{e_i}（加法群中即 Σ e_i·P_i），所有底数共享同一串平方，一次扫描指数比特
+
+    Straus（Shamir 技巧的窗口推广）：每个底数一张 2^w 窗口表，适合底数较少的情形
+    Pippenger（桶方法）：每个窗口把底数按数字放进 2^c 个桶，再用累加和求 Σ d·B_d，
+                        每个底数每个窗口只需一次乘法，底数很多时（批验证）远快于 Straus
+
+群运算通过 MultiExpOps 描述，同一套代码用于 G1（Jacobian 坐标，"乘法"即点加）、GT 与 Z_m^*。
+指数须为非负整数，调用方负责先按群阶约化。
+"""
+from typing import Callable, Optional, Sequence
+
+# 底数个数超过该值时改用 Pippenger（bench_multiexp.py 在 G1、GT 上实测的交叉点）
+PIPPENGER_THRESHOLD = 24
+# 模数不超过该比特数时，Python 层循环的开销超过节省的乘法，直接用内建 pow 连乘
+SMALL_MODULUS_BITS = 256
+
+
+class MultiExpOps:
+    """
+    多幂运算所需的群运算
+    one 单位元；mul(a, b)、sqr(a) 作用于"完整"表示（如 Jacobian 坐标）；
+    底数与窗口表使用"紧凑"表示（如仿射坐标）：lift 把紧凑表示转成完整表示，
+    mul_mixed(完整, 紧凑) 为混合乘法，normalize 把一批完整表示统一转回紧凑表示（如批量求逆）。
+    后三者缺省时两种表示相同。
+    """
+
+    def __init__(self, one, mul: Callable, sqr: Callable, mul_mixed: Optional[Callable] = None,
+                 lift: Optional[Callable] = None, normalize: Optional[Callable] = None):
+        self.one = one
+        self.mul = mul
+        self.sqr = sqr
+        self.mul_mixed = mul_mixed or mul
+        self.lift = lift or (lambda x: x)
+        self.normalize = normalize or list
+
+
+def _straus_window(nbits: int) -> int:
+    """每个底数的代价 ≈ 建表 (2^w - 2) + 窗口数 ⌈nbits/w⌉ 次乘法，取最小者"""
+    return min(range(1, 8), key=lambda w: (1 << w) - 2 + -(-nbits // w))
+
+
+def _pippenger_window(nbits: int, count: int) -> int:
+    """每个窗口的代价 ≈ 放桶 count + 累加和 2^{c+1} 次乘法"""
+    return min(range(1, 17), key=lambda c: -(-nbits // c) * (count + (1 << (c + 1))))
+
+
+def straus(ops: MultiExpOps, bases: Sequence, exponents: Sequence[int], window: Optional[int] = None):
+    pairs = [(x, int(e)) for x, e in zip(bases, exponents) if e]
+    if not pairs:
+        return ops.one
+    nbits = max(e.bit_length() for _, e in pairs)
+    w = window or _straus_window(nbits)
+    mask = (1 << w) - 1
+
+    # 窗口表 x, x², ..., x^{2^w - 1}，所有底数的表一起转为紧凑表示
+    full = []
+    for x, _ in pairs:
+        cur = ops.lift(x)
+        full.append(cur)
+        for _ in range(mask - 1):
+            cur = ops.mul_mixed(cur, x)
+            full.append(cur)
+    flat = ops.normalize(full)
+    tables = [flat[i * mask:(i + 1) * mask] for i in range(len(pairs))]
+
+    acc = ops.one
+    started = False
+    for shift in range(-(-nbits // w) * w - w, -1, -w):
+        if started:
+            for _ in range(w):
+                acc = ops.sqr(acc)
+        for table, (_, e) in zip(tables, pairs):
+            digit = (e >> shift) & mask
+            if digit:
+                acc = ops.mul_mixed(acc, table[digit - 1])
+                started = True
+    return acc
+
+
+def pippenger(ops: MultiExpOps, bases: Sequence, exponents: Sequence[int], window: Optional[int] = None):
+    pairs = [(x, int(e)) for x, e in zip(bases, exponents) if e]
+    if not pairs:
+        return ops.one
+    nbits = max(e.bit_length() for _, e in pairs)
+    c = window or _pippenger_window(nbits, len(pairs))
+    mask = (1 << c) - 1
+
+    acc = ops.one
+    started = False
+    for shift in range(-(-nbits // c) * c - c, -1, -c):
+        if started:
+            for _ in range(c):
+                acc = ops.sqr(acc)
+        buckets = [None] * mask
+        for x, e in pairs:
+            digit = (e >> shift) & mask
+            if digit:
+                bucket = buckets[digit - 1]
+                buckets[digit - 1] = ops.lift(x) if bucket is None else ops.mul_mixed(bucket, x)
+        # Σ d·B_d = Σ_d (B_d + B_{d+1} + ... + B_max)，从高到低维护累加和
+        running = total = None
+        for bucket in reversed(buckets):
+            if bucket is not None:
+                running = bucket if running is None else ops.mul(running, bucket)
+            if running is not None:
+                total = running if total is None else ops.mul(total, running)
+        if total is not None:
+            acc = ops.mul(acc, total) if started else total
+            started = True
+    return acc
+
+
+def multi_exp(ops: MultiExpOps, bases: Sequence, exponents: Sequence[int]):
+    """Π x_i^{e_i}，按底数个数在 Straus 与 Pippenger 之间选择"""
+    if len(bases) > PIPPENGER_THRESHOLD:
+        return pippenger(ops, bases, exponents)
+    return straus(ops, bases, exponents)
+
+
+def multi_pow_mod(bases: Sequence[int], exponents: Sequence[int], modulus: int) -> int:
+    """Π x_i^{e_i} mod m（e_i ≥ 0）"""
+    if int(modulus).bit_length() <= SMALL_MODULUS_BITS:
+        result = 1
+        for x, e in zip(bases, exponents):
+            result = result * pow(x, e, modulus) % modulus
+        return result
+    ops = MultiExpOps(1, lambda a, b: a * b % modulus, lambda a: a * a % modulus)
+    return multi_exp(ops, [x % modulus for x in bases], exponents) % modulus
@@ -0,0 +1,535 @@
+"""
+MUO 代理签名的核心运算（不做任何输出）
+
+ProxySignatureUnprotected / ProxySignatureProtected 只返回计算结果；
+跟踪信息走 logging（logger 名为 "muo"）和 tracing 模块的计时钩子，演示讲解见 MUO-demo.py。
+
+消息按 SHA-256 摘要签名（message_digest 模块）：除字符串外还接受字节缓冲区、文件路径与分块迭代器，
+大文件分段 mmap 流式哈希；批量接口在线程池中并行哈希多个文件。
+
+验证方可以传入共享的 DelegationCache（delegation_cache 模块）：同一委托 (y_A, K[, y_B]) 的 v
+及其固定基表只算一次，之后的验证不再做任何与委托有关的模幂。
+
+委托的 k 与签名的 r 由 HMAC-DRBG 按 (私钥, 消息) 确定地派生（见 nonces 模块），取值次数固定；
+指数运算按 g 的阶约化（exponent_order），委托恒有效、r 恒可逆，不再需要重试循环。
+"""
+import logging
+import secrets
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖：未安装时批量签名全部走 Python 整数
+    np = None
+
+from message_digest import MessageSource, digest as message_digest, digest_many
+from multiexp import multi_pow_mod
+from muo_params import load_parameter_set
+from nonces import HmacDrbg, int_to_octets, message_drbg
+from tracing import phase
+
+logger = logging.getLogger("muo")
+
+SIGN_CONTEXT = b"MUO sign|"
+DELEGATE_CONTEXT = b"MUO delegate|"
+
+
+# -------------------------- 核心工具函数（确保计算精准） --------------------------
+def hash_message(message: MessageSource, q: int) -> int:
+    """
+    将消息哈希为Z_q范围内的整数（文档要求）：SHA-256 摘要按大端解释后模 q
+    消息可以是字符串、字节缓冲区、文件路径、分块迭代器或 Prehashed（见 message_digest），大消息流式哈希
+    """
+    return int.from_bytes(_digest(message), "big") % q
+
+
+def _digest(message: MessageSource) -> bytes:
+    return message_digest(message)
+
+
+def mod_inverse(a: int, mod: int) -> int | None:
+    """计算模逆（存在返回逆元，不存在返回None）"""
+    try:
+        return pow(a, -1, mod)
+    except ValueError:
+        return None
+
+
+def batch_inverse(values: Sequence[int], mod: int) -> List[int]:
+    """
+    Montgomery 批量求逆：n 个元素只做一次求逆，另加 3(n-1) 次乘法
+    所有元素都须与 mod 互素（mod 可以是合数，如 p-1）
+    """
+    prefix = []
+    acc = 1
+    for a in values:
+        prefix.append(acc)
+        acc = acc * a % mod
+    inv = pow(acc, -1, mod)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        result[i] = inv * prefix[i] % mod
+        inv = inv * values[i] % mod
+    return result
+
+
+# -------------------------- 1. 系统参数与密钥对生成（固定参数确保兼容性） --------------------------
+def generate_system_params(name: str = "demo", cache_dir: Optional[str] = None) -> Dict[str, int]:
+    """
+    系统参数：默认为文档7.2节的演示参数；
+    name 取 muo_params.PARAMETER_SETS 中的名字（如 "muo-2048-256"）时加载正式规模的 Schnorr 子群参数
+    """
+    if name != "demo":
+        return load_parameter_set(name, cache_dir)
+    return {
+        "p": 83,  # 大素数
+        "q": 41,  # p-1=82的素因子（q | p-1）
+        "g": 2  # 生成元（2^41 mod 83 = 1，符合g^q ≡ 1 mod p）
+    }
+
+
+def generate_key_pair(params: Dict[str, int]) -> Tuple[int, int]:
+    """生成用户密钥对（私钥x ∈ Z_q^*，公钥y = g^x mod p）"""
+    g, p, q = params["g"], params["p"], params["q"]
+    x = secrets.randbelow(q - 1) + 1
+    y = pow(g, x, p)
+    return x, y
+
+
+# -------------------------- 批验证公共部分（同一委托下的大量代理签名） --------------------------
+def jacobi(a: int, n: int) -> int:
+    """Jacobi 符号 (a/n)，n 为正奇数；n 为素数时即 Legendre 符号（二次剩余为 1）"""
+    a %= n
+    result = 1
+    while a:
+        while not a & 1:
+            a >>= 1
+            if n & 7 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a & 3 == 3 and n & 3 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def signature_in_range(p: int, order: int, signature: Sequence[int]) -> bool:
+    """
+    (R, s, K) 是否为规范表示：R、K ∈ [1, p)，s ∈ [0, ord(g))
+    验证等式只看 R、K 模 p 与 s 模 ord(g) 的值，不检查范围时 (R, s+ord, K)、(R+p(p-1), s, K+p(p-1))
+    等变形同样通过验证，却是"不同"的签名（重放检测按内容区分签名）；单个与批量验证共用这一检查
+    """
+    R, s, K = signature[:3]
+    return 0 < R < p and 0 < K < p and 0 <= s < order
+
+
+def _batch_equations_hold(p: int, g: int, entries, security_bits: int) -> bool:
+    """
+    用随机指数 ρ_i 合并检查一批 g^{m_i} ≡ R_i^{s_i}·v^{R_i} (mod p)：
+        g^{Σρ_i m_i} ≡ Π R_i^{ρ_i s_i} · Π_v v^{Σρ_i R_i}
+    指数按 p-1 约化（对 Z_p^* 中任意元素成立），右侧为一次多幂运算，同一个 v 只出现一次
+    """
+    order = p - 1
+    e_g = 0
+    bases, exponents = [], []
+    v_exponents = {}
+    for m, R, s, v in entries:
+        rho = secrets.randbits(security_bits) | 1
+        e_g += rho * m
+        bases.append(R)
+        exponents.append(rho * s % order)
+        v_exponents[v] = (v_exponents.get(v, 0) + rho * R) % order
+    bases.extend(v_exponents)
+    exponents.extend(v_exponents.values())
+    return pow(g, e_g % order, p) == multi_pow_mod(bases, exponents, p)
+
+
+def _verify_entries(p: int, q: int, g: int, entries, security_bits: int) -> List[int]:
+    """
+    entries[i] = (m, R, s, v)，签名须已通过 signature_in_range；返回无效签名的下标，合并检查失败时二分定位
+    随机线性组合只在素数阶子群中可靠：例如两个各差一个因子 -1 的等式相乘会互相抵消，
+    所以合并前先把等式限制到 q 阶子群：
+        安全素数 p = 2q+1：Z_p^* = {±1} × 二次剩余子群，用 Legendre 符号逐个检查等式两侧的 ±1 分量
+                           （每个签名一次 Jacobi 符号，远比求幂便宜），演示参数即属此类
+        一般的 p = kq+1：g、y、K 与诚实签名的 R 都在 q 阶子群中，逐个检查 R^q ≡ 1（指数只有 q 的长度），
+                           v 按委托检查一次
+    每次合并检查漏掉无效签名的概率约为 1/q（演示参数下约 1/41，只有正式参数才有意义）
+    """
+    safe = p == 2 * q + 1
+    chi_g = jacobi(g, p) < 0
+    v_state = {}
+    bad = []
+    pending = []
+    for index, (m, R, s, v) in enumerate(entries):
+        if v not in v_state:
+            v_state[v] = jacobi(v, p) < 0 if safe else pow(v, q, p) == 1
+        if safe:
+            # (g/p)^m ≡ (R/p)^s · (v/p)^R，以"是否为 -1"的异或表示
+            ok = (chi_g and m & 1) == ((jacobi(R, p) < 0 and s & 1) ^ (v_state[v] and R & 1))
+        else:
+            ok = v_state[v] and pow(R, q, p) == 1
+        if not ok:
+            bad.append(index)
+        else:
+            pending.append(index)
+
+    stack = [pending] if pending else []
+    while stack:
+        chunk = stack.pop()
+        if _batch_equations_hold(p, g, [entries[i] for i in chunk], security_bits):
+            continue
+        if len(chunk) == 1:
+            bad.extend(chunk)
+        else:
+            mid = len(chunk) // 2
+            stack.append(chunk[mid:])
+            stack.append(chunk[:mid])
+    bad.sort()
+    return bad
+
+
+# -------------------------- 确定性随机数（委托的 k 与签名的 r） --------------------------
+def exponent_order(p: int, q: int, g: int) -> int:
+    """
+    指数运算的模数，即 g 的阶：Schnorr 子群参数（muo_params）中为 q；
+    演示参数 p = 83 = 2q+1 而 g = 2 是本原根，阶为 p-1 = 2q。
+    δ、δ̄ 与 s 都按它约化，g^δ = y_A·K^K 对任意 k 成立；文档按 p-1 约化 s，
+    但那样 r 必须与 p-1 的未知大因子互素，只能拒绝采样
+    """
+    if pow(g, q, p) == 1:
+        return q
+    if p == 2 * q + 1 and pow(g, 2, p) != 1:
+        return p - 1
+    raise ValueError("g 的阶须为 q，或在 p = 2q+1 时为 p-1")
+
+
+def _nonces(drbg: HmacDrbg, q: int, order: int, count: int) -> List[int]:
+    """
+    count 个 r ∈ [2, q-1]，且模 order 可逆，每个只取一次值：
+    order = q（素数）时区间内任意值都可逆；order = 2q 时只需为奇数，取 3 + 2t
+    """
+    if order == q:
+        return [2 + t for t in drbg.many_below(q - 2, count)]
+    return [3 + 2 * t for t in drbg.many_below((q - 3) // 2, count)]
+
+
+def _sign_nonce(key: int, q: int, order: int, digest: bytes) -> int:
+    """签名随机数 r：由签名密钥与消息摘要确定"""
+    return _nonces(message_drbg(key, order, digest, SIGN_CONTEXT), q, order, 1)[0]
+
+
+def _delegation_nonce(x_A: int, q: int, order: int, *context: bytes) -> int:
+    """委托随机数 k ∈ [2, q-1]：由 A 的私钥与委托上下文（代理人公钥、委托说明）确定"""
+    drbg = message_drbg(x_A, order, b"|".join(context), DELEGATE_CONTEXT)
+    return 2 + drbg.below(q - 2)
+
+
+# -------------------------- 批量签名公共部分（同一签名密钥下的大量消息） --------------------------
+# 模数小于 2^31 时两数之积不超过 int64，可以用 NumPy 向量化
+NUMPY_MODULUS_BITS = 31
+
+
+def _digests(messages: Sequence[MessageSource]) -> List[bytes]:
+    """一批消息的摘要；有文件或大缓冲区时在线程池中并行哈希"""
+    return digest_many(messages)
+
+
+def _sign_many_int(p: int, q: int, g: int, order: int, key: int,
+                   messages: Sequence[MessageSource]) -> Tuple[List[int], List[int]]:
+    """每条消息的 r 与逐个调用 sign 时相同，整批签名与逐条签名逐字节一致"""
+    from_bytes = int.from_bytes
+    digests = _digests(messages)
+    hashes = [from_bytes(digest, "big") % q for digest in digests]
+    nonces = [_sign_nonce(key, q, order, digest) for digest in digests]
+    inverses = batch_inverse(nonces, order)
+    Rs = [pow(g, r, p) for r in nonces]
+    ss = [r_inv * ((m - key * R) % order) % order for m, R, r_inv in zip(hashes, Rs, inverses)]
+    return Rs, ss
+
+
+def _np_pow_mod(base: int, exponents, mod: int):
+    """固定底数、向量指数的模幂（平方-乘，逐比特处理整列）"""
+    result = np.ones_like(exponents)
+    exponents = exponents.copy()
+    base %= mod
+    while exponents.any():
+        odd = (exponents & 1).astype(bool)
+        result[odd] = result[odd] * base % mod
+        base = base * base % mod
+        exponents >>= 1
+    return result
+
+
+def _np_batch_inverse(values, mod: int):
+    """
+    Montgomery 批量求逆的向量化形式：两两相乘建乘积树，只对树根求一次逆，
+    再逐层向下用兄弟节点的乘积得到每个元素的逆，总乘法次数仍约为 3n
+    """
+    levels = []
+    level = values
+    while len(level) > 1:
+        if len(level) & 1:
+            level = np.append(level, 1)
+        levels.append(level)
+        level = level[0::2] * level[1::2] % mod
+    inv = np.array([pow(int(level[0]), -1, mod)], dtype=np.int64)
+    for level in reversed(levels):
+        inv = inv[:len(level) // 2]  # 去掉上一层补齐用的 1
+        children = np.empty(len(level), dtype=np.int64)
+        children[0::2] = inv * level[1::2] % mod
+        children[1::2] = inv * level[0::2] % mod
+        inv = children
+    return inv[:len(values)]
+
+
+def _sign_many_numpy(p: int, q: int, g: int, order: int, key: int,
+                     messages: Sequence[MessageSource]) -> Tuple[List[int], List[int]]:
+    """
+    r 与 int 路径一样逐条由 (签名密钥, 该条摘要) 派生，签名只取决于消息本身，与批中的其他消息无关；
+    消息哈希、r⁻¹ 与 g^r 整列向量化
+    """
+    count = len(messages)
+    digest_list = _digests(messages)
+    joined = b"".join(digest_list)
+    # 摘要按大端 16 比特一组做 Horner 展开模 q：acc < q < 2^31，acc·2^16 + 0xFFFF 不会溢出
+    digests = np.frombuffer(joined, dtype=">u2").reshape(count, 16).astype(np.int64)
+    hashes = np.zeros(count, dtype=np.int64)
+    for column in digests.T:
+        hashes = (hashes * 65536 + column) % q
+
+    nonces = np.array([_sign_nonce(key, q, order, digest) for digest in digest_list], dtype=np.int64)
+
+    inverses = _np_batch_inverse(nonces, order)
+    Rs = _np_pow_mod(g, nonces, p)
+    ss = inverses * ((hashes - key % order * Rs) % order) % order
+    return Rs.tolist(), ss.tolist()
+
+
+def _sign_many(p: int, q: int, g: int, order: int, key: int, K: int,
+               messages: Sequence[MessageSource]) -> List[Tuple[int, int, int]]:
+    """用签名密钥 key（δ 或 δ̄）批量生成 (R, s, K)，两条路径都与逐个调用 sign 的结果逐字节一致"""
+    if not messages:
+        return []
+    if np is not None and int(p).bit_length() <= NUMPY_MODULUS_BITS:
+        Rs, ss = _sign_many_numpy(p, q, g, order, key, messages)
+    else:
+        Rs, ss = _sign_many_int(p, q, g, order, key, messages)
+    return [(R, s, K) for R, s in zip(Rs, ss)]
+
+
+# -------------------------- 2. 不保护代理的MUO代理签名（确定性随机数） --------------------------
+class ProxySignatureUnprotected:
+    def __init__(self, params: Dict[str, int], cache: Optional["DelegationCache"] = None):
+        """cache 为验证方共享的 delegation_cache.DelegationCache（须与 params 一致），给出时验证复用已知委托"""
+        self.p, self.q, self.g = params["p"], params["q"], params["g"]
+        self.order = exponent_order(self.p, self.q, self.g)
+        if cache is not None and not cache.matches(self.p, self.q, self.g):
+            raise ValueError("委托缓存的系统参数与方案不一致")
+        self.cache = cache
+
+    def delegate(self, x_A: int, y_A: int, warrant: str = "") -> Tuple[int, int, int]:
+        """委托过程（warrant 为委托说明，不同说明派生不同的 k）"""
+        with phase(logger, "muo.delegate"):
+            # A步骤1：由 x_A 与委托说明派生 k ∈ Z_q^*，计算K = g^k mod p
+            k = _delegation_nonce(x_A, self.q, self.order, warrant.encode('utf-8'))
+            K = pow(self.g, k, self.p)
+            # A步骤2：计算δ = (x_A + k*K) mod ord(g)，g^δ = y_A*K^K 恒成立，无需预验证
+            delta = (x_A + k * K) % self.order
+            g_delta = pow(self.g, delta, self.p)
+        logger.debug("委托完成 K=%d", K)
+        return delta, K, g_delta
+
+    def verify_delegation(self, delta: int, K: int, y_A: int) -> bool:
+        """B验证委托有效性（严格按文档7.2.1节公式）；有缓存时 y_A*K^K 取自缓存，g^δ 查固定基表"""
+        if self.cache is not None:
+            return self.cache.g_pow(delta) == self.cache.entry(y_A, K).v
+        yA_Kk = (y_A * pow(K, K, self.p)) % self.p
+        g_delta = pow(self.g, delta, self.p)
+        return g_delta == yA_Kk
+
+    def sign(self, delta: int, K: int, message: MessageSource) -> Tuple[int, int, int]:
+        """代理签名生成"""
+        with phase(logger, "muo.sign"):
+            digest = _digest(message)
+            m = int.from_bytes(digest, "big") % self.q
+            # r ∈ Z_q^* 由 (δ, 消息) 派生，构造上即模 ord(g) 可逆
+            r = _sign_nonce(delta, self.q, self.order, digest)
+            R = pow(self.g, r, self.p)
+            numerator = (m - delta * R) % self.order
+            s = (mod_inverse(r, self.order) * numerator) % self.order
+        logger.debug("代理签名 m=%d R=%d s=%d", m, R, s)
+        return R, s, K
+
+    def sign_many(self, delta: int, K: int, messages: Sequence[MessageSource]) -> List[Tuple[int, int, int]]:
+        """
+        批量代理签名，返回与 messages 一一对应的 (R, s, K)
+        摘要直接按字节转整数，r⁻¹ 用 Montgomery 批量求逆；p < 2^31 且安装了 NumPy 时整批向量化
+        """
+        with phase(logger, "muo.sign_many"):
+            signatures = _sign_many(self.p, self.q, self.g, self.order, delta, K, messages)
+        logger.debug("批量代理签名 n=%d", len(signatures))
+        return signatures
+
+    def verify(self, signature: Tuple[int, int, int], y_A: int, message: MessageSource) -> Tuple[bool, int, int, int]:
+        """代理签名验证（文档7.2.1节公式）"""
+        R, s, K = signature
+        if not signature_in_range(self.p, self.order, signature):
+            logger.debug("代理签名不是规范表示 R=%d s=%d K=%d", R, s, K)
+            return False, 0, 0, 0
+        with phase(logger, "muo.verify"):
+            m = hash_message(message, self.q)
+            if self.cache is not None:
+                # 已知委托：v 取自缓存，v^R 按 v 的阶约化后查表，g^m 查 g 的固定基表
+                entry = self.cache.entry(y_A, K)
+                v = entry.v
+                left = self.cache.g_pow(m)
+                right = pow(R, s, self.p) * entry.pow(R, self.p) % self.p
+            else:
+                # 计算v = y_A * K^K mod p（文档核心公式）
+                v = multi_pow_mod((y_A, K), (1, K), self.p)
+                # 验证g^m ≡ R^s * v^R mod p，右侧两个幂共享同一串平方
+                left = pow(self.g, m, self.p)
+                right = multi_pow_mod((R, v), (s, R), self.p)
+        logger.debug("验证代理签名 valid=%s v=%d", left == right, v)
+        return left == right, left, right, v
+
+    def verify_batch(self, signatures: Sequence[Tuple[int, int, int]], y_A: int, messages: Sequence[MessageSource],
+                     security_bits: int = 64) -> Tuple[bool, List[int]]:
+        """
+        批量验证同一委托下的代理签名：v = y_A * K^K 对每个不同的 K 只算一次，
+        所有验证等式用随机线性组合合并成一次多幂运算，失败时二分定位
+        返回 (是否全部有效, 无效签名下标列表)
+        """
+        if len(signatures) != len(messages):
+            raise ValueError(f"签名数 {len(signatures)} 与消息数 {len(messages)} 不一致")
+        with phase(logger, "muo.verify_batch"):
+            v_cache = {}
+            entries = []
+            canonical, rejected = [], []
+            hashes = [int.from_bytes(value, "big") % self.q for value in _digests(messages)]
+            for index, ((R, s, K), m) in enumerate(zip(signatures, hashes)):
+                if not signature_in_range(self.p, self.order, (R, s, K)):
+                    rejected.append(index)
+                    continue
+                v = v_cache.get(K)
+                if v is None:
+                    v = v_cache[K] = (self.cache.entry(y_A, K).v if self.cache is not None
+                                      else multi_pow_mod((y_A, K), (1, K), self.p))
+                canonical.append(index)
+                entries.append((m, R, s, v))
+            bad = sorted(rejected + [canonical[i] for i in _verify_entries(self.p, self.q, self.g, entries,
+                                                                             security_bits)])
+        logger.debug("批量验证代理签名 n=%d delegations=%d bad=%s", len(entries), len(v_cache), bad)
+        return not bad, bad
+
+
+# -------------------------- 3. 保护代理的MUO代理签名（确定性随机数） --------------------------
+class ProxySignatureProtected:
+    def __init__(self, params: Dict[str, int], cache: Optional["DelegationCache"] = None):
+        """cache 为验证方共享的 delegation_cache.DelegationCache（须与 params 一致），给出时验证复用已知委托"""
+        self.p, self.q, self.g = params["p"], params["q"], params["g"]
+        self.order = exponent_order(self.p, self.q, self.g)
+        if cache is not None and not cache.matches(self.p, self.q, self.g):
+            raise ValueError("委托缓存的系统参数与方案不一致")
+        self.cache = cache
+
+    def delegate(self, x_A: int, y_A: int, x_B: int, y_B: int, warrant: str = "") -> Tuple[int, int, int, int]:
+        """委托过程（k 由 x_A、代理人公钥 y_B 与委托说明派生）"""
+        with phase(logger, "muo.delegate"):
+            # 步骤1-3：与不保护代理一致
+            k = _delegation_nonce(x_A, self.q, self.order, int_to_octets(y_B, self.p), warrant.encode('utf-8'))
+            K = pow(self.g, k, self.p)
+            delta = (x_A + k * K) % self.order
+            g_delta = pow(self.g, delta, self.p)
+            # B步骤4：计算δ̄ = (δ + x_B*y_B) mod ord(g)（文档核心公式）
+            delta_bar = (delta + x_B * y_B) % self.order
+        logger.debug("委托完成 K=%d", K)
+        return delta, delta_bar, K, g_delta
+
+    def verify_delegation(self, delta: int, K: int, y_A: int) -> bool:
+        """B验证委托有效性（严格按文档公式）；有缓存时 y_A*K^K 取自缓存，g^δ 查固定基表"""
+        if self.cache is not None:
+            return self.cache.g_pow(delta) == self.cache.entry(y_A, K).v
+        yA_Kk = (y_A * pow(K, K, self.p)) % self.p
+        g_delta = pow(self.g, delta, self.p)
+        return g_delta == yA_Kk
+
+    def sign(self, delta_bar: int, K: int, message: MessageSource) -> Tuple[int, int, int, int, int]:
+        """代理签名生成（仅在委托有效时执行）"""
+        with phase(logger, "muo.sign"):
+            digest = _digest(message)
+            m = int.from_bytes(digest, "big") % self.q
+            # r ∈ Z_q^* 由 (δ̄, 消息) 派生，构造上即模 ord(g) 可逆
+            r = _sign_nonce(delta_bar, self.q, self.order, digest)
+            R = pow(self.g, r, self.p)
+
+            # 按文档公式计算s = r^-1*(m - δ̄R)，模数取 ord(g)（见 exponent_order）
+            numerator = (m - delta_bar * R) % self.order
+            s = (mod_inverse(r, self.order) * numerator) % self.order
+        logger.debug("代理签名 m=%d R=%d s=%d", m, R, s)
+
+        return R, s, K, m, delta_bar
+
+    def sign_many(self, delta_bar: int, K: int, messages: Sequence[MessageSource]) -> List[Tuple[int, int, int]]:
+        """
+        批量代理签名，返回与 messages 一一对应的签名 (R, s, K)（不含 sign 附带的 m、δ̄）
+        摘要直接按字节转整数，r⁻¹ 用 Montgomery 批量求逆；p < 2^31 且安装了 NumPy 时整批向量化
+        """
+        with phase(logger, "muo.sign_many"):
+            signatures = _sign_many(self.p, self.q, self.g, self.order, delta_bar, K, messages)
+        logger.debug("批量代理签名 n=%d", len(signatures))
+        return signatures
+
+    def verify(self, signature: Tuple[int, int, int], y_A: int, y_B: int, message: MessageSource) -> Tuple[bool, int, int, int]:
+        """代理签名验证（严格按文档7.2.2节公式）"""
+        R, s, K = signature
+        if not signature_in_range(self.p, self.order, signature):
+            logger.debug("代理签名不是规范表示 R=%d s=%d K=%d", R, s, K)
+            return False, 0, 0, 0
+        with phase(logger, "muo.verify"):
+            m = hash_message(message, self.q)
+            if self.cache is not None:
+                # 已知委托：v 取自缓存，v^R 按 v 的阶约化后查表，g^m 查 g 的固定基表
+                entry = self.cache.entry(y_A, K, y_B)
+                v = entry.v
+                left = self.cache.g_pow(m)
+                right = pow(R, s, self.p) * entry.pow(R, self.p) % self.p
+            else:
+                # 计算v = y_A * K^K * y_B^y_B mod p（文档核心公式）
+                v = multi_pow_mod((y_A, K, y_B), (1, K, y_B), self.p)
+
+                # 验证g^m ≡ R^s * v^R mod p，右侧两个幂共享同一串平方
+                left = pow(self.g, m, self.p)
+                right = multi_pow_mod((R, v), (s, R), self.p)
+        logger.debug("验证代理签名 valid=%s v=%d", left == right, v)
+
+        return left == right, left, right, v
+
+    def verify_batch(self, signatures: Sequence[Tuple[int, int, int]], y_A: int, y_B: int,
+                     messages: Sequence[MessageSource], security_bits: int = 64) -> Tuple[bool, List[int]]:
+        """
+        批量验证同一委托下的代理签名：v = y_A * K^K * y_B^y_B 对每个不同的 K 只算一次，
+        所有验证等式用随机线性组合合并成一次多幂运算，失败时二分定位
+        返回 (是否全部有效, 无效签名下标列表)
+        """
+        if len(signatures) != len(messages):
+            raise ValueError(f"签名数 {len(signatures)} 与消息数 {len(messages)} 不一致")
+        with phase(logger, "muo.verify_batch"):
+            v_cache = {}
+            entries = []
+            canonical, rejected = [], []
+            hashes = [int.from_bytes(value, "big") % self.q for value in _digests(messages)]
+            for index, ((R, s, K), m) in enumerate(zip(signatures, hashes)):
+                if not signature_in_range(self.p, self.order, (R, s, K)):
+                    rejected.append(index)
+                    continue
+                v = v_cache.get(K)
+                if v is None:
+                    v = v_cache[K] = (self.cache.entry(y_A, K, y_B).v if self.cache is not None
+                                      else multi_pow_mod((y_A, K, y_B), (1, K, y_B), self.p))
+                canonical.append(index)
+                entries.append((m, R, s, v))
+            bad = sorted(rejected + [canonical[i] for i in _verify_entries(self.p, self.q, self.g, entries,
+                                                                             security_bits)])
+        logger.debug("批量验证代理签名 n=%d delegations=%d bad=%s", len(entries), len(v_cache), bad)
+        return not bad, bad
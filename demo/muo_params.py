@@ -0,0 +1,175 @@
+"""
+MUO 代理签名的系统参数：Schnorr 子群 (p, q, g)，q | p-1，g 的阶为 q
+
+命名参数集按 (p 比特数, q 比特数) 给出，首次使用时生成并缓存到磁盘（JSON），
+之后每次加载只做结构检查和少量轮次的 Miller–Rabin，不再重新生成：
+    muo-2048-256   p 2048 比特，q 256 比特
+    muo-3072-256   p 3072 比特，q 256 比特
+缓存目录默认为 ~/.cache/muo-params，可用环境变量 MUO_PARAMS_CACHE 覆盖。
+
+生成过程：先在随机起点附近筛出 q，再在 p = 2q·j + 1 的等差数列上筛选 j；
+筛法一次性剔除能被小素数整除的候选，只有幸存者才做 Miller–Rabin，且第一轮失败即放弃。
+"""
+import json
+import logging
+import os
+import random
+from typing import Dict, List, Optional
+
+try:
+    import gmpy2
+except ImportError:  # 可选依赖：安装后模幂走 GMP
+    gmpy2 = None
+
+logger = logging.getLogger("muo.params")
+
+PARAMETER_SETS = {
+    "muo-2048-256": (2048, 256),
+    "muo-3072-256": (3072, 256),
+}
+
+SIEVE_LIMIT = 1 << 16  # 筛法使用的小素数上界
+SIEVE_WINDOW = 4096  # 每个随机起点筛选的候选个数
+MR_ROUNDS = 40  # 生成时的 Miller–Rabin 轮数（随机底数，错误概率 ≤ 4^-40）
+VALIDATE_ROUNDS = 8  # 加载缓存时复查的轮数
+DEFAULT_CACHE_DIR = os.environ.get("MUO_PARAMS_CACHE",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "muo-params"))
+
+_num = gmpy2.mpz if gmpy2 is not None else int
+
+
+def _small_primes(limit: int) -> List[int]:
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = b"\x00\x00"
+    for i in range(2, int(limit ** 0.5) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i in range(limit) if sieve[i]]
+
+
+SMALL_PRIMES = _small_primes(SIEVE_LIMIT)
+
+
+# -------------------------- 素性检测 --------------------------
+def _miller_rabin(n: int, rounds: int, rng: random.Random) -> bool:
+    """n 为大于 3 的奇数；任一轮判为合数即返回 False"""
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    n_ = _num(n)
+    for _ in range(rounds):
+        x = pow(_num(rng.randrange(2, n - 1)), d, n_)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n_
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def is_probable_prime(n: int, rounds: int = MR_ROUNDS, rng: Optional[random.Random] = None) -> bool:
+    """先用小素数试除（遇到因子立即返回），再做 Miller–Rabin"""
+    if n < 2:
+        return False
+    for ell in SMALL_PRIMES:
+        if n % ell == 0:
+            return n == ell
+        if ell * ell > n:
+            return True
+    return _miller_rabin(n, rounds, rng or random)
+
+
+# -------------------------- 筛法候选搜索 --------------------------
+def _sieve(start: int, step: int, count: int) -> bytearray:
+    """alive[t] = 1 表示 start + t·step 不被任何（不整除 step 的）小素数整除"""
+    alive = bytearray([1]) * count
+    for ell in SMALL_PRIMES:
+        if step % ell == 0:
+            continue
+        t = -start * pow(step, -1, ell) % ell
+        alive[t::ell] = bytes(len(range(t, count, ell)))
+    return alive
+
+
+def _search_progression(lo: int, hi: int, offset: int, step: int, rng: random.Random, rounds: int) -> int:
+    """在 offset + step·j (lo ≤ j ≤ hi) 中找一个素数：随机起点，逐窗口筛选后做 Miller–Rabin"""
+    while True:
+        j0 = rng.randint(lo, hi)
+        start = offset + step * j0
+        alive = _sieve(start, step, SIEVE_WINDOW)
+        for t in range(min(SIEVE_WINDOW, hi - j0 + 1)):
+            if alive[t]:
+                candidate = start + step * t
+                # 先做一轮，合数绝大多数在这里被淘汰
+                if _miller_rabin(candidate, 1, rng) and _miller_rabin(candidate, rounds - 1, rng):
+                    return candidate
+
+
+def generate_params(p_bits: int, q_bits: int, rng: Optional[random.Random] = None,
+                    rounds: int = MR_ROUNDS) -> Dict[str, int]:
+    """生成 (p, q, g)：q 为 q_bits 比特素数，p = 2q·j + 1 为 p_bits 比特素数，g = h^{(p-1)/q} ≠ 1"""
+    if q_bits < 16 or p_bits <= q_bits + 1:
+        raise ValueError(f"参数规模不合法: p {p_bits} 比特, q {q_bits} 比特")
+    rng = rng or random.SystemRandom()
+    # q = 2j + 1，j ∈ [2^{q_bits-2}, 2^{q_bits-1} - 1]
+    q = _search_progression(1 << (q_bits - 2), (1 << (q_bits - 1)) - 1, 1, 2, rng, rounds)
+    # p = 2q·j + 1 落在 [2^{p_bits-1}, 2^{p_bits})
+    step = 2 * q
+    lo = -(-((1 << (p_bits - 1)) - 1) // step)
+    hi = ((1 << p_bits) - 2) // step
+    p = _search_progression(lo, hi, 1, step, rng, rounds)
+    cofactor = (p - 1) // q
+    for h in range(2, p - 1):
+        g = pow(h, cofactor, p)
+        if g != 1:
+            return {"p": p, "q": q, "g": g}
+    raise AssertionError("找不到 q 阶元素")  # p 为素数时不可能发生
+
+
+def validate_params(params: Dict[str, int], p_bits: Optional[int] = None, q_bits: Optional[int] = None,
+                    rounds: int = VALIDATE_ROUNDS, rng: Optional[random.Random] = None):
+    """检查 p、q 为素数，q | p-1，g 的阶恰为 q；不合法时抛出 ValueError"""
+    try:
+        p, q, g = int(params["p"]), int(params["q"]), int(params["g"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"参数格式错误: {exc!r}") from None
+    if p_bits is not None and p.bit_length() != p_bits:
+        raise ValueError(f"p 应为 {p_bits} 比特，实际 {p.bit_length()} 比特")
+    if q_bits is not None and q.bit_length() != q_bits:
+        raise ValueError(f"q 应为 {q_bits} 比特，实际 {q.bit_length()} 比特")
+    if (p - 1) % q:
+        raise ValueError("q 不整除 p-1")
+    if not 1 < g < p or pow(g, q, p) != 1:
+        raise ValueError("g 的阶不是 q")
+    if not is_probable_prime(q, rounds, rng) or not is_probable_prime(p, rounds, rng):
+        raise ValueError("p 或 q 不是素数")
+
+
+# -------------------------- 命名参数集与磁盘缓存 --------------------------
+def load_parameter_set(name: str, cache_dir: Optional[str] = None) -> Dict[str, int]:
+    """加载命名参数集：缓存命中且校验通过则直接返回，否则生成并原子地写入缓存"""
+    if name not in PARAMETER_SETS:
+        raise ValueError(f"未知参数集 {name}，可选: {', '.join(PARAMETER_SETS)}")
+    p_bits, q_bits = PARAMETER_SETS[name]
+    path = os.path.join(cache_dir or DEFAULT_CACHE_DIR, f"{name}.json")
+
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                cached = json.load(fh)
+            params = {key: int(cached[key]) for key in ("p", "q", "g")}
+            validate_params(params, p_bits, q_bits)
+            return params
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("参数缓存 %s 无效，重新生成: %s", path, exc)
+
+    params = generate_params(p_bits, q_bits)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"name": name, "p_bits": p_bits, "q_bits": q_bits, **params}, fh)
+    os.replace(tmp, path)
+    return params
@@ -0,0 +1,79 @@
+"""
+签名随机数的派生（RFC 6979 风格）：HMAC-DRBG（SHA-256）以私钥和消息为种子
+
+同一 (私钥, 消息) 总是得到同一个随机数，不同消息的随机数互不相关，
+不依赖 random 模块，也不会因为随机数源出问题而重复使用 r 泄露私钥。
+需要匿名性的方案（BBS04 的签名要求同一成员对同一消息的两次签名不可链接）改用 hedged 形式：
+种子再加 32 字节系统随机数（RFC 6979 3.6 节的附加数据）。
+
+取值都是固定次数的运算：多取 EXTRA_BITS 比特再取模，偏差小于 2^-64，没有拒绝采样的重试循环。
+"""
+import hashlib
+import hmac
+import os
+from typing import List
+
+EXTRA_BITS = 64
+HASH_BYTES = 32
+
+
+def int_to_octets(value: int, modulus: int) -> bytes:
+    """按模数的字节长度定长编码（RFC 6979 的 int2octets）"""
+    return int(value).to_bytes((int(modulus).bit_length() + 7) // 8, "big")
+
+
+class HmacDrbg:
+    """NIST SP 800-90A 的 HMAC_DRBG（SHA-256），按 RFC 6979 3.2 节 b-f 步用种子初始化"""
+
+    __slots__ = ('_K', '_V', '_used')
+
+    def __init__(self, *seed: bytes):
+        self._K = b"\x00" * HASH_BYTES
+        self._V = b"\x01" * HASH_BYTES
+        self._used = False
+        self._update(b"".join(seed))
+
+    def _mac(self, data: bytes) -> bytes:
+        return hmac.digest(self._K, data, "sha256")
+
+    def _update(self, data: bytes = b""):
+        self._K = self._mac(self._V + b"\x00" + data)
+        self._V = self._mac(self._V)
+        if data:
+            self._K = self._mac(self._V + b"\x01" + data)
+            self._V = self._mac(self._V)
+
+    def generate(self, length: int) -> bytes:
+        """
+        输出 length 字节；两次输出之间更新内部状态，与 SP 800-90A 的输出序列相同。
+        更新推迟到下一次 generate（同 RFC 6979 3.2 节 h 步），只取一次值的派生省两次 HMAC
+        """
+        if self._used:
+            self._update()
+        self._used = True
+        blocks = []
+        for _ in range(-(-length // HASH_BYTES)):
+            self._V = self._mac(self._V)
+            blocks.append(self._V)
+        return b"".join(blocks)[:length]
+
+    def below(self, n: int) -> int:
+        """[0, n) 中的整数"""
+        return self.many_below(n, 1)[0]
+
+    def many_below(self, n: int, count: int) -> List[int]:
+        """count 个 [0, n) 中的整数，一次 generate 取完"""
+        size = (int(n).bit_length() + EXTRA_BITS + 7) // 8
+        data = self.generate(size * count)
+        from_bytes = int.from_bytes
+        return [from_bytes(data[i:i + size], "big") % n for i in range(0, size * count, size)]
+
+
+def message_drbg(key: int, modulus: int, message: bytes, *context: bytes) -> HmacDrbg:
+    """确定性种子：私钥 || SHA-256(消息) [|| 上下文]，私钥按模数长度定长编码"""
+    return HmacDrbg(int_to_octets(key, modulus), hashlib.sha256(message).digest(), *context)
+
+
+def hedged_drbg(key: int, modulus: int, *context: bytes) -> HmacDrbg:
+    """在确定性种子之外再加系统随机数：随机数源失效时仍不会重复，正常时输出不可预测也不可链接"""
+    return HmacDrbg(int_to_octets(key, modulus), os.urandom(HASH_BYTES), *context)
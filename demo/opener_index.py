@@ -0,0 +1,174 @@
+"""
+opener 索引：A_i 的规范编码摘要 -> 成员槽位
+
+定长开放寻址哈希表（线性探测，装载因子 ≤ 1/2），每条记录 12 字节：
+    8 字节 blake2b 摘要 + 4 字节大端槽位号（0xFFFFFFFF 表示空位）
+文件格式 = 32 字节文件头 + 记录数组，可以直接 mmap 后原地查找，不需要反序列化；
+同样的字节也可以嵌在密钥库里，用 from_buffer 在其 mmap 上查找。
+摘要只用于定位，调用方须再用完整的 A_i 确认候选槽位，以排除摘要碰撞。
+"""
+import hashlib
+import mmap
+import os
+import struct
+from typing import Iterator, Optional
+
+MAGIC = b"BBSOPIX1"
+HEADER = struct.Struct(">8sIIQ4x")  # magic, 摘要长度, 容量, 记录数
+DIGEST_SIZE = 8
+RECORD = struct.Struct(f">{DIGEST_SIZE}sI")
+EMPTY_SLOT = 0xFFFFFFFF
+MIN_CAPACITY = 16
+
+
+def digest_key(encoding: bytes) -> bytes:
+    """A_i 规范编码（G1 压缩编码）的定长摘要"""
+    return hashlib.blake2b(encoding, digest_size=DIGEST_SIZE).digest()
+
+
+class OpenerIndex:
+    """A_i 摘要到成员槽位的常数时间索引"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._buf = None
+        self._file = None
+        self._capacity = 0
+        self._count = 0
+        if path is None:
+            self._allocate(MIN_CAPACITY)
+
+    def _allocate(self, capacity):
+        self._capacity = capacity
+        self._count = 0
+        self._buf = bytearray(HEADER.size + capacity * RECORD.size)
+        empty = RECORD.pack(bytes(DIGEST_SIZE), EMPTY_SLOT)
+        self._buf[HEADER.size:] = empty * capacity
+
+    def _ensure_loaded(self):
+        """第一次访问时才打开并 mmap 索引文件"""
+        if self._buf is not None:
+            return
+        self._file = open(self._path, "rb")
+        try:
+            if os.fstat(self._file.fileno()).st_size == 0:  # 空文件无法 mmap
+                raise ValueError(f"{self._path} 不是有效的 opener 索引文件")
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._read_header(self._path)
+        except (OSError, ValueError):
+            self.close()
+            raise
+
+    def _read_header(self, source: str):
+        if len(self._buf) < HEADER.size:
+            raise ValueError(f"{source} 不是有效的 opener 索引文件")
+        magic, digest_size, capacity, count = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or digest_size != DIGEST_SIZE:
+            raise ValueError(f"{source} 不是有效的 opener 索引文件")
+        if len(self._buf) != HEADER.size + capacity * RECORD.size:
+            raise ValueError(f"{source} 长度与文件头不符")
+        if capacity < MIN_CAPACITY or capacity & (capacity - 1) or 2 * count > capacity:
+            raise ValueError(f"{source} 的容量 {capacity} 或记录数 {count} 不合法")
+        self._capacity = capacity
+        self._count = count
+
+    def _make_writable(self):
+        """mmap 或外部缓冲区上的索引在第一次写入前复制到内存"""
+        self._ensure_loaded()
+        if not isinstance(self._buf, bytearray):
+            data = bytearray(self._buf)
+            self.close()
+            self._buf = data
+
+    def __len__(self):
+        self._ensure_loaded()
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """索引占用的字节数"""
+        self._ensure_loaded()
+        return len(self._buf)
+
+    def add(self, encoding: bytes, slot: int):
+        if not 0 <= slot < EMPTY_SLOT:
+            raise ValueError(f"槽位号超出范围: {slot}")
+        self._make_writable()
+        if 2 * (self._count + 1) > self._capacity:
+            self._resize(2 * self._capacity)
+        self._insert(digest_key(encoding), slot)
+
+    def _insert(self, digest, slot):
+        mask = self._capacity - 1
+        pos = int.from_bytes(digest, "big") & mask
+        while True:
+            offset = HEADER.size + pos * RECORD.size
+            if RECORD.unpack_from(self._buf, offset)[1] == EMPTY_SLOT:
+                RECORD.pack_into(self._buf, offset, digest, slot)
+                self._count += 1
+                return
+            pos = (pos + 1) & mask
+
+    def _resize(self, capacity):
+        old_buf, old_capacity = self._buf, self._capacity
+        self._allocate(capacity)
+        for pos in range(old_capacity):
+            digest, slot = RECORD.unpack_from(old_buf, HEADER.size + pos * RECORD.size)
+            if slot != EMPTY_SLOT:
+                self._insert(digest, slot)
+
+    def lookup(self, encoding: bytes) -> Iterator[int]:
+        """依次给出摘要相同的候选槽位（通常恰好一个）"""
+        self._ensure_loaded()
+        digest = digest_key(encoding)
+        mask = self._capacity - 1
+        pos = int.from_bytes(digest, "big") & mask
+        buf = self._buf
+        for _ in range(self._capacity):  # 最多探测一圈，损坏的满表也不会死循环
+            stored, slot = RECORD.unpack_from(buf, HEADER.size + pos * RECORD.size)
+            if slot == EMPTY_SLOT:
+                return
+            if stored == digest:
+                yield slot
+            pos = (pos + 1) & mask
+
+    def view(self) -> memoryview:
+        """文件格式的只读视图（文件头已更新），供 save 和密钥库写出"""
+        self._ensure_loaded()
+        if isinstance(self._buf, bytearray):
+            HEADER.pack_into(self._buf, 0, MAGIC, DIGEST_SIZE, self._capacity, self._count)
+        return memoryview(self._buf).toreadonly()
+
+    def save(self, path: str):
+        """写入磁盘（先写临时文件再原子替换）"""
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(self.view())
+        os.replace(tmp, path)
+
+    @classmethod
+    def from_buffer(cls, data, source: str = "缓冲区") -> "OpenerIndex":
+        """直接在现有缓冲区（如密钥库 mmap 上的 memoryview）上查找，不复制；写入时才复制"""
+        index = cls.__new__(cls)
+        index._path = None
+        index._file = None
+        index._buf = data
+        index._read_header(source)
+        return index
+
+    @classmethod
+    def load(cls, path: str) -> "OpenerIndex":
+        """惰性加载：只记录路径，第一次查找时再 mmap"""
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        return cls(path)
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+            self._buf = None
+        elif isinstance(self._buf, memoryview):
+            self._buf = None  # 缓冲区归调用方（密钥库）所有，这里只放开引用
+        if self._file is not None:
+            self._file.close()
+            self._file = None
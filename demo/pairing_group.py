@@ -0,0 +1,949 @@
+"""
+BBS04 配对群算术后端
+
+按 f.properties 中的 Type F (BN 曲线) 参数实现 G1、G2、GT 三个群及最优 ate 配对：
+    G1 = E(F_q),   E : y² = x³ + b
+    G2 ⊂ E'(F_q²), E': y² = x³ + b·ξ   （M 型六次扭曲，ξ = alpha0 + alpha1·i）
+    GT ⊂ F_q¹²，   F_q² = F_q[i]/(i² - beta)，F_q¹² = F_q²[w]/(w⁶ - ξ)
+
+大整数运算有两种后端：
+    "python" —— 纯 Python 内置 int
+    "gmpy2"  —— 可选的 C 加速路径（GMP），安装 gmpy2 后自动启用
+
+元素表示（均为不可变 tuple，便于作为 dict 键）：
+    G1 仿射点 (x, y)，无穷远点为 None
+    G2 仿射点 ((x0, x1), (y0, y1))，无穷远点为 None
+    GT 元素为 12 个整数 (a0, b0, a1, b1, ..., a5, b5)，表示 Σ (a_j + b_j·i)·w^j
+"""
+import hashlib
+import math
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from multiexp import MultiExpOps, multi_exp
+
+try:
+    import gmpy2
+except ImportError:  # 可选依赖：未安装时只提供纯 Python 后端
+    gmpy2 = None
+
+DEFAULT_PARAMS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "f.properties")
+
+G1Point = Optional[Tuple[int, int]]
+G2Point = Optional[Tuple[Tuple[int, int], Tuple[int, int]]]
+GTElement = Tuple[int, ...]
+
+
+# -------------------------- 参数加载与后端选择 --------------------------
+def load_type_f_params(path: str = DEFAULT_PARAMS_PATH) -> Dict[str, int]:
+    """读取 JPBC/PBC 格式的 Type F 参数文件（type, q, r, b, beta, alpha0, alpha1）"""
+    params = {}
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) != 2:
+                continue
+            key, value = parts
+            params[key] = value if key == "type" else int(value)
+    if params.get("type") != "f":
+        raise ValueError(f"{path} 不是 Type F 参数文件")
+    missing = [k for k in ("q", "r", "b", "beta", "alpha0", "alpha1") if k not in params]
+    if missing:
+        raise ValueError(f"{path} 缺少参数: {', '.join(missing)}")
+    return params
+
+
+def available_backends() -> List[str]:
+    """当前环境可用的大整数后端"""
+    return ["python", "gmpy2"] if gmpy2 is not None else ["python"]
+
+
+class G2Prepared:
+    """G2 固定参数的 Miller 循环预计算：按循环顺序保存每一步直线的系数 (λ, λ·x_T - y_T)"""
+    __slots__ = ("point", "lines")
+
+    def __init__(self, point: G2Point, lines: List[Optional[Tuple[Tuple[int, int], Tuple[int, int]]]]):
+        self.point = point
+        self.lines = lines
+
+
+def _pow_inverse(a, m):
+    """模逆（模块级函数而非 lambda，保证 PairingGroup 可以 pickle）"""
+    return pow(a, -1, m)
+
+
+# -------------------------- 配对群 --------------------------
+class PairingGroup:
+    """Type F 配对群 (G1, G2, GT, e)"""
+
+    def __init__(self, params: Optional[Dict[str, int]] = None, backend: str = "auto"):
+        params = params if params is not None else load_type_f_params()
+        if backend == "auto":
+            backend = "gmpy2" if gmpy2 is not None else "python"
+        if backend == "gmpy2":
+            if gmpy2 is None:
+                raise ValueError("gmpy2 未安装，无法使用 C 加速后端")
+            num = gmpy2.mpz
+            self._inv_mod = gmpy2.invert
+        elif backend == "python":
+            num = int
+            self._inv_mod = _pow_inverse
+        else:
+            raise ValueError(f"未知后端: {backend}（可选: {', '.join(available_backends())}）")
+        self.backend = backend
+        self._num = num
+
+        self.q = q = num(params["q"])
+        self.r = num(params["r"])
+        self.b = num(params["b"])
+        self.beta = num(params["beta"])
+        self.xi = (num(params["alpha0"]), num(params["alpha1"]))
+        self.field_bytes = (int(q).bit_length() + 7) // 8
+
+        # BN 参数 u：q = 36u⁴+36u³+24u²+6u+1，迹 t = 6u²+1
+        t = q + 1 - self.r
+        u = num(math.isqrt(int((t - 1) // 6)))
+        if 36 * u ** 4 + 36 * u ** 3 + 24 * u ** 2 + 6 * u + 1 != q:
+            raise ValueError("参数不是 BN 曲线 (Type F)")
+        self.u = u
+        # 最优 ate 配对的 Miller 循环长度 6u+2（u > 0）
+        self._loop_bits = [int(c) for c in bin(int(6 * u + 2))[3:]]
+
+        # 扭曲曲线系数 b' = b·ξ
+        self.b2 = self._f2_mul((self.b, num(0)), self.xi)
+
+        # F_q¹² 上的 Frobenius 常数：(Σ c_j w^j)^{q^k} = Σ conj^k(c_j)·ξ^{j(q^k-1)/6}·w^j
+        self._frob = {}
+        for k in (1, 2, 3):
+            qk = q ** k
+            self._frob[k] = [self._f2_pow(self.xi, j * (qk - 1) // 6) for j in range(6)]
+        # 扭曲曲线上的 Frobenius 映射 π(x, y) = (conj(x)·ξ^{-(q-1)/3}, conj(y)·ξ^{-(q-1)/2})
+        xi_inv = self._f2_inv(self.xi)
+        self._twist_frob_x = self._f2_pow(xi_inv, (q - 1) // 3)
+        self._twist_frob_y = self._f2_pow(xi_inv, (q - 1) // 2)
+
+        self.g1 = self.hash_to_g1(b"BBS04 generator g1")
+        self.g2 = self.hash_to_g2(b"BBS04 generator g2")
+
+    # ==================== F_q² = F_q[i]/(i² - beta) ====================
+    def _f2_add(self, a, b):
+        q = self.q
+        return (a[0] + b[0]) % q, (a[1] + b[1]) % q
+
+    def _f2_sub(self, a, b):
+        q = self.q
+        return (a[0] - b[0]) % q, (a[1] - b[1]) % q
+
+    def _f2_neg(self, a):
+        q = self.q
+        return -a[0] % q, -a[1] % q
+
+    def _f2_mul(self, a, b):
+        q = self.q
+        t0 = a[0] * b[0]
+        t1 = a[1] * b[1]
+        return (t0 + self.beta * t1) % q, ((a[0] + a[1]) * (b[0] + b[1]) - t0 - t1) % q
+
+    def _f2_sqr(self, a):
+        q = self.q
+        return (a[0] * a[0] + self.beta * a[1] * a[1]) % q, 2 * a[0] * a[1] % q
+
+    def _f2_scale(self, a, k):
+        q = self.q
+        return a[0] * k % q, a[1] * k % q
+
+    def _f2_conj(self, a):
+        return a[0], -a[1] % self.q
+
+    def _f2_inv(self, a):
+        q = self.q
+        norm = (a[0] * a[0] - self.beta * a[1] * a[1]) % q
+        n_inv = self._inv_mod(norm, q)
+        return a[0] * n_inv % q, -a[1] * n_inv % q
+
+    def _f2_pow(self, a, e):
+        result = (self._num(1), self._num(0))
+        while e > 0:
+            if e & 1:
+                result = self._f2_mul(result, a)
+            a = self._f2_sqr(a)
+            e >>= 1
+        return result
+
+    def _fq_sqrt(self, a):
+        """F_q 平方根（q ≡ 3 mod 4），不存在时返回 None"""
+        q = self.q
+        s = pow(a, (q + 1) // 4, q)
+        return s if s * s % q == a % q else None
+
+    def _f2_sqrt(self, a):
+        """F_q² 平方根（范数法），不存在时返回 None"""
+        q = self.q
+        a0, a1 = a
+        if a1 == 0:
+            s = self._fq_sqrt(a0)
+            if s is not None:
+                return s, self._num(0)
+            # a0 在 F_q 中非平方，则 sqrt(a0) = s·i，其中 s² = a0/beta
+            s = self._fq_sqrt(a0 * self._inv_mod(self.beta, q) % q)
+            return (self._num(0), s) if s is not None else None
+        n = self._fq_sqrt((a0 * a0 - self.beta * a1 * a1) % q)
+        if n is None:
+            return None
+        half = self._inv_mod(self._num(2), q)
+        for sign in (n, -n):
+            x0 = self._fq_sqrt((a0 + sign) * half % q)
+            if x0:
+                x1 = a1 * self._inv_mod(2 * x0, q) % q
+                if self._f2_sqr((x0, x1)) == (a0 % q, a1 % q):
+                    return x0, x1
+        return None
+
+    # ==================== F_q¹² = F_q²[w]/(w⁶ - ξ) ====================
+    def _fq12_reduce(self, aa, bb, mm, extra_re=None, extra_im=None):
+        """把未约化的卷积结果 (Σaa, Σbb, Σmm) 折叠 w⁶ = ξ 并约化为 12 元组"""
+        q, beta = self.q, self.beta
+        n = len(aa)
+        re = [aa[k] + beta * bb[k] for k in range(n)]
+        im = [mm[k] - aa[k] - bb[k] for k in range(n)]
+        if extra_re is not None:
+            for k in range(len(extra_re)):
+                re[k] += extra_re[k]
+                im[k] += extra_im[k]
+        x0, x1 = self.xi
+        for k in range(6, n):
+            a = re[k] % q
+            c = im[k] % q
+            t0 = a * x0
+            t1 = c * x1
+            re[k - 6] += t0 + beta * t1
+            im[k - 6] += (a + c) * (x0 + x1) - t0 - t1
+        out = []
+        for k in range(6):
+            out.append(re[k] % q)
+            out.append(im[k] % q)
+        return tuple(out)
+
+    def _fq12_mul(self, x, y):
+        aa = [0] * 11
+        bb = [0] * 11
+        mm = [0] * 11
+        ya = y[0::2]
+        yb = y[1::2]
+        ys = [ya[l] + yb[l] for l in range(6)]
+        for j in range(6):
+            xa = x[2 * j]
+            xb = x[2 * j + 1]
+            xs = xa + xb
+            for l in range(6):
+                k = j + l
+                aa[k] += xa * ya[l]
+                bb[k] += xb * yb[l]
+                mm[k] += xs * ys[l]
+        return self._fq12_reduce(aa, bb, mm)
+
+    def _fq12_sqr(self, x):
+        aa = [0] * 11
+        bb = [0] * 11
+        mm = [0] * 11
+        xa = x[0::2]
+        xb = x[1::2]
+        xs = [xa[j] + xb[j] for j in range(6)]
+        for j in range(6):
+            a, b, s = xa[j], xb[j], xs[j]
+            k = 2 * j
+            aa[k] += a * a
+            bb[k] += b * b
+            mm[k] += s * s
+            a2, b2, s2 = a + a, b + b, s + s
+            for l in range(j + 1, 6):
+                k = j + l
+                aa[k] += a2 * xa[l]
+                bb[k] += b2 * xb[l]
+                mm[k] += s2 * xs[l]
+        return self._fq12_reduce(aa, bb, mm)
+
+    def _fq12_mul_line(self, f, c0, c2, c3):
+        """f · (c0 + c2·w² + c3·w³)，c0、c2 ∈ F_q²，c3 ∈ F_q（Miller 循环中的稀疏直线）"""
+        aa = [0] * 9
+        bb = [0] * 9
+        mm = [0] * 9
+        er = [0] * 9
+        ei = [0] * 9
+        p0, p1 = c0
+        r0, r1 = c2
+        ps = p0 + p1
+        rs = r0 + r1
+        for j in range(6):
+            a = f[2 * j]
+            b = f[2 * j + 1]
+            s = a + b
+            aa[j] += a * p0
+            bb[j] += b * p1
+            mm[j] += s * ps
+            aa[j + 2] += a * r0
+            bb[j + 2] += b * r1
+            mm[j + 2] += s * rs
+            er[j + 3] += a * c3
+            ei[j + 3] += b * c3
+        return self._fq12_reduce(aa, bb, mm, er, ei)
+
+    def _fq12_conj(self, x):
+        """x^{q⁶}：w ↦ -w。对 GT（分圆子群）元素即为求逆"""
+        q = self.q
+        return tuple(x[k] if (k >> 1) % 2 == 0 else -x[k] % q for k in range(12))
+
+    def _fq12_frob(self, x, k):
+        """x^{q^k}，k ∈ {1, 2, 3}"""
+        consts = self._frob[k]
+        out = []
+        for j in range(6):
+            c = (x[2 * j], x[2 * j + 1])
+            if k % 2 == 1:
+                c = self._f2_conj(c)
+            out.extend(self._f2_mul(c, consts[j]))
+        return tuple(out)
+
+    def _f6_mul(self, a, b):
+        """F_q⁶ = F_q²[v]/(v³ - ξ) 乘法（仅用于求逆）"""
+        m, add, xi = self._f2_mul, self._f2_add, self.xi
+        t0, t1, t2 = m(a[0], b[0]), m(a[1], b[1]), m(a[2], b[2])
+        c0 = add(t0, m(xi, add(m(a[1], b[2]), m(a[2], b[1]))))
+        c1 = add(add(m(a[0], b[1]), m(a[1], b[0])), m(xi, t2))
+        c2 = add(add(m(a[0], b[2]), m(a[2], b[0])), t1)
+        return c0, c1, c2
+
+    def _f6_inv(self, a):
+        m, sub, sqr, xi = self._f2_mul, self._f2_sub, self._f2_sqr, self.xi
+        t0 = sub(sqr(a[0]), m(xi, m(a[1], a[2])))
+        t1 = sub(m(xi, sqr(a[2])), m(a[0], a[1]))
+        t2 = sub(sqr(a[1]), m(a[0], a[2]))
+        den = self._f2_add(m(a[0], t0), m(xi, self._f2_add(m(a[2], t1), m(a[1], t2))))
+        den_inv = self._f2_inv(den)
+        return m(t0, den_inv), m(t1, den_inv), m(t2, den_inv)
+
+    def _fq12_inv(self, x):
+        """通用求逆：视 F_q¹² = F_q⁶[w]/(w² - v)，(A + B·w)⁻¹ = (A - B·w)/(A² - B²·v)"""
+        c = [(x[2 * j], x[2 * j + 1]) for j in range(6)]
+        A = (c[0], c[2], c[4])
+        B = (c[1], c[3], c[5])
+        A2 = self._f6_mul(A, A)
+        B2 = self._f6_mul(B, B)
+        B2v = (self._f2_mul(self.xi, B2[2]), B2[0], B2[1])
+        den_inv = self._f6_inv(tuple(self._f2_sub(A2[k], B2v[k]) for k in range(3)))
+        A_ = self._f6_mul(A, den_inv)
+        B_ = self._f6_mul(tuple(self._f2_neg(e) for e in B), den_inv)
+        out = []
+        for k in range(3):
+            out.extend(A_[k])
+            out.extend(B_[k])
+        return tuple(out)
+
+    def _fq12_pow(self, x, e):
+        """4 比特固定窗口幂运算（e ≥ 0）"""
+        if e == 0:
+            return self.gt_one()
+        table = [x]
+        for _ in range(14):
+            table.append(self._fq12_mul(table[-1], x))
+        result = None
+        nbits = int(e).bit_length()
+        top = (nbits + 3) // 4 * 4
+        for shift in range(top - 4, -1, -4):
+            if result is not None:
+                result = self._fq12_sqr(self._fq12_sqr(self._fq12_sqr(self._fq12_sqr(result))))
+            digit = int((e >> shift) & 15)
+            if digit:
+                result = table[digit - 1] if result is None else self._fq12_mul(result, table[digit - 1])
+        return result
+
+    def _final_exp(self, f):
+        """最终幂 f^{(q¹²-1)/r}：易部分 (q⁶-1)(q²+1)，难部分按 Scott 等人的 BN 加法链"""
+        f = self._fq12_mul(self._fq12_conj(f), self._fq12_inv(f))
+        f = self._fq12_mul(self._fq12_frob(f, 2), f)
+        mul, sqr, conj, frob = self._fq12_mul, self._fq12_sqr, self._fq12_conj, self._fq12_frob
+        fx = self._fq12_pow(f, self.u)
+        fx2 = self._fq12_pow(fx, self.u)
+        fx3 = self._fq12_pow(fx2, self.u)
+        y0 = mul(mul(frob(f, 1), frob(f, 2)), frob(f, 3))
+        y1 = conj(f)
+        y2 = frob(fx2, 2)
+        y3 = conj(frob(fx, 1))
+        y4 = conj(mul(fx, frob(fx2, 1)))
+        y5 = conj(fx2)
+        y6 = conj(mul(fx3, frob(fx3, 1)))
+        t0 = mul(mul(sqr(y6), y4), y5)
+        t1 = mul(mul(y3, y5), t0)
+        t0 = mul(t0, y2)
+        t1 = sqr(mul(sqr(t1), t0))
+        t0 = mul(t1, y1)
+        t1 = mul(t1, y0)
+        return mul(sqr(t0), t1)
+
+    # ==================== G1 = E(F_q) ====================
+    def g1_is_on_curve(self, P: G1Point) -> bool:
+        if P is None:
+            return True
+        x, y = P
+        q = self.q
+        return 0 <= x < q and 0 <= y < q and (y * y - x * x * x - self.b) % q == 0
+
+    def g1_neg(self, P: G1Point) -> G1Point:
+        return None if P is None else (P[0], -P[1] % self.q)
+
+    def _jac_double(self, P):
+        X, Y, Z = P
+        if Z == 0 or Y == 0:
+            return (1, 1, 0)
+        q = self.q
+        A = X * X % q
+        B = Y * Y % q
+        C = B * B % q
+        D = 2 * ((X + B) ** 2 - A - C) % q
+        E = 3 * A
+        X3 = (E * E - 2 * D) % q
+        return X3, (E * (D - X3) - 8 * C) % q, 2 * Y * Z % q
+
+    def _jac_add_affine(self, P, Q):
+        """Jacobian + 仿射 的混合加法"""
+        if Q is None:
+            return P
+        X1, Y1, Z1 = P
+        if Z1 == 0:
+            return Q[0], Q[1], 1
+        q = self.q
+        Z1Z1 = Z1 * Z1 % q
+        U2 = Q[0] * Z1Z1 % q
+        S2 = Q[1] * Z1 * Z1Z1 % q
+        H = (U2 - X1) % q
+        rr = 2 * (S2 - Y1) % q
+        if H == 0:
+            return self._jac_double(P) if rr == 0 else (1, 1, 0)
+        HH = H * H % q
+        I = 4 * HH
+        J = H * I % q
+        V = X1 * I % q
+        X3 = (rr * rr - J - 2 * V) % q
+        Y3 = (rr * (V - X3) - 2 * Y1 * J) % q
+        Z3 = ((Z1 + H) ** 2 - Z1Z1 - HH) % q
+        return X3, Y3, Z3
+
+    def _jac_add(self, P, Q):
+        """Jacobian + Jacobian 加法"""
+        X1, Y1, Z1 = P
+        X2, Y2, Z2 = Q
+        if Z1 == 0:
+            return Q
+        if Z2 == 0:
+            return P
+        q = self.q
+        Z1Z1 = Z1 * Z1 % q
+        Z2Z2 = Z2 * Z2 % q
+        U1 = X1 * Z2Z2 % q
+        U2 = X2 * Z1Z1 % q
+        S1 = Y1 * Z2 * Z2Z2 % q
+        S2 = Y2 * Z1 * Z1Z1 % q
+        H = (U2 - U1) % q
+        rr = 2 * (S2 - S1) % q
+        if H == 0:
+            return self._jac_double(P) if rr == 0 else (1, 1, 0)
+        I = 4 * H * H % q
+        J = H * I % q
+        V = U1 * I % q
+        X3 = (rr * rr - J - 2 * V) % q
+        Y3 = (rr * (V - X3) - 2 * S1 * J) % q
+        Z3 = ((Z1 + Z2) ** 2 - Z1Z1 - Z2Z2) * H % q
+        return X3, Y3, Z3
+
+    def _jac_to_affine(self, P) -> G1Point:
+        X, Y, Z = P
+        if Z == 0:
+            return None
+        q = self.q
+        z_inv = self._inv_mod(Z, q)
+        z2 = z_inv * z_inv % q
+        return X * z2 % q, Y * z2 * z_inv % q
+
+    def _jac_batch_to_affine(self, points) -> List[G1Point]:
+        """批量转仿射坐标（Montgomery 技巧）：n 个点只做一次求逆，另加约 3n 次乘法"""
+        q = self.q
+        prefix = []
+        acc = 1
+        for X, Y, Z in points:
+            prefix.append(acc)
+            if Z:
+                acc = acc * Z % q
+        inv = self._inv_mod(acc, q)
+        result = [None] * len(points)
+        for i in range(len(points) - 1, -1, -1):
+            X, Y, Z = points[i]
+            if not Z:
+                continue
+            z_inv = inv * prefix[i] % q
+            inv = inv * Z % q
+            z2 = z_inv * z_inv % q
+            result[i] = (X * z2 % q, Y * z2 * z_inv % q)
+        return result
+
+    def g1_add(self, P: G1Point, Q: G1Point) -> G1Point:
+        if P is None:
+            return Q
+        return self._jac_to_affine(self._jac_add_affine((P[0], P[1], 1), Q))
+
+    def g1_sub(self, P: G1Point, Q: G1Point) -> G1Point:
+        return self.g1_add(P, self.g1_neg(Q))
+
+    def _g1_mul_jac(self, P: G1Point, k: int):
+        """朴素的二进制倍点-加法，结果保留 Jacobian 坐标"""
+        k %= self.r
+        if P is None or k == 0:
+            return (1, 1, 0)
+        acc = (P[0], P[1], 1)
+        for bit in bin(int(k))[3:]:
+            acc = self._jac_double(acc)
+            if bit == "1":
+                acc = self._jac_add_affine(acc, P)
+        return acc
+
+    def g1_mul(self, P: G1Point, k: int) -> G1Point:
+        """朴素的二进制倍点-加法标量乘 k·P"""
+        return self._jac_to_affine(self._g1_mul_jac(P, k))
+
+    def _g1_ops(self) -> MultiExpOps:
+        """G1 的多标量乘运算：累加在 Jacobian 坐标下进行，窗口表批量转仿射后用混合加法"""
+        return MultiExpOps((1, 1, 0), self._jac_add, self._jac_double, mul_mixed=self._jac_add_affine,
+                           lift=lambda P: (P[0], P[1], 1), normalize=self._jac_batch_to_affine)
+
+    def g1_multi_mul(self, points: Sequence[G1Point], scalars: Sequence[int]) -> G1Point:
+        """Σ k_i·P_i，所有点共享同一串倍点（少量点用 Straus，大量点用 Pippenger），最后只做一次求逆"""
+        r = self.r
+        terms = [(P, int(k % r)) for P, k in zip(points, scalars) if P is not None]
+        acc = multi_exp(self._g1_ops(), [P for P, _ in terms], [k for _, k in terms])
+        return self._jac_to_affine(acc)
+
+    def g1_to_bytes(self, P: G1Point) -> bytes:
+        """压缩编码：x 坐标大端，最高位标记无穷远点，次高位标记 y 的奇偶"""
+        n = self.field_bytes
+        if P is None:
+            return (1 << (8 * n - 1)).to_bytes(n, "big")
+        x, y = P
+        return (int(x) | (int(y) & 1) << (8 * n - 2)).to_bytes(n, "big")
+
+    def g1_from_bytes(self, data: bytes) -> G1Point:
+        n = self.field_bytes
+        if len(data) != n:
+            raise ValueError(f"G1 编码长度应为 {n} 字节")
+        value = int.from_bytes(data, "big")
+        if value >> (8 * n - 1):
+            if value != 1 << (8 * n - 1):
+                raise ValueError("非法的无穷远点编码")
+            return None
+        odd = (value >> (8 * n - 2)) & 1
+        x = self._num(value & ((1 << (8 * n - 2)) - 1))
+        if x >= self.q:
+            raise ValueError("x 坐标超出域范围")
+        y = self._fq_sqrt((x * x * x + self.b) % self.q)
+        if y is None:
+            raise ValueError("x 坐标不在曲线上")
+        if int(y) & 1 != odd:
+            y = -y % self.q
+        return x, y
+
+    def hash_to_g1(self, data: bytes) -> G1Point:
+        """try-and-increment 哈希到 G1（BN 曲线 G1 余因子为 1）"""
+        q = self.q
+        counter = 0
+        while True:
+            digest = hashlib.sha256(data + counter.to_bytes(4, "big")).digest()
+            x = self._num(int.from_bytes(digest, "big")) % q
+            y = self._fq_sqrt((x * x * x + self.b) % q)
+            if y is not None:
+                return x, y
+            counter += 1
+
+    # ==================== G2 ⊂ E'(F_q²) ====================
+    def g2_is_on_curve(self, Q: G2Point) -> bool:
+        if Q is None:
+            return True
+        x, y = Q
+        rhs = self._f2_add(self._f2_mul(self._f2_sqr(x), x), self.b2)
+        return self._f2_sqr(y) == rhs
+
+    def g2_neg(self, Q: G2Point) -> G2Point:
+        return None if Q is None else (Q[0], self._f2_neg(Q[1]))
+
+    def _g2_slope(self, P, Q):
+        """P、Q 两点连线（或切线）的斜率，垂直线返回 None"""
+        if P[0] == Q[0]:
+            if P[1] != Q[1] or P[1] == (0, 0):
+                return None
+            num = self._f2_scale(self._f2_sqr(P[0]), 3)
+            return self._f2_mul(num, self._f2_inv(self._f2_scale(P[1], 2)))
+        return self._f2_mul(self._f2_sub(Q[1], P[1]), self._f2_inv(self._f2_sub(Q[0], P[0])))
+
+    def g2_add(self, P: G2Point, Q: G2Point) -> G2Point:
+        if P is None:
+            return Q
+        if Q is None:
+            return P
+        lam = self._g2_slope(P, Q)
+        if lam is None:
+            return None
+        x3 = self._f2_sub(self._f2_sub(self._f2_sqr(lam), P[0]), Q[0])
+        y3 = self._f2_sub(self._f2_mul(lam, self._f2_sub(P[0], x3)), P[1])
+        return x3, y3
+
+    def g2_mul(self, Q: G2Point, k: int) -> G2Point:
+        """仿射坐标标量乘（G2 只在密钥生成时使用，不在热路径上）"""
+        result = None
+        k = int(k)
+        while k > 0 and Q is not None:
+            if k & 1:
+                result = self.g2_add(result, Q)
+            Q = self.g2_add(Q, Q)
+            k >>= 1
+        return result
+
+    def _g2_frobenius(self, Q):
+        x, y = Q
+        return (self._f2_mul(self._f2_conj(x), self._twist_frob_x),
+                self._f2_mul(self._f2_conj(y), self._twist_frob_y))
+
+    def g2_to_bytes(self, Q: G2Point) -> bytes:
+        n = self.field_bytes
+        if Q is None:
+            return bytes(4 * n)
+        return b"".join(int(c).to_bytes(n, "big") for c in (Q[0][0], Q[0][1], Q[1][0], Q[1][1]))
+
+    def g2_from_bytes(self, data: bytes) -> G2Point:
+        n = self.field_bytes
+        if len(data) != 4 * n:
+            raise ValueError(f"G2 编码长度应为 {4 * n} 字节")
+        if not any(data):
+            return None
+        c = [self._num(int.from_bytes(data[i * n:(i + 1) * n], "big")) for i in range(4)]
+        Q = ((c[0], c[1]), (c[2], c[3]))
+        if any(v >= self.q for v in c) or not self.g2_is_on_curve(Q):
+            raise ValueError("G2 点不在扭曲曲线上")
+        return Q
+
+    def hash_to_g2(self, data: bytes) -> G2Point:
+        """try-and-increment 哈希到扭曲曲线，再乘余因子 2q - r 落入 r 阶子群"""
+        q = self.q
+        counter = 0
+        while True:
+            digest = hashlib.sha512(data + counter.to_bytes(4, "big")).digest()
+            x = (self._num(int.from_bytes(digest[:32], "big")) % q,
+                 self._num(int.from_bytes(digest[32:], "big")) % q)
+            y = self._f2_sqrt(self._f2_add(self._f2_mul(self._f2_sqr(x), x), self.b2))
+            if y is not None:
+                Q = self.g2_mul((x, y), 2 * q - self.r)
+                if Q is not None:
+                    return Q
+            counter += 1
+
+    # ==================== 配对 e: G1 × G2 → GT ====================
+    def _line(self, T, Q):
+        """返回 (直线系数, T+Q)；垂直线落在子域中、会被最终幂消去，系数记为 None"""
+        lam = self._g2_slope(T, Q)
+        if lam is None:
+            return None, self.g2_add(T, Q)
+        x3 = self._f2_sub(self._f2_sub(self._f2_sqr(lam), T[0]), Q[0])
+        y3 = self._f2_sub(self._f2_mul(lam, self._f2_sub(T[0], x3)), T[1])
+        return (lam, self._f2_sub(self._f2_mul(lam, T[0]), T[1])), (x3, y3)
+
+    def prepare_g2(self, Q: G2Point) -> G2Prepared:
+        """为固定的 G2 参数预计算最优 ate 配对 Miller 循环中所有直线系数"""
+        if Q is None:
+            return G2Prepared(None, [])
+        lines = []
+        T = Q
+        for bit in self._loop_bits:
+            line, T = self._line(T, T)
+            lines.append(line)
+            if bit:
+                line, T = self._line(T, Q)
+                lines.append(line)
+        Q1 = self._g2_frobenius(Q)
+        Q2 = self.g2_neg(self._g2_frobenius(Q1))
+        line, T = self._line(T, Q1)
+        lines.append(line)
+        line, T = self._line(T, Q2)
+        lines.append(line)
+        return G2Prepared(Q, lines)
+
+    def miller_loop(self, pairs: Sequence[Tuple[G1Point, G2Prepared]]) -> GTElement:
+        """多配对共享的 Miller 循环（不含最终幂）"""
+        q = self.q
+        active = [(P, Qp) for P, Qp in pairs if P is not None and Qp.point is not None]
+        f = self.gt_one()
+        evals = [(-P[0] % q, P[1], Qp.lines) for P, Qp in active]
+        idx = 0
+
+        def apply(f, idx):
+            for neg_x, y, lines in evals:
+                line = lines[idx]
+                if line is not None:
+                    lam, c0 = line
+                    f = self._fq12_mul_line(f, c0, self._f2_scale(lam, neg_x), y)
+            return f
+
+        first = True
+        for bit in self._loop_bits:
+            if not first:
+                f = self._fq12_sqr(f)
+            first = False
+            f = apply(f, idx)
+            idx += 1
+            if bit:
+                f = apply(f, idx)
+                idx += 1
+        f = apply(f, idx)
+        f = apply(f, idx + 1)
+        return f
+
+    def g2_prepared_to_bytes(self, prepared: G2Prepared) -> bytes:
+        """直线系数的定长编码：每条直线 1 个标志字节（0 表示垂直线）+ λ、c0 共 4 个坐标（垂直线填 0）"""
+        n = self.field_bytes
+        blank = bytes(4 * n)
+        parts = []
+        for line in prepared.lines:
+            if line is None:
+                parts.append(b"\x00" + blank)
+            else:
+                parts.append(b"\x01" + b"".join(int(c).to_bytes(n, "big") for pair in line for c in pair))
+        return b"".join(parts)
+
+    def g2_prepared_from_bytes(self, point: G2Point, data) -> G2Prepared:
+        """由 g2_prepared_to_bytes 的结果恢复（data 可以是 memoryview）；长度不符时抛出 ValueError"""
+        n = self.field_bytes
+        size = 1 + 4 * n
+        if point is None or len(data) % size:
+            raise ValueError("Miller 循环直线编码长度不符")
+        lines = []
+        for offset in range(0, len(data), size):
+            if not data[offset]:
+                lines.append(None)
+                continue
+            c = self.coords_from_bytes(data[offset + 1:offset + size])
+            lines.append(((c[0], c[1]), (c[2], c[3])))
+        return G2Prepared(point, lines)
+
+    def pairing(self, P: G1Point, Q) -> GTElement:
+        """e(P, Q)，Q 可以是 G2 仿射点或 prepare_g2 的结果"""
+        return self.multi_pairing([(P, Q)])
+
+    def multi_pairing(self, pairs) -> GTElement:
+        """Π e(P_i, Q_i)，只做一次最终幂"""
+        prepared = [(P, Q if isinstance(Q, G2Prepared) else self.prepare_g2(Q)) for P, Q in pairs]
+        return self._final_exp(self.miller_loop(prepared))
+
+    # ==================== GT ====================
+    def gt_one(self) -> GTElement:
+        one, zero = self._num(1), self._num(0)
+        return (one,) + (zero,) * 11
+
+    def gt_mul(self, x: GTElement, y: GTElement) -> GTElement:
+        return self._fq12_mul(x, y)
+
+    def gt_inv(self, x: GTElement) -> GTElement:
+        return self._fq12_conj(x)
+
+    def gt_pow(self, x: GTElement, e: int) -> GTElement:
+        e %= self.r
+        return self._fq12_pow(x, e)
+
+    def gt_in_subgroup(self, x: GTElement) -> bool:
+        """
+        x 是否属于 r 阶子群（x^r = 1）；gt_from_bytes 不做这项检查
+        BN 曲线 r = q + 1 - t，x^r = 1 等价于 x^q = x^{t-1} = x^{6u²}：一次 Frobenius 加上长度约为 r 一半的幂
+        """
+        return self._fq12_frob(x, 1) == self._fq12_pow(x, 6 * self.u * self.u)
+
+    def gt_multi_pow(self, elements: Sequence[GTElement], exponents: Sequence[int]) -> GTElement:
+        """Π x_i^{e_i}（e_i ≥ 0），所有底数共享同一串平方（少量底数用 Straus，大量底数用 Pippenger）"""
+        ops = MultiExpOps(self.gt_one(), self._fq12_mul, self._fq12_sqr)
+        return multi_exp(ops, elements, exponents)
+
+    def gt_to_bytes(self, x: GTElement) -> bytes:
+        n = self.field_bytes
+        return b"".join(int(c).to_bytes(n, "big") for c in x)
+
+    def gt_from_bytes(self, data: bytes) -> GTElement:
+        """只检查长度与系数范围，不检查是否属于 r 阶子群"""
+        n = self.field_bytes
+        if len(data) != 12 * n:
+            raise ValueError(f"GT 编码长度应为 {12 * n} 字节")
+        x = tuple(self._num(int.from_bytes(data[i * n:(i + 1) * n], "big")) for i in range(12))
+        if any(c >= self.q for c in x):
+            raise ValueError("GT 系数超出域范围")
+        return x
+
+    def coords_from_bytes(self, data) -> list:
+        """定长大端坐标串 -> 坐标列表（不检查范围，只用于带完整性校验的预计算数据）"""
+        n = self.field_bytes
+        num, from_bytes = self._num, int.from_bytes
+        return [num(from_bytes(data[i:i + n], "big")) for i in range(0, len(data), n)]
+
+    # ==================== Z_r ====================
+    def hash_to_zr(self, *parts: bytes) -> int:
+        """H(parts) ∈ Z_r，各部分带长度前缀以避免拼接歧义"""
+        h = hashlib.sha256()
+        for part in parts:
+            h.update(len(part).to_bytes(4, "big"))
+            h.update(part)
+        return self._num(int.from_bytes(h.digest(), "big")) % self.r
+
+    def zr_inv(self, a: int) -> int:
+        return self._inv_mod(a % self.r, self.r)
+
+    def zr_batch_inv(self, values: Sequence[int]) -> List[int]:
+        """批量求逆（Montgomery 技巧）：n 个元素只做一次求逆，另加约 3n 次乘法；元素须非零"""
+        r = self.r
+        prefix = []
+        acc = 1
+        for a in values:
+            prefix.append(acc)
+            acc = acc * a % r
+        inv = self._inv_mod(acc, r)
+        result = [0] * len(values)
+        for i in range(len(values) - 1, -1, -1):
+            result[i] = inv * prefix[i] % r
+            inv = inv * values[i] % r
+        return result
+
+
+# -------------------------- 固定基预计算表 --------------------------
+class _StoredTable:
+    """
+    固定基表的定长编码：按行依次存放每个元素的 COORDS 个坐标（大端、field_bytes 字节）
+    from_buffer 只记下缓冲区（可以是密钥库 mmap 上的 memoryview），第一次访问 table 时才解码，
+    此后与现场构造的表完全相同，查表路径上没有额外判断
+    """
+
+    COORDS = 0
+
+    @staticmethod
+    def windows(group: PairingGroup, window: int) -> int:
+        return (int(group.r).bit_length() + window - 1) // window
+
+    def to_bytes(self) -> bytes:
+        n = self.group.field_bytes
+        return b"".join(int(c).to_bytes(n, "big") for row in self.table for entry in row for c in entry)
+
+    @classmethod
+    def from_buffer(cls, group: PairingGroup, base, window: int, data):
+        expected = cls.windows(group, window) * ((1 << window) - 1) * cls.COORDS * group.field_bytes
+        if len(data) != expected:
+            raise ValueError(f"预计算表长度应为 {expected} 字节，实际 {len(data)}")
+        table = cls.__new__(cls)
+        table.group = group
+        table.base = base
+        table.window = window
+        table._buffer = data
+        return table
+
+    def _decode(self, data) -> list:
+        coords = self.group.coords_from_bytes(data)
+        k = self.COORDS
+        entries = [tuple(coords[i:i + k]) for i in range(0, len(coords), k)]
+        per_row = (1 << self.window) - 1
+        return [entries[i:i + per_row] for i in range(0, len(entries), per_row)]
+
+    def __getattr__(self, name):
+        # 只在实例上没有 table 时调用：from_buffer 构造的表在这里解码一次
+        if name == 'table' and '_buffer' in self.__dict__:
+            self.table = self._decode(self.__dict__.pop('_buffer'))
+            return self.table
+        raise AttributeError(name)
+
+    def __getstate__(self):
+        # 序列化前先解码，不把 mmap 上的缓冲区交给 pickle
+        self.table
+        return self.__dict__
+
+
+class FixedBaseTable(_StoredTable):
+    """
+    G1 固定基窗口表：table[i][d-1] = d·2^{w·i}·P（仿射坐标）
+    k·P 只需 ⌈log₂r / w⌉ 次混合加法，不再需要倍点
+    """
+
+    COORDS = 2
+
+    def __init__(self, group: PairingGroup, base: G1Point, window: int = 4):
+        self.group = group
+        self.base = base
+        self.window = window
+        self.table = []
+        nwin = self.windows(group, window)
+        point = (base[0], base[1], 1)
+        for _ in range(nwin):
+            row = []
+            acc = point
+            for _ in range((1 << window) - 1):
+                row.append(group._jac_to_affine(acc))
+                acc = group._jac_add(acc, point)
+            self.table.append(row)
+            for _ in range(window):
+                point = group._jac_double(point)
+
+    def _mul_jac(self, k: int):
+        group = self.group
+        k = int(k % group.r)
+        w = self.window
+        mask = (1 << w) - 1
+        acc = (1, 1, 0)
+        for row in self.table:
+            digit = k & mask
+            if digit:
+                acc = group._jac_add_affine(acc, row[digit - 1])
+            k >>= w
+            if not k:
+                break
+        return acc
+
+    def mul(self, k: int) -> G1Point:
+        return self.group._jac_to_affine(self._mul_jac(k))
+
+    def mul_many(self, scalars: Sequence[int]) -> List[G1Point]:
+        """一批 k·P：结果留在 Jacobian 坐标，最后一起转仿射（整批只做一次求逆）"""
+        return self.group._jac_batch_to_affine([self._mul_jac(k) for k in scalars])
+
+
+class GTFixedBaseTable(_StoredTable):
+    """
+    GT 固定基窗口表：table[i][d-1] = x^{d·2^{w·i}}
+    x^k 只需 ⌈log₂r / w⌉ 次 F_q¹² 乘法，不再需要平方（可变底数的 gt_pow 约需 log₂r 次平方）
+    """
+
+    COORDS = 12
+
+    def __init__(self, group: PairingGroup, base: GTElement, window: int = 4):
+        self.group = group
+        self.base = base
+        self.window = window
+        self.table = []
+        nwin = self.windows(group, window)
+        point = base
+        for _ in range(nwin):
+            row = [point]
+            for _ in range((1 << window) - 2):
+                row.append(group._fq12_mul(row[-1], point))
+            self.table.append(row)
+            point = group._fq12_mul(row[-1], point)  # x^{2^{w(i+1)}}
+
+    def pow(self, k: int) -> GTElement:
+        group = self.group
+        k = int(k % group.r)
+        w = self.window
+        mask = (1 << w) - 1
+        acc = None
+        for row in self.table:
+            digit = k & mask
+            if digit:
+                acc = row[digit - 1] if acc is None else group._fq12_mul(acc, row[digit - 1])
+            k >>= w
+            if not k:
+                break
+        return group.gt_one() if acc is None else acc
@@ -0,0 +1,407 @@
+"""
+重放检测：验证方记住已经接受过的签名，同一签名第二次出现时拒绝
+
+签名按内容取 16 字节 blake2b 摘要作为键：BBS04 为 (T₁, T₂, T₃, c)，MUO 为 (R, s, K)。
+    guard = ReplayGuard("replay-dir", rotation=3600, generations=24)
+    key = bbs04_key(gs.group, signature)
+    reason = guard.check(key)                      # 快速拒绝已见过的签名
+    if reason is None and gs.verify(signature):
+        reason = guard.record(key)                 # 验证通过后原子地登记；并发的同一签名只有一个成功
+
+两级结构：
+    布隆过滤器（内存）  可扩展布隆过滤器（Almeida 等）：容量用满时追加一级，容量 ×growth、误判率 ×tightening，
+                        总误判率不超过 error_rate；未命中就一定是新签名，不碰磁盘
+    精确索引（磁盘）    与 opener 索引相同的定长开放寻址表（16 字节键，全零为空位），mmap 后原地查找与插入，
+                        只在布隆过滤器命中时查询，用来排除误判
+按时间分代：每 rotation 秒开一代新的过滤器与索引文件，只保留最近 generations 代，最旧的一代整体丢弃，
+内存与磁盘占用由窗口内的签名数决定而不会无限增长。窗口之外的旧签名不再被识别为重放，
+调用方应同时拒绝过期的签名（例如要求签名带有当前 epoch 的标签，见 GroupSignature.sign）。
+
+索引文件的写入不逐条 fsync，轮换与 close 时 flush；进程重启时从目录中的索引文件重建过滤器。
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+KEY_SIZE = 16
+REPLAY_REASON = "签名已经出现过（重放）"
+
+
+# -------------------------- 签名的键 --------------------------
+def replay_key(*parts: bytes) -> bytes:
+    """各部分带长度前缀后的 16 字节 blake2b 摘要"""
+    h = hashlib.blake2b(digest_size=KEY_SIZE, person=b"replay-guard")
+    for part in parts:
+        h.update(len(part).to_bytes(4, "big"))
+        h.update(part)
+    return h.digest()
+
+
+def bbs04_key(group, signature) -> bytes:
+    """BBS04 签名的键：T₁, T₂, T₃ 的规范编码与 c"""
+    c_bytes = (int(group.r).bit_length() + 7) // 8
+    return replay_key(*(group.g1_to_bytes(signature[field]) for field in ('T1', 'T2', 'T3')),
+                      int(signature['c']).to_bytes(c_bytes, "big"))
+
+
+def muo_key(scheme, signature: Sequence[int]) -> bytes:
+    """
+    MUO 代理签名 (R, s, K) 的键：R、K 约化到模 p、s 约化到模 ord(g) 后按定长编码，
+    (R+p, s, K)、(R, s+ord, K) 之类的变形与原签名得到同一个键（scheme 为 muo 中的方案，给出 p 与 order）
+    """
+    R, s, K = signature[:3]
+    p_bytes = (scheme.p.bit_length() + 7) // 8
+    s_bytes = (scheme.order.bit_length() + 7) // 8
+    return replay_key((R % scheme.p).to_bytes(p_bytes, "big"), (s % scheme.order).to_bytes(s_bytes, "big"),
+                      (K % scheme.p).to_bytes(p_bytes, "big"))
+
+
+# -------------------------- 布隆过滤器 --------------------------
+def bloom_shape(capacity: int, error_rate: float) -> Tuple[int, int]:
+    """容量 n、误判率 ε 的最优位数 m = ⌈-n·ln ε / ln²2⌉（取整到字节）与哈希数 k = ⌈log₂(1/ε)⌉"""
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    return -(-bits // 8) * 8, max(1, math.ceil(-math.log2(error_rate)))
+
+
+class BloomFilter:
+    """定长布隆过滤器；键已经是均匀的摘要，两个 64 比特半段直接做双重哈希 h₁ + j·h₂"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits, self.hashes = bloom_shape(capacity, error_rate)
+        self.count = 0
+        self._array = bytearray(self.bits // 8)
+
+    def _positions(self, key: bytes):
+        h1 = int.from_bytes(key[:8], "big")
+        h2 = int.from_bytes(key[8:16], "big") | 1
+        m = self.bits
+        return [(h1 + j * h2) % m for j in range(self.hashes)]
+
+    def __contains__(self, key: bytes) -> bool:
+        array = self._array
+        return all(array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def add(self, key: bytes):
+        array = self._array
+        for pos in self._positions(key):
+            array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._array)
+
+    def estimated_error_rate(self) -> float:
+        """按当前条目数估计的误判率 (1 - e^{-kn/m})^k"""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+
+class ScalableBloomFilter:
+    """可扩展布隆过滤器：各级误判率 ε·(1-r)·r^i 之和不超过 ε，条目数不必事先知道"""
+
+    def __init__(self, capacity: int = 1 << 20, error_rate: float = 1e-3, growth: int = 2,
+                 tightening: float = 0.5):
+        if not 0 < error_rate < 1 or not 0 < tightening < 1 or growth < 1 or capacity < 1:
+            raise ValueError("可扩展布隆过滤器参数无效")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.filters: List[BloomFilter] = []
+
+    def stage(self, index: int) -> Tuple[int, float]:
+        """第 index 级的 (容量, 误判率)"""
+        return (self.capacity * self.growth ** index,
+                self.error_rate * (1 - self.tightening) * self.tightening ** index)
+
+    def __contains__(self, key: bytes) -> bool:
+        # 新条目都在最后一级，先查最后一级
+        return any(key in bloom for bloom in reversed(self.filters))
+
+    def add(self, key: bytes):
+        if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+            self.filters.append(BloomFilter(*self.stage(len(self.filters))))
+        self.filters[-1].add(key)
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(bloom.nbytes for bloom in self.filters)
+
+    def estimated_error_rate(self) -> float:
+        """各级当前误判率的并：1 - Π(1 - ε_i)"""
+        miss = 1.0
+        for bloom in self.filters:
+            miss *= 1 - bloom.estimated_error_rate()
+        return 1 - miss
+
+    def plan(self, entries: int) -> Tuple[int, int, float]:
+        """容纳 entries 个条目时的 (级数, 字节数, 误判率上界)，不分配内存"""
+        stages, nbytes, error, remaining = 0, 0, 0.0, entries
+        while remaining > 0:
+            capacity, rate = self.stage(stages)
+            nbytes += bloom_shape(capacity, rate)[0] // 8
+            error += rate
+            remaining -= capacity
+            stages += 1
+        return stages, nbytes, error
+
+
+# -------------------------- 精确索引 --------------------------
+INDEX_MAGIC = b"BBSRPLX1"
+INDEX_HEADER = struct.Struct(">8sIQQ4x")  # magic, 键长, 容量, 条目数
+MIN_CAPACITY = 1 << 12
+EMPTY_KEY = bytes(KEY_SIZE)
+
+
+def _stored_keys(buf):
+    for offset in range(INDEX_HEADER.size, len(buf), KEY_SIZE):
+        key = buf[offset:offset + KEY_SIZE]
+        if key != EMPTY_KEY:
+            yield key
+
+
+class ExactIndex:
+    """
+    磁盘上的 16 字节键集合：线性探测开放寻址表（装载因子 ≤ 1/2），mmap 后原地查找与插入
+    新文件用 ftruncate 扩展，未写过的页全为零即空位，创建与扩容都不需要逐条初始化
+    """
+
+    def __init__(self, path: str, capacity: int = MIN_CAPACITY):
+        self.path = path
+        if os.path.exists(path):
+            self._open(path)
+            magic, key_size, self._capacity, self._count = INDEX_HEADER.unpack_from(self._buf, 0)
+            if (magic != INDEX_MAGIC or key_size != KEY_SIZE
+                    or len(self._buf) != INDEX_HEADER.size + self._capacity * KEY_SIZE):
+                self.close()
+                raise ValueError(f"{path} 不是有效的重放索引文件")
+        else:
+            self._create(path, 1 << max(capacity - 1, MIN_CAPACITY - 1).bit_length())
+            os.replace(path + ".tmp", path)
+
+    def _open(self, path: str):
+        self._file = open(path, "r+b")
+        self._buf = mmap.mmap(self._file.fileno(), 0)
+
+    def _create(self, path: str, capacity: int):
+        """在 path + ".tmp" 写出容量为 capacity（2 的幂）的空表并打开"""
+        with open(path + ".tmp", "wb") as fh:
+            fh.truncate(INDEX_HEADER.size + capacity * KEY_SIZE)
+            fh.write(INDEX_HEADER.pack(INDEX_MAGIC, KEY_SIZE, capacity, 0))
+        self._open(path + ".tmp")
+        self._capacity = capacity
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buf)
+
+    def _probe(self, key: bytes) -> Tuple[int, bool]:
+        """返回 (位置, 是否已存在)；不存在时位置为第一个空位"""
+        buf = self._buf
+        mask = self._capacity - 1
+        pos = int.from_bytes(key[:8], "big") & mask
+        while True:
+            offset = INDEX_HEADER.size + pos * KEY_SIZE
+            stored = buf[offset:offset + KEY_SIZE]
+            if stored == key:
+                return offset, True
+            if stored == EMPTY_KEY:
+                return offset, False
+            pos = (pos + 1) & mask
+
+    def __contains__(self, key: bytes) -> bool:
+        return self._probe(key)[1]
+
+    def add(self, key: bytes) -> bool:
+        """插入键，返回是否为新键"""
+        offset, found = self._probe(key)
+        if found:
+            return False
+        if 2 * (self._count + 1) > self._capacity:
+            self._resize(2 * self._capacity)
+            offset = self._probe(key)[0]
+        self._buf[offset:offset + KEY_SIZE] = key
+        self._count += 1
+        INDEX_HEADER.pack_into(self._buf, 0, INDEX_MAGIC, KEY_SIZE, self._capacity, self._count)
+        return True
+
+    def keys(self):
+        """依次给出全部键（重建布隆过滤器用）"""
+        return _stored_keys(self._buf)
+
+    def _resize(self, capacity: int):
+        """在临时文件中建好新表后原子替换，旧表边读边插入，不在内存中复制"""
+        old_buf, old_file, count = self._buf, self._file, self._count
+        self._create(self.path, capacity)
+        try:
+            for key in _stored_keys(old_buf):
+                offset = self._probe(key)[0]
+                self._buf[offset:offset + KEY_SIZE] = key
+        finally:
+            old_buf.close()
+            old_file.close()
+        self._count = count
+        INDEX_HEADER.pack_into(self._buf, 0, INDEX_MAGIC, KEY_SIZE, self._capacity, count)
+        self._buf.flush()
+        os.replace(self.path + ".tmp", self.path)
+
+    def flush(self):
+        self._buf.flush()
+
+    def close(self):
+        if self._buf is not None:
+            self._buf.flush()
+            self._buf.close()
+            self._buf = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# -------------------------- 按时间分代的重放检测 --------------------------
+class Generation:
+    """一个时间窗口：开始时刻、布隆过滤器与精确索引"""
+
+    __slots__ = ('start', 'bloom', 'index')
+
+    def __init__(self, start: float, bloom: ScalableBloomFilter, index: ExactIndex):
+        self.start = start
+        self.bloom = bloom
+        self.index = index
+
+
+class ReplayGuard:
+    """
+    重放检测：directory 存放各代索引文件（replay-<开始时刻毫秒>.idx）
+    rotation 为每代的时长（秒），generations 为保留的代数，检测窗口约为 rotation × generations；
+    capacity / error_rate 为每代布隆过滤器第一级的容量与整代的误判率上界
+    """
+
+    def __init__(self, directory: str, rotation: float = 3600.0, generations: int = 24,
+                 capacity: int = 1 << 20, error_rate: float = 1e-3, clock: Callable[[], float] = time.time):
+        if rotation <= 0 or generations < 1:
+            raise ValueError("轮换周期与保留代数须为正数")
+        self.directory = directory
+        self.rotation = rotation
+        self.generations = generations
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._generations: List[Generation] = []
+        self.bloom_hits = 0
+        self.false_positives = 0
+        self.replays = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+        self._rotate(self.clock())
+
+    def _path(self, start: float) -> str:
+        return os.path.join(self.directory, f"replay-{int(start * 1000)}.idx")
+
+    def _new_bloom(self) -> ScalableBloomFilter:
+        return ScalableBloomFilter(self.capacity, self.error_rate)
+
+    def _load(self):
+        """从目录中的索引文件恢复各代，并用索引中的键重建布隆过滤器"""
+        starts = sorted(int(name[7:-4]) for name in os.listdir(self.directory)
+                        if name.startswith("replay-") and name.endswith(".idx") and name[7:-4].isdigit())
+        for start in starts:
+            index = ExactIndex(os.path.join(self.directory, f"replay-{start}.idx"))
+            bloom = self._new_bloom()
+            for key in index.keys():
+                bloom.add(key)
+            self._generations.append(Generation(start / 1000, bloom, index))
+
+    def _rotate(self, now: float):
+        """当前一代到期时开新的一代，丢弃超出保留代数的旧代（调用方持锁或在构造中）"""
+        if self._generations and now - self._generations[-1].start < self.rotation:
+            return
+        if self._generations:
+            self._generations[-1].index.flush()
+            # 长时间没有流量时按周期对齐开始时刻，窗口边界不随空闲漂移
+            last = self._generations[-1].start
+            now = last + (now - last) // self.rotation * self.rotation
+        self._generations.append(Generation(now, self._new_bloom(), ExactIndex(self._path(now), self.capacity)))
+        while len(self._generations) > self.generations:
+            expired = self._generations.pop(0)
+            expired.index.close()
+            os.remove(expired.index.path)
+
+    def _seen(self, key: bytes) -> bool:
+        for generation in reversed(self._generations):
+            if key in generation.bloom:
+                self.bloom_hits += 1
+                if key in generation.index:
+                    return True
+                self.false_positives += 1
+        return False
+
+    def check(self, key: bytes) -> Optional[str]:
+        """只查不登记：已见过时返回拒绝原因，否则返回 None"""
+        with self._lock:
+            self._rotate(self.clock())
+            if self._seen(key):
+                self.replays += 1
+                return REPLAY_REASON
+        return None
+
+    def record(self, key: bytes) -> Optional[str]:
+        """查找并登记（原子操作），应在签名验证通过后调用；已见过时返回拒绝原因"""
+        with self._lock:
+            self._rotate(self.clock())
+            if self._seen(key):
+                self.replays += 1
+                return REPLAY_REASON
+            current = self._generations[-1]
+            current.bloom.add(key)
+            current.index.add(key)
+        return None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(generation.index) for generation in self._generations)
+
+    def stats(self) -> dict:
+        """条目数、内存与磁盘占用、布隆过滤器命中与误判次数、估计误判率"""
+        with self._lock:
+            generations = list(self._generations)
+            miss = 1.0
+            for generation in generations:
+                miss *= 1 - generation.bloom.estimated_error_rate()
+            return {'entries': sum(len(g.index) for g in generations), 'generations': len(generations),
+                    'bloom_bytes': sum(g.bloom.nbytes for g in generations),
+                    'index_bytes': sum(g.index.nbytes for g in generations),
+                    'bloom_hits': self.bloom_hits, 'false_positives': self.false_positives,
+                    'replays': self.replays, 'estimated_error_rate': 1 - miss}
+
+    def flush(self):
+        with self._lock:
+            for generation in self._generations:
+                generation.index.flush()
+
+    def close(self):
+        with self._lock:
+            for generation in self._generations:
+                generation.index.close()
+            self._generations = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,98 @@
+"""
+成员撤销（BBS04 第 7 节）与验证方本地撤销列表
+
+撤销一批成员时，群管理员公布撤销令牌 {(x_j, A*_j)}（A*_j = P/(γ+x_j) 为旧公钥下被撤销成员的私钥），
+新公钥为 P' = P/Π(γ+x_j)、P2' = P2/Π(γ+x_j)、W' = γ·P2'，H、U、V 与 opener 私钥不变。
+剩余成员用部分分式在本地更新私钥，整批撤销只需一次多标量乘：
+    1/((γ+x)·Π(γ+x_j)) = c₀/(γ+x) + Σ c_j/(γ+x_j)
+    c₀ = 1/Π(x_j - x)，c_j = w_j/(x - x_j)，w_j = 1/Π_{l≠j}(x_l - x_j)
+    A' = c₀·A + Σ c_j·A*_j
+被撤销的成员 x = x_j 使 c₀ 无定义，无法更新。同理 P' = Σ w_j·A*_j，任何人都可以用令牌核对新公钥。
+
+验证方本地撤销列表：签名可以附带 epoch 标签 T₄ = x_i·H_ε（见 GroupSignature.sign 的 epoch 参数），
+列表保存被撤销成员在该 epoch 下的标签编码，检查一个签名只是一次集合查找，与列表长度无关。
+"""
+from typing import Iterable, List, Optional, Sequence
+
+from bbs04 import GroupPublicKey, tag_base_point
+from pairing_group import FixedBaseTable, G1Point, PairingGroup
+
+
+class RevocationToken:
+    """一次（批量）撤销公布的令牌：被撤销成员的 x_j、旧公钥下的 A*_j 及部分分式权重 w_j"""
+
+    def __init__(self, group: PairingGroup, xs: Sequence[int], A_stars: Sequence[G1Point]):
+        if len(xs) != len(A_stars) or not xs:
+            raise ValueError("撤销令牌需要一一对应的 x_j 与 A*_j")
+        r = group.r
+        self.group = group
+        self.xs = [int(x) % r for x in xs]
+        self.A_stars = list(A_stars)
+        if len(set(self.xs)) != len(self.xs):
+            raise ValueError("撤销令牌中的 x_j 重复")
+        # w_j = 1/Π_{l≠j}(x_l - x_j)：k² 次乘法加一次批量求逆，只在公布令牌时做一次
+        products = []
+        for j, x_j in enumerate(self.xs):
+            acc = 1
+            for l, x_l in enumerate(self.xs):
+                if l != j:
+                    acc = acc * (x_l - x_j) % r
+            products.append(acc)
+        self.weights = group.zr_batch_inv(products)
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def new_P(self) -> G1Point:
+        """P' = Σ w_j·A*_j"""
+        return self.group.g1_multi_mul(self.A_stars, self.weights)
+
+    def matches(self, public_key: GroupPublicKey) -> bool:
+        """核对新公钥的 P' 确实是令牌对应的 P/Π(γ+x_j)"""
+        return self.new_P() == public_key.points['P']
+
+    def update(self, A_i: G1Point, x_i: int) -> G1Point:
+        """成员本地更新私钥：A' = c₀·A + Σ c_j·A*_j，k 个被撤销成员只做一次多标量乘"""
+        group = self.group
+        r = group.r
+        diffs = [(x_i - x_j) % r for x_j in self.xs]
+        if not all(diffs):
+            raise ValueError("该成员已被撤销")
+        inverses = group.zr_batch_inv(diffs)
+        c0 = 1
+        for inv in inverses:
+            c0 = -c0 * inv % r  # 1/Π(x_j - x) = Π(-1/(x - x_j))
+        coefficients = [w * inv % r for w, inv in zip(self.weights, inverses)]
+        return group.g1_multi_mul([A_i] + self.A_stars, [c0] + coefficients)
+
+
+class RevocationList:
+    """验证方本地撤销列表：某个 epoch 下被撤销成员标签 x_j·H_ε 的编码集合"""
+
+    def __init__(self, group: PairingGroup, epoch: str, window: int = 4):
+        self.group = group
+        self.epoch = epoch
+        self._table = FixedBaseTable(group, tag_base_point(group, epoch), window)
+        self._tags = set()
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    def add_many(self, xs: Iterable[int]):
+        """登记被撤销成员的 x_j（例如来自撤销令牌），标签批量计算"""
+        self._tags.update(map(self.group.g1_to_bytes, self._table.mul_many(list(xs))))
+
+    def add_token(self, token: RevocationToken):
+        self.add_many(token.xs)
+
+    def check(self, signature) -> Optional[str]:
+        """返回拒绝原因：没有本 epoch 的标签或成员已撤销；可以接受时返回 None"""
+        if signature.get('epoch') != self.epoch or 'T4' not in signature:
+            return f"签名没有 epoch {self.epoch} 的撤销标签"
+        if self.group.g1_to_bytes(signature['T4']) in self._tags:
+            return "签名成员已被撤销"
+        return None
+
+    def filter(self, signatures: Sequence) -> List[int]:
+        """返回被拒绝签名的下标"""
+        return [index for index, signature in enumerate(signatures) if self.check(signature) is not None]
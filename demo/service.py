@@ -0,0 +1,488 @@
+"""
+签名服务：在 asyncio 上提供 BBS04 群签名与 MUO 代理签名的 sign / verify / open
+
+传输：Unix 域套接字（--socket PATH）或标准输入输出（--stdio，离线运行）。
+帧格式：4 字节大端长度 + UTF-8 JSON。请求 {"id", "op", ...参数}，响应 {"id", "ok", "result" | "error"}，
+同一连接上可以流水线发送，响应按完成顺序返回、以 id 对应。
+
+操作：
+    bbs04.sign    {member, message[, epoch]}            -> {signature}
+    bbs04.verify  {signature}                            -> {valid}
+    bbs04.open    {signature}                            -> {valid, member}
+    muo.sign      {scheme, message}                      -> {signature: [R, s, K]}
+    muo.verify    {scheme, signature, message[, y_A, y_B]} -> {valid}
+    muo.open      {scheme, signature, message}           -> {valid, signer}
+    stats         {}                                     -> 批处理、签名池与事件循环延迟统计
+scheme 为 "unprotected" 或 "protected"；MUO 的 open 给出可归责的签名人：保护代理的签名只能由代理人 B 生成，
+不保护代理的签名 A、B 都能生成，signer 为 null。
+
+事件循环里不做任何模幂或配对：验证请求按时间窗口（--window-ms）或批大小（--max-batch）合并后，
+整批交给工作进程调用 verify_batch；打开、MUO 签名和签名池未命中的 BBS04 签名也在工作进程中完成。
+BBS04 签名池命中时只剩一次哈希和五次乘加，直接在事件循环中完成。
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from bbs04 import GroupPublicKey, GroupSignature, Opener
+from muo import ProxySignatureProtected, ProxySignatureUnprotected, generate_key_pair, generate_system_params
+from signature_codec import signature_from_wire, signature_to_wire
+from signing_pool import SigningPool
+
+logger = logging.getLogger("service")
+
+FRAME = struct.Struct(">I")
+MAX_FRAME = 16 << 20
+MUO_SCHEMES = ("unprotected", "protected")
+
+
+class ServiceError(Exception):
+    """服务端返回的错误"""
+
+
+# -------------------------- 帧读写 --------------------------
+async def read_frame(reader: asyncio.StreamReader) -> Optional[dict]:
+    """读一帧 JSON；连接在帧边界处关闭时返回 None"""
+    try:
+        header = await reader.readexactly(FRAME.size)
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial:
+            raise ValueError("帧头不完整") from None
+        return None
+    (length,) = FRAME.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError(f"帧长度 {length} 超过上限 {MAX_FRAME}")
+    return json.loads(await reader.readexactly(length))
+
+
+def encode_frame(message: dict) -> bytes:
+    body = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return FRAME.pack(len(body)) + body
+
+
+# -------------------------- 工作进程 --------------------------
+_worker = None
+
+
+def _init_worker(public_key: GroupPublicKey, opener: Opener, muo_state: dict):
+    global _worker
+    params = muo_state['params']
+    _worker = {
+        'public_key': public_key,
+        'opener': opener,
+        'muo': muo_state,
+        'unprotected': ProxySignatureUnprotected(params),
+        'protected': ProxySignatureProtected(params),
+        'pairings': {},  # A_i 编码 -> e(A_i, P2)
+    }
+
+
+def _bbs04_verify_batch(wires: Sequence[dict]) -> list:
+    """逐项结果为是否有效；无法解析的签名对应 ValueError，Coalescer 只把它交给发出该签名的请求"""
+    public_key = _worker['public_key']
+    group = public_key.group
+    results: list = [False] * len(wires)
+    batch = []
+    for index, wire in enumerate(wires):
+        try:
+            batch.append((index, signature_from_wire(group, wire)))
+        except (ValueError, TypeError) as exc:
+            results[index] = exc
+    if batch:
+        bad = set(public_key.verify_batch([signature for _, signature in batch]))
+        for position, (index, _) in enumerate(batch):
+            results[index] = position not in bad
+    return results
+
+
+def _bbs04_open(wire: dict) -> Tuple[bool, Optional[str]]:
+    opener = _worker['opener']
+    signature = signature_from_wire(opener.public_key.group, wire)  # 无法解析时 ValueError 只返回给本请求
+    valid, encoding = opener.open(signature)
+    return valid, encoding.hex() if valid else None
+
+
+def _bbs04_sign(member_id, A_i, x_i: int, message: str, epoch: Optional[str]) -> dict:
+    public_key = _worker['public_key']
+    group = public_key.group
+    key = group.g1_to_bytes(A_i)
+    e_A = _worker['pairings'].get(key)
+    if e_A is None:
+        e_A = _worker['pairings'][key] = group.pairing(A_i, public_key.g2('P2'))
+    commitment = public_key.commit(member_id, A_i, x_i, e_A, epoch)
+    return signature_to_wire(group, public_key.respond(commitment, message))
+
+
+def _muo_sign(scheme: str, message: str) -> List[int]:
+    state = _worker['muo']
+    if scheme == "unprotected":
+        return list(_worker['unprotected'].sign(state['delta'], state['K'], message))
+    return list(_worker['protected'].sign(state['delta_bar'], state['K_protected'], message)[:3])
+
+
+def _muo_verify_batch(scheme: str, items: Sequence[Tuple[int, int, list, str]]) -> List[bool]:
+    """items[i] = (y_A, y_B, 签名, 消息)；同一方案的请求共用一个队列，按委托双方公钥分组后各自批验证"""
+    results = [False] * len(items)
+    groups: Dict[Tuple[int, int], list] = {}
+    for index, (y_A, y_B, signature, message) in enumerate(items):
+        if (isinstance(message, str) and isinstance(signature, list) and len(signature) == 3
+                and all(isinstance(v, int) for v in signature)):
+            groups.setdefault((y_A, y_B), []).append((index, tuple(signature), message))
+    for (y_A, y_B), group in groups.items():
+        signatures = [signature for _, signature, _ in group]
+        messages = [message for _, _, message in group]
+        if scheme == "unprotected":
+            _, bad = _worker['unprotected'].verify_batch(signatures, y_A, messages)
+        else:
+            _, bad = _worker['protected'].verify_batch(signatures, y_A, y_B, messages)
+        bad = set(bad)
+        for position, (index, _, _) in enumerate(group):
+            results[index] = position not in bad
+    return results
+
+
+# -------------------------- 请求合并 --------------------------
+class Coalescer:
+    """
+    把时间窗口内到达的请求合并成一次批处理调用，在进程池中执行；func(*args, items) 返回逐项结果，
+    某一项的结果为异常对象时只有该项的请求收到这个异常
+    窗口到期时若已有 max_in_flight 批在执行，就继续积攒，等其中一批完成再提交（负载越高批越大）
+    整批调用抛出异常时逐项重新执行，一个有问题的请求不会让同批的其他请求一起失败
+    """
+
+    def __init__(self, executor, func, args: tuple = (), window: float = 0.005, max_batch: int = 64,
+                 max_in_flight: int = 1):
+        self.executor = executor
+        self.func = func
+        self.args = args
+        self.window = window
+        self.max_batch = max_batch
+        self.max_in_flight = max_in_flight
+        self.batches = 0
+        self.items = 0
+        self._pending = []
+        self._timer = None
+        self._in_flight = 0
+
+    def submit(self, item) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch or self.window <= 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._on_timer)
+        return future
+
+    def _on_timer(self):
+        self._timer = None
+        if self._in_flight < self.max_in_flight:
+            self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        self._execute(batch)
+
+    def _execute(self, batch):
+        self._in_flight += 1
+        task = asyncio.get_running_loop().run_in_executor(self.executor, self.func, *self.args,
+                                                          [item for item, _ in batch])
+        task.add_done_callback(lambda done: self._deliver(batch, done))
+
+    def _deliver(self, batch, done: asyncio.Future):
+        self._in_flight -= 1
+        if self._pending and self._timer is None:
+            self._flush()
+        error = done.exception()
+        if error is not None and len(batch) > 1:
+            for entry in batch:
+                self._execute([entry])
+            return
+        results = [error] * len(batch) if error is not None else done.result()
+        for (_, future), result in zip(batch, results):
+            if future.done():  # 请求方已断开
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# -------------------------- 服务 --------------------------
+class SignatureService:
+    """持有 BBS04 群与 MUO 委托，按操作名分派请求"""
+
+    def __init__(self, members: int = 16, muo_params: str = "muo-2048-256", workers: Optional[int] = None,
+                 window: float = 0.005, max_batch: int = 64, pool_processes: int = 1, pool_high: int = 16):
+        self.scheme = GroupSignature()
+        self.scheme.join_many([f"member-{i}" for i in range(members)])
+
+        params = generate_system_params(muo_params)
+        x_A, y_A = generate_key_pair(params)
+        x_B, y_B = generate_key_pair(params)
+        delta, K, _ = ProxySignatureUnprotected(params).delegate(x_A, y_A)
+        _, delta_bar, K_protected, _ = ProxySignatureProtected(params).delegate(x_A, y_A, x_B, y_B)
+        self.muo = {'params': params, 'y_A': y_A, 'y_B': y_B, 'delta': delta, 'K': K,
+                    'delta_bar': delta_bar, 'K_protected': K_protected}
+
+        self.window = window
+        self.max_batch = max_batch
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.scheme.public_key, self.scheme.opener, self.muo))
+        self.pool = None
+        if pool_processes > 0:
+            self.pool = SigningPool(self.scheme, low=max(1, pool_high // 4), high=pool_high,
+                                    processes=pool_processes).start(self.scheme.members)
+        self.coalescers: Dict[tuple, Coalescer] = {}
+        self.max_loop_lag = 0.0
+        self._handlers = {
+            'bbs04.sign': self.bbs04_sign,
+            'bbs04.verify': self.bbs04_verify,
+            'bbs04.open': self.bbs04_open,
+            'muo.sign': self.muo_sign,
+            'muo.verify': self.muo_verify,
+            'muo.open': self.muo_open,
+            'stats': self.stats,
+        }
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+        self.executor.shutdown(cancel_futures=True)
+
+    def _coalescer(self, key: tuple, func, args: tuple = ()) -> Coalescer:
+        coalescer = self.coalescers.get(key)
+        if coalescer is None:
+            coalescer = self.coalescers[key] = Coalescer(self.executor, func, args, self.window, self.max_batch,
+                                                               self.workers)
+        return coalescer
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    # ---- BBS04 ----
+    async def bbs04_sign(self, request: dict) -> dict:
+        member_id, message = request['member'], request['message']
+        epoch = request.get('epoch')
+        if not isinstance(message, str) or member_id not in self.scheme.members:
+            raise ValueError(f"成员 {member_id} 不存在或消息不是字符串")
+        commitment = self.pool.take(member_id) if self.pool is not None and epoch is None else None
+        if commitment is not None:
+            signature = signature_to_wire(self.scheme.group, self.scheme.sign(member_id, message, commitment))
+        else:
+            member = self.scheme.members[member_id]
+            signature = await self._run(_bbs04_sign, member_id, member.A_i, member.x_i, message, epoch)
+        return {'signature': signature}
+
+    async def bbs04_verify(self, request: dict) -> dict:
+        valid = await self._coalescer(('bbs04',), _bbs04_verify_batch).submit(request['signature'])
+        return {'valid': valid}
+
+    async def bbs04_open(self, request: dict) -> dict:
+        valid, encoding = await self._run(_bbs04_open, request['signature'])
+        member = self.scheme.members.find(bytes.fromhex(encoding)) if valid else None
+        return {'valid': valid, 'member': member}
+
+    # ---- MUO ----
+    def _muo_scheme(self, request: dict) -> str:
+        scheme = request.get('scheme')
+        if scheme not in MUO_SCHEMES:
+            raise ValueError(f"未知的 MUO 方案 {scheme}（可选: {', '.join(MUO_SCHEMES)}）")
+        return scheme
+
+    async def muo_sign(self, request: dict) -> dict:
+        scheme = self._muo_scheme(request)
+        if not isinstance(request['message'], str):
+            raise ValueError("消息不是字符串")
+        return {'signature': await self._run(_muo_sign, scheme, request['message'])}
+
+    async def muo_verify(self, request: dict) -> dict:
+        scheme = self._muo_scheme(request)
+        y_A = int(request.get('y_A', self.muo['y_A']))
+        y_B = int(request.get('y_B', self.muo['y_B']))
+        p = self.muo['params']['p']
+        if not (0 < y_A < p and 0 < y_B < p):
+            raise ValueError("公钥 y_A、y_B 应在 [1, p) 范围内")
+        # 每个方案只有一个合并队列（协调者的状态不随客户端给出的公钥增长），工作进程内按公钥分组
+        coalescer = self._coalescer(('muo', scheme), _muo_verify_batch, (scheme,))
+        valid = await coalescer.submit((y_A, y_B, request['signature'], request['message']))
+        return {'valid': valid}
+
+    async def muo_open(self, request: dict) -> dict:
+        valid = (await self.muo_verify(request))['valid']  # 连同请求中的 y_A、y_B 一起验证
+        signer = "proxy-B" if valid and request['scheme'] == "protected" else None
+        return {'valid': valid, 'signer': signer}
+
+    # ---- 统计 ----
+    async def stats(self, request: dict) -> dict:
+        coalescers = {"/".join(key): {'batches': c.batches, 'items': c.items}
+                      for key, c in self.coalescers.items()}
+        return {'coalescers': coalescers, 'pool': self.pool.stats() if self.pool is not None else None,
+                'max_loop_lag_ms': self.max_loop_lag * 1e3}
+
+    # ---- 连接 ----
+    async def handle(self, request: dict) -> dict:
+        handler = self._handlers.get(request.get('op'))
+        if handler is None:
+            raise ValueError(f"未知操作 {request.get('op')}")
+        return await handler(request)
+
+    async def _respond(self, request: dict, writer: asyncio.StreamWriter):
+        request_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict):
+                raise ValueError("请求应为 JSON 对象")
+            response = {'id': request_id, 'ok': True, 'result': await self.handle(request)}
+        except (KeyError, TypeError, ValueError) as exc:
+            response = {'id': request_id, 'ok': False, 'error': f"{type(exc).__name__}: {exc}"}
+        except Exception as exc:  # 工作进程异常等，记录后照常回复
+            logger.exception("处理请求失败 op=%s", request.get('op'))
+            response = {'id': request_id, 'ok': False, 'error': f"{type(exc).__name__}: {exc}"}
+        writer.write(encode_frame(response))
+        await writer.drain()
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks = set()
+        try:
+            while True:
+                try:
+                    request = await read_frame(reader)
+                except (ValueError, asyncio.IncompleteReadError) as exc:
+                    logger.warning("连接帧错误，断开: %s", exc)
+                    break
+                if request is None:
+                    break
+                task = asyncio.create_task(self._respond(request, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def monitor_loop_lag(self, interval: float = 0.01):
+        """每 interval 秒醒来一次，记录实际延迟超出 interval 的最大值（衡量事件循环是否被阻塞）"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.max_loop_lag = max(self.max_loop_lag, loop.time() - start - interval)
+
+
+async def _stdio_streams() -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=MAX_FRAME)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+    transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout.buffer)
+    return reader, asyncio.StreamWriter(transport, protocol, reader, loop)
+
+
+async def serve(service: SignatureService, socket_path: Optional[str] = None):
+    """在 Unix 套接字上服务直到被取消（SIGTERM 同样取消）；socket_path 为 None 时服务标准输入输出直到 EOF"""
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    monitor = asyncio.create_task(service.monitor_loop_lag())
+    try:
+        if socket_path is None:
+            await service.serve_connection(*await _stdio_streams())
+            return
+        server = await asyncio.start_unix_server(service.serve_connection, path=socket_path, limit=MAX_FRAME)
+        logger.info("服务已启动 socket=%s", socket_path)
+        async with server:
+            await server.serve_forever()
+    finally:
+        monitor.cancel()
+
+
+# -------------------------- 客户端 --------------------------
+class ServiceClient:
+    """流水线客户端：call 可以并发调用，响应按 id 分派"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, socket_path: str) -> "ServiceClient":
+        return cls(*await asyncio.open_unix_connection(socket_path, limit=MAX_FRAME))
+
+    async def _receive(self):
+        try:
+            while True:
+                response = await read_frame(self._reader)
+                if response is None:
+                    break
+                future = self._waiting.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("服务连接已关闭"))
+
+    async def call(self, op: str, **params):
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        self._writer.write(encode_frame({'id': request_id, 'op': op, **params}))
+        await self._writer.drain()
+        response = await future
+        if not response['ok']:
+            raise ServiceError(response['error'])
+        return response['result']
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._receiver.cancel()
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="BBS04 / MUO 签名服务")
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument("--socket", help="Unix 域套接字路径")
+    transport.add_argument("--stdio", action="store_true", help="在标准输入输出上收发帧")
+    parser.add_argument("--members", type=int, default=16, help="启动时加入的群成员数（member-0 ...）")
+    parser.add_argument("--muo-params", default="muo-2048-256", help="MUO 参数集（demo 或 muo_params 中的名字）")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数，默认 CPU 核数")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="验证请求的合并窗口，0 表示不合并")
+    parser.add_argument("--max-batch", type=int, default=64, help="单批最多合并的验证请求数")
+    parser.add_argument("--pool-processes", type=int, default=1, help="BBS04 签名池的预计算进程数，0 表示不用签名池")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr, format="%(asctime)s %(name)s %(message)s")
+    service = SignatureService(args.members, args.muo_params, args.workers, args.window_ms / 1e3, args.max_batch,
+                               args.pool_processes)
+    try:
+        asyncio.run(serve(service, None if args.stdio else args.socket))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        service.close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
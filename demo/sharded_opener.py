@@ -0,0 +1,365 @@
+"""
+分片 opener：成员登记（A_i 规范编码 -> 成员 ID）按 A_i 编码的哈希分布在 N 个分片进程中
+
+协调者持有 Opener，每个签名只在协调者处验证并恢复一次 A = T₃ - (ξ₁T₁ + ξ₂T₂)，
+再把查找路由到 A 所属的分片；一批签名的查找按分片合并成一个请求，各分片并发处理。
+分片只保存自己那部分登记表，单个进程不再需要容纳全部成员。
+
+分配：一致性哈希环，每个分片 vnodes 个虚拟节点（位置为 blake2b(分片名#i)），
+键的位置为 opener_index.digest_key(A 编码)。增加分片时只有落到新分片区间的约 1/(N+1) 条记录迁移，
+迁移按页进行且可以回滚：
+    1. 协调者把新环发给各个旧分片（migrate_begin），分片记下不再属于自己的记录，但先不删除
+    2. 逐页取出这些记录的副本（migrate_page，每页不超过 page_bytes，远小于帧上限），写入新分片（put）
+    3. 全部页面都写入成功后才切换哈希环，再通知旧分片删除已迁出的记录（migrate_commit）
+任何一步失败时旧分片放弃迁移（migrate_abort）、新分片清空（clear），哈希环保持不变，不会丢失记录。
+迁移与查找都由同一个协调者串行发起，迁移期间不会有查找落到半迁移的状态上。
+
+传输与签名服务相同：Unix 域套接字上的 4 字节长度 + JSON 帧（service.read_frame / encode_frame），
+请求 {"id", "op", ...}，响应 {"id", "ok", "result" | "error"}。分片操作（A 编码以十六进制传输）：
+    put      {entries: [[A, 成员ID], ...]}        -> {count}
+    lookup   {keys: [A, ...]}                     -> {members: [成员ID 或 null, ...]}
+    migrate_begin   {shards: [分片名, ...], vnodes}  -> {count}（记下按新环不再属于本分片的记录）
+    migrate_page    {offset, max_bytes}             -> {entries: [[A, 成员ID], ...], next}（副本，不删除）
+    migrate_commit  {}                              -> {removed}（删除已迁出的记录）
+    migrate_abort   {}                              -> {}
+    clear           {}                              -> {count}
+    stats           {}                              -> {name, count}
+本机测试用 LocalCluster 启动分片子进程：python sharded_opener.py --socket PATH --name NAME
+
+    async with LocalCluster(directory, shards=4) as cluster:
+        coordinator = ShardedOpener(gs.opener)
+        for name, path in cluster.sockets.items():
+            await coordinator.add_shard(name, path)
+        await coordinator.put_many(registry_entries(gs.members))
+        results = await coordinator.open_many(signatures)     # [(是否有效, 成员ID), ...]
+"""
+import argparse
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from bbs04 import Opener
+from member_registry import MemberRegistry
+from opener_index import digest_key
+from service import MAX_FRAME, ServiceClient, encode_frame, read_frame
+
+logger = logging.getLogger("sharded_opener")
+
+VNODES = 64
+PUT_BATCH = 4096
+PAGE_BYTES = MAX_FRAME // 4  # 迁移时每页记录的 JSON 大小上限，留足帧上限的余量
+
+
+def registry_entries(registry: MemberRegistry) -> Iterator[Tuple[bytes, str]]:
+    """成员登记表中全部 (A_i 规范编码, 成员 ID)"""
+    return ((registry.encoding(slot), registry.member_id(slot)) for slot in range(len(registry)))
+
+
+# -------------------------- 一致性哈希环 --------------------------
+class HashRing:
+    """分片名的一致性哈希环：键按 digest_key 的前 8 字节落在环上，顺时针第一个虚拟节点的分片拥有它"""
+
+    def __init__(self, shards: Sequence[str], vnodes: int = VNODES):
+        if not shards:
+            raise ValueError("哈希环至少需要一个分片")
+        self.shards = list(shards)
+        self.vnodes = vnodes
+        points = sorted((int.from_bytes(hashlib.blake2b(f"{name}#{i}".encode("utf-8"), digest_size=8).digest(),
+                                        "big"), name)
+                        for name in self.shards for i in range(vnodes))
+        self._positions = [position for position, _ in points]
+        self._owners = [name for _, name in points]
+
+    def owner(self, encoding: bytes) -> str:
+        position = int.from_bytes(digest_key(encoding), "big")
+        index = bisect.bisect_right(self._positions, position)
+        return self._owners[index % len(self._owners)]
+
+
+# -------------------------- 分片进程 --------------------------
+class OpenerShard:
+    """一个分片：本分片负责的 A_i 编码 -> 成员 ID"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._members: Dict[bytes, str] = {}
+        self._migration: Optional[List[bytes]] = None  # 进行中的迁移要迁出的键
+        self._handlers = {'put': self.put, 'lookup': self.lookup, 'migrate_begin': self.migrate_begin,
+                          'migrate_page': self.migrate_page, 'migrate_commit': self.migrate_commit,
+                          'migrate_abort': self.migrate_abort, 'clear': self.clear, 'stats': self.stats}
+
+    def put(self, request: dict) -> dict:
+        self._members.update((bytes.fromhex(encoding), member_id) for encoding, member_id in request['entries'])
+        return {'count': len(self._members)}
+
+    def lookup(self, request: dict) -> dict:
+        get = self._members.get
+        return {'members': [get(bytes.fromhex(encoding)) for encoding in request['keys']]}
+
+    def migrate_begin(self, request: dict) -> dict:
+        ring = HashRing(request['shards'], request.get('vnodes', VNODES))
+        self._migration = [encoding for encoding in self._members if ring.owner(encoding) != self.name]
+        return {'count': len(self._migration)}
+
+    def _pending_migration(self) -> List[bytes]:
+        if self._migration is None:
+            raise ValueError(f"分片 {self.name} 没有进行中的迁移")
+        return self._migration
+
+    def migrate_page(self, request: dict) -> dict:
+        """从 offset 起取出迁出记录的副本，JSON 大小不超过 max_bytes（至少一条）"""
+        moved = self._pending_migration()
+        offset = request['offset']
+        budget = request.get('max_bytes', PAGE_BYTES)
+        entries, size = [], 0
+        while offset < len(moved):
+            encoding = moved[offset]
+            entry = [encoding.hex(), self._members[encoding]]
+            size += len(encoding) * 2 + len(json.dumps(entry[1], ensure_ascii=False).encode("utf-8")) + 8
+            if entries and size > budget:
+                break
+            entries.append(entry)
+            offset += 1
+        return {'entries': entries, 'next': offset}
+
+    def migrate_commit(self, request: dict) -> dict:
+        moved = self._pending_migration()
+        for encoding in moved:
+            self._members.pop(encoding, None)
+        self._migration = None
+        logger.info("分片 %s 迁出 %d 条记录，剩余 %d", self.name, len(moved), len(self._members))
+        return {'removed': len(moved)}
+
+    def migrate_abort(self, request: dict) -> dict:
+        self._migration = None
+        return {}
+
+    def clear(self, request: dict) -> dict:
+        self._members.clear()
+        self._migration = None
+        return {'count': 0}
+
+    def stats(self, request: dict) -> dict:
+        return {'name': self.name, 'count': len(self._members)}
+
+    def handle(self, request: dict) -> dict:
+        handler = self._handlers.get(request.get('op'))
+        if handler is None:
+            raise ValueError(f"未知操作 {request.get('op')}")
+        return handler(request)
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """同一连接上的请求依次处理（每个操作都是纯内存的字典操作，不会阻塞太久）"""
+        try:
+            while True:
+                try:
+                    request = await read_frame(reader)
+                except (ValueError, asyncio.IncompleteReadError) as exc:
+                    logger.warning("连接帧错误，断开: %s", exc)
+                    break
+                if request is None:
+                    break
+                request_id = request.get('id') if isinstance(request, dict) else None
+                try:
+                    response = {'id': request_id, 'ok': True, 'result': self.handle(request)}
+                except (KeyError, TypeError, ValueError, AttributeError) as exc:
+                    response = {'id': request_id, 'ok': False, 'error': f"{type(exc).__name__}: {exc}"}
+                writer.write(encode_frame(response))
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve_shard(shard: OpenerShard, socket_path: str):
+    server = await asyncio.start_unix_server(shard.serve_connection, path=socket_path, limit=MAX_FRAME)
+    logger.info("分片 %s 已启动 socket=%s", shard.name, socket_path)
+    async with server:
+        await server.serve_forever()
+
+
+# -------------------------- 协调者 --------------------------
+class ShardedOpener:
+    """协调者：验证并恢复 A，按哈希环把查找批量路由到各分片"""
+
+    def __init__(self, opener: Opener, vnodes: int = VNODES, page_bytes: int = PAGE_BYTES):
+        self.opener = opener
+        self.group = opener.public_key.group
+        self.vnodes = vnodes
+        self.page_bytes = page_bytes
+        self.ring: Optional[HashRing] = None
+        self._clients: Dict[str, ServiceClient] = {}
+        self.moved = 0  # 扩容时迁移的记录数
+
+    @property
+    def shards(self) -> List[str]:
+        return list(self._clients)
+
+    async def add_shard(self, name: str, socket_path: str):
+        """
+        连接新分片（须为空）并把哈希环上改归它的记录从旧分片按页迁移过去
+        全部记录写入新分片后才切换哈希环并删除旧分片上的副本；失败时回滚并抛出异常，哈希环不变
+        """
+        if name in self._clients:
+            raise ValueError(f"分片 {name} 已存在")
+        client = await ServiceClient.connect(socket_path)
+        try:
+            if (await client.call('stats'))['count']:
+                raise ValueError(f"新分片 {name} 不为空")
+            previous = self.shards
+            shards = previous + [name]
+            moved = await self._migrate(client, previous, shards) if previous else 0
+        except BaseException:
+            await client.close()
+            raise
+        self._clients[name] = client
+        self.ring = HashRing(shards, self.vnodes)
+        if previous:
+            await asyncio.gather(*(self._clients[shard].call('migrate_commit') for shard in previous))
+        self.moved += moved
+        logger.info("加入分片 %s，从 %d 个分片迁移 %d 条记录", name, len(previous), moved)
+
+    async def _migrate(self, target: ServiceClient, previous: List[str], shards: List[str]) -> int:
+        """把旧分片上按新环属于新分片的记录逐页复制到 target，返回复制的记录数；失败时回滚"""
+        sources = [self._clients[shard] for shard in previous]
+        moved = 0
+        try:
+            await asyncio.gather(*(source.call('migrate_begin', shards=shards, vnodes=self.vnodes)
+                                   for source in sources))
+            for source in sources:
+                offset = 0
+                while True:
+                    page = await source.call('migrate_page', offset=offset, max_bytes=self.page_bytes)
+                    if not page['entries']:
+                        break
+                    await target.call('put', entries=page['entries'])
+                    moved += len(page['entries'])
+                    offset = page['next']
+        except BaseException:
+            # 旧分片还保留全部记录：放弃迁移、清空新分片即可恢复原状
+            await asyncio.gather(*(source.call('migrate_abort') for source in sources), return_exceptions=True)
+            await asyncio.gather(target.call('clear'), return_exceptions=True)
+            raise
+        return moved
+
+    def _partition(self, encodings: Sequence[bytes]) -> Dict[str, List[int]]:
+        """按所属分片分组，返回 分片名 -> 下标列表"""
+        if self.ring is None:
+            raise ValueError("还没有分片")
+        groups: Dict[str, List[int]] = {}
+        owner = self.ring.owner
+        for index, encoding in enumerate(encodings):
+            groups.setdefault(owner(encoding), []).append(index)
+        return groups
+
+    async def put_many(self, entries: Iterable[Tuple[bytes, str]], batch: int = PUT_BATCH):
+        """登记 (A_i 编码, 成员 ID)：每攒够 batch 条按分片分组后并发发送"""
+        entries = iter(entries)
+        while True:
+            chunk = [entry for _, entry in zip(range(batch), entries)]
+            if not chunk:
+                return
+            groups = self._partition([encoding for encoding, _ in chunk])
+            await asyncio.gather(*(self._clients[shard].call(
+                'put', entries=[[chunk[i][0].hex(), chunk[i][1]] for i in indices])
+                for shard, indices in groups.items()))
+
+    async def lookup_many(self, encodings: Sequence[bytes]) -> List[Optional[str]]:
+        """按 A 编码批量查成员：每个分片一个请求，并发等待"""
+        results: List[Optional[str]] = [None] * len(encodings)
+        groups = self._partition(encodings)
+        replies = await asyncio.gather(*(self._clients[shard].call(
+            'lookup', keys=[encodings[i].hex() for i in indices]) for shard, indices in groups.items()))
+        for indices, reply in zip(groups.values(), replies):
+            for index, member_id in zip(indices, reply['members']):
+                results[index] = member_id
+        return results
+
+    async def open_many(self, signatures: Sequence, verify: bool = True) -> List[Tuple[bool, Optional[str]]]:
+        """
+        批量打开：每个签名验证并恢复 A 一次（verify=False 时只恢复 A），再批量查成员
+        返回与输入一一对应的 (是否有效, 成员 ID)
+        """
+        recovered = []
+        for signature in signatures:
+            if verify:
+                recovered.append(self.opener.open(signature))
+            else:
+                recovered.append((True, self.group.g1_to_bytes(self.opener.recover(signature))))
+        valid = [index for index, (ok, _) in enumerate(recovered) if ok]
+        members = await self.lookup_many([recovered[index][1] for index in valid]) if valid else []
+        results: List[Tuple[bool, Optional[str]]] = [(False, None)] * len(recovered)
+        for index, member_id in zip(valid, members):
+            results[index] = (True, member_id)
+        return results
+
+    async def stats(self) -> dict:
+        counts = await asyncio.gather(*(client.call('stats') for client in self._clients.values()))
+        return {'shards': {reply['name']: reply['count'] for reply in counts}, 'moved': self.moved}
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
+
+
+# -------------------------- 本机集群 --------------------------
+class LocalCluster:
+    """在本机启动分片子进程（每个分片一个 Unix 套接字），async with 退出时终止"""
+
+    def __init__(self, directory: str, shards: int = 0):
+        self.directory = directory
+        self.sockets: Dict[str, str] = {}
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._initial = shards
+
+    async def start_shard(self, name: Optional[str] = None, timeout: float = 10.0) -> Tuple[str, str]:
+        """启动一个分片进程，等待其套接字可连接后返回 (分片名, 套接字路径)"""
+        name = name or f"shard-{len(self._processes)}"
+        path = os.path.join(self.directory, f"{name}.sock")
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--socket", path, "--name", name])
+        self._processes[name] = process
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not os.path.exists(path):
+            if process.poll() is not None or loop.time() > deadline:
+                raise RuntimeError(f"分片 {name} 未能启动")
+            await asyncio.sleep(0.01)
+        self.sockets[name] = path
+        return name, path
+
+    async def __aenter__(self) -> "LocalCluster":
+        for _ in range(self._initial):
+            await self.start_shard()
+        return self
+
+    async def __aexit__(self, *exc):
+        for process in self._processes.values():
+            process.terminate()
+        for process in self._processes.values():
+            process.wait()
+        for path in self.sockets.values():
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="分片 opener 的分片进程")
+    parser.add_argument("--socket", required=True, help="Unix 域套接字路径")
+    parser.add_argument("--name", required=True, help="分片名（哈希环上的标识）")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr, format="%(asctime)s %(name)s %(message)s")
+    try:
+        asyncio.run(serve_shard(OpenerShard(args.name), args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+BBS04 签名的定长二进制编码
+
+σ = (T₁, T₂, T₃, c, s_α, s_β, s_x, s_δ₁, s_δ₂) 依次拼接：
+    T₁、T₂、T₃  G1 压缩编码，各 field_bytes 字节（x 坐标 + 无穷远/奇偶标志位）
+    c 及 5 个响应  Z_r 元素，各 scalar_bytes 字节，大端
+Type F 参数下为 3×20 + 6×20 = 180 字节。多个签名直接首尾相接即为签名日志，
+SignatureView 在 memoryview 上按偏移读取字段，不复制底层缓冲区，可直接用于 mmap 的日志文件。
+
+signature_to_wire / signature_from_wire 是完整签名（含 R₁..R₅ 与可选的撤销标签）的 JSON 友好形式：
+G1、GT 元素为编码的十六进制串，Z_r 元素为整数，供 service 模块的网络协议使用。
+"""
+import mmap
+from collections.abc import Mapping
+from typing import Iterator, Optional, Sequence
+
+from bbs04 import COMMITMENT_FIELDS, G1_FIELDS, SIGNATURE_FIELDS, TAG_FIELDS
+from pairing_group import PairingGroup
+
+POINT_FIELDS = ('T1', 'T2', 'T3')
+SCALAR_FIELDS = ('c', 's_alpha', 's_beta', 's_x', 's_delta1', 's_delta2')
+_MISSING = object()
+
+
+class SignatureCodec:
+    """签名编解码器，字段布局由配对群参数决定"""
+
+    def __init__(self, group: PairingGroup):
+        self.group = group
+        self.point_bytes = group.field_bytes
+        self.scalar_bytes = (int(group.r).bit_length() + 7) // 8
+        self.offsets = {}
+        offset = 0
+        for field in POINT_FIELDS:
+            self.offsets[field] = (offset, offset + self.point_bytes)
+            offset += self.point_bytes
+        for field in SCALAR_FIELDS:
+            self.offsets[field] = (offset, offset + self.scalar_bytes)
+            offset += self.scalar_bytes
+        self.size = offset
+
+    def encode(self, signature) -> bytes:
+        grp = self.group
+        if 'T4' in signature:
+            raise ValueError("定长编码不包含撤销标签 (epoch, T₄, R₆)")
+        parts = [grp.g1_to_bytes(signature[field]) for field in POINT_FIELDS]
+        for field in SCALAR_FIELDS:
+            value = int(signature[field])
+            if not 0 <= value < grp.r:
+                raise ValueError(f"{field} 不在 Z_r 范围内")
+            parts.append(value.to_bytes(self.scalar_bytes, "big"))
+        return b"".join(parts)
+
+    def decode(self, data, message: Optional[str] = None) -> dict:
+        """完整解码为签名字典（data 可以是字节串或 SignatureView）"""
+        view = data if isinstance(data, SignatureView) else self.view(data, message)
+        return {field: view[field] for field in view}
+
+    def view(self, data, message: Optional[str] = None) -> "SignatureView":
+        buf = memoryview(data)
+        if len(buf) != self.size:
+            raise ValueError(f"签名编码长度应为 {self.size} 字节，实际 {len(buf)}")
+        return SignatureView(self, buf, message)
+
+    def iter_views(self, buffer, messages: Optional[Sequence[str]] = None) -> Iterator["SignatureView"]:
+        """在连续缓冲区（bytes、bytearray、mmap）上逐个给出签名视图"""
+        buf = memoryview(buffer)
+        if len(buf) % self.size:
+            raise ValueError(f"缓冲区长度 {len(buf)} 不是签名长度 {self.size} 的整数倍")
+        count = len(buf) // self.size
+        if messages is not None and len(messages) != count:
+            raise ValueError(f"消息数 {len(messages)} 与签名数 {count} 不一致")
+        for i in range(count):
+            yield SignatureView(self, buf[i * self.size:(i + 1) * self.size],
+                                None if messages is None else messages[i])
+
+    def write_log(self, path: str, signatures):
+        with open(path, "wb") as fh:
+            for signature in signatures:
+                fh.write(self.encode(signature))
+
+    def map_log(self, path: str) -> mmap.mmap:
+        """只读 mmap 一个签名日志文件，配合 iter_views 使用；关闭前须先释放所有视图"""
+        with open(path, "rb") as fh:
+            return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def signature_to_wire(group: PairingGroup, signature) -> dict:
+    """签名字典 -> 只含 str/int 的字典（忽略以下划线开头的本地字段）"""
+    wire = {}
+    for field, value in signature.items():
+        if field in G1_FIELDS:
+            wire[field] = group.g1_to_bytes(value).hex()
+        elif field == 'R3':
+            wire[field] = group.gt_to_bytes(value).hex()
+        elif field in SCALAR_FIELDS:
+            wire[field] = int(value)
+        elif field in ('message', 'epoch'):
+            wire[field] = value
+    return wire
+
+
+def signature_from_wire(group: PairingGroup, wire: dict) -> dict:
+    """signature_to_wire 的逆变换；不是 JSON 对象、字段类型或编码不合法时抛出 ValueError"""
+    if not isinstance(wire, Mapping):
+        raise ValueError(f"签名应为 JSON 对象，实际为 {type(wire).__name__}")
+    known = SIGNATURE_FIELDS + COMMITMENT_FIELDS + TAG_FIELDS + ('message',)
+    signature = {}
+    for field, value in wire.items():
+        if field not in known:
+            raise ValueError(f"未知字段 {field}")
+        if field in ('message', 'epoch'):
+            if not isinstance(value, str):
+                raise ValueError(f"{field} 应为字符串")
+            signature[field] = value
+        elif field in SCALAR_FIELDS:
+            if not isinstance(value, int) or not 0 <= value < group.r:
+                raise ValueError(f"{field} 不在 Z_r 范围内")
+            signature[field] = value
+        else:
+            if not isinstance(value, str):
+                raise ValueError(f"{field} 应为十六进制串")
+            data = bytes.fromhex(value)
+            signature[field] = group.gt_from_bytes(data) if field == 'R3' else group.g1_from_bytes(data)
+    return signature
+
+
+class SignatureView:
+    """
+    缓冲区中单个签名的只读视图，按需解码字段并缓存结果
+    支持 signature['T1']、'message' in signature 等字典式访问，可直接交给 GroupPublicKey.verify
+    """
+    __slots__ = ("_codec", "_buf", "_message", "_cache")
+
+    def __init__(self, codec: SignatureCodec, buf: memoryview, message: Optional[str] = None):
+        self._codec = codec
+        self._buf = buf
+        self._message = message
+        self._cache = {}
+
+    def __getitem__(self, field):
+        if field == 'message' and self._message is not None:
+            return self._message
+        if field not in self._codec.offsets:
+            raise KeyError(field)
+        value = self._cache.get(field, _MISSING)
+        if value is _MISSING:
+            start, end = self._codec.offsets[field]
+            raw = self._buf[start:end]
+            if field in POINT_FIELDS:
+                value = self._codec.group.g1_from_bytes(raw)
+            else:
+                value = int.from_bytes(raw, "big")
+                if value >= self._codec.group.r:
+                    raise ValueError(f"{field} 不在 Z_r 范围内")
+            self._cache[field] = value
+        return value
+
+    def __contains__(self, field):
+        return field in self._codec.offsets or (field == 'message' and self._message is not None)
+
+    def __iter__(self):
+        yield from SIGNATURE_FIELDS
+        if self._message is not None:
+            yield 'message'
+
+    def get(self, field, default=None):
+        return self[field] if field in self else default
+
+    def tobytes(self) -> bytes:
+        return self._buf.tobytes()
@@ -0,0 +1,215 @@
+"""
+离线/在线签名：按成员预先生成签名承诺（随机数 α、β、r_*，T₁..T₃ 与 R₁..R₅），
+在线签名只剩一次哈希和五次乘加 s = r + c·w
+
+每个成员一个有界池：某个成员的池降到低水位 low 时唤醒后台填充线程，补到高水位 high 为止。
+processes > 0 时填充线程把计算交给进程池（公钥经 initializer 发送一次，任务只携带该成员的私钥），
+预计算不再和请求线程争 GIL。
+承诺在锁内出队，每个承诺只交给一个签名请求，签名后即作废（见 SignatureCommitment.consume）；
+池空时在请求线程内现场生成（计为一次未命中），不会阻塞等待。
+撤销成员会更换群公钥：取出的承诺若属于旧公钥，该成员的池整体作废，进程池也按新公钥重建。
+"""
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from bbs04 import GroupPublicKey, GroupSignature, SignatureCommitment
+from message_digest import MessageSource
+
+logger = logging.getLogger("bbs04.pool")
+
+_worker_public_key = None
+
+
+def _init_worker(public_key: GroupPublicKey):
+    global _worker_public_key
+    _worker_public_key = public_key
+
+
+def _commit(member_id, A_i, x_i: int, e_A, epoch: Optional[str]) -> SignatureCommitment:
+    return _worker_public_key.commit(member_id, A_i, x_i, e_A, epoch)
+
+
+class SigningPool:
+    """成员签名承诺池：take 取出一个预计算承诺，sign 用它完成在线签名（epoch 非空时签名带撤销标签）"""
+
+    def __init__(self, scheme: GroupSignature, low: int = 8, high: int = 32, processes: int = 0,
+                 epoch: Optional[str] = None):
+        if not 0 <= low < high:
+            raise ValueError(f"水位不合法: low={low}, high={high}（需要 0 ≤ low < high）")
+        self.scheme = scheme
+        self.low = low
+        self.high = high
+        self.processes = processes
+        self.epoch = epoch
+        self._pools: Dict[object, deque] = {}
+        self._refilling = set()  # 降到低水位、正在补到高水位的成员
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)  # 唤醒填充线程
+        self._filled = threading.Condition(self._lock)  # 通知 wait_ready
+        self._stopped = False
+        self._thread = None
+        self._executor = None
+        self._executor_key = None  # 工作进程中公钥的指纹
+        self.hits = 0
+        self.misses = 0
+        self.precomputed = 0
+
+    # ---- 生命周期 ----
+    def start(self, members: Iterable = ()) -> "SigningPool":
+        for member_id in members:
+            self.add_member(member_id)
+        self._thread = threading.Thread(target=self._fill_loop, name="bbs04-signing-pool", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        """停止填充并丢弃所有未用的承诺（Python 无法擦除整数内存，这里只保证不再持有引用）"""
+        with self._lock:
+            self._stopped = True
+            self._wakeup.notify_all()
+            self._filled.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+            self._executor_key = None
+        with self._lock:
+            for pool in self._pools.values():
+                pool.clear()
+            self._refilling.clear()
+
+    def __enter__(self) -> "SigningPool":
+        return self if self._thread is not None else self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- 成员与状态 ----
+    def add_member(self, member_id):
+        """登记成员并立即开始填充"""
+        if member_id not in self.scheme.members:
+            raise ValueError(f"成员 {member_id} 不存在")
+        with self._lock:
+            self._pools.setdefault(member_id, deque())
+            self._mark_low(member_id)
+
+    def available(self, member_id) -> int:
+        with self._lock:
+            pool = self._pools.get(member_id)
+            return len(pool) if pool is not None else 0
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """等到所有成员的池都补到高水位；超时返回 False"""
+        with self._lock:
+            return self._filled.wait_for(lambda: self._stopped or not self._refilling, timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'precomputed': self.precomputed,
+                    'available': sum(len(pool) for pool in self._pools.values())}
+
+    # ---- 在线签名 ----
+    def take(self, member_id) -> Optional[SignatureCommitment]:
+        """取出一个承诺（池空返回 None）；未登记的成员自动登记"""
+        with self._lock:
+            pool = self._pools.get(member_id)
+            if pool is None:
+                if self._stopped:
+                    return None
+                pool = self._pools[member_id] = deque()
+            commitment = pool.popleft() if pool else None
+            if commitment is not None and commitment.key != self.scheme.public_key.fingerprint:
+                pool.clear()  # 群公钥已更换，池中全部作废
+                commitment = None
+            if commitment is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if len(pool) <= self.low and not self._stopped:
+                self._mark_low(member_id)
+        return commitment
+
+    def sign(self, member_id, message: MessageSource) -> dict:
+        return self.scheme.sign(member_id, message, self.take(member_id), self.epoch)
+
+    def reset(self):
+        """丢弃全部承诺并重新填充（撤销成员后调用；已撤销的成员不再登记）"""
+        with self._lock:
+            for member_id in list(self._pools):
+                self._pools[member_id].clear()
+                if member_id in self.scheme.members:
+                    self._mark_low(member_id)
+                else:
+                    del self._pools[member_id]
+                    self._refilling.discard(member_id)
+
+    # ---- 后台填充 ----
+    def _mark_low(self, member_id):
+        if member_id not in self._refilling:
+            self._refilling.add(member_id)
+            self._wakeup.notify()
+
+    def _plan(self, count: int) -> List:
+        """在锁内挑出下一批要补的成员：每次给预计数量最少的成员补一个"""
+        projected = {member_id: len(self._pools[member_id]) for member_id in self._refilling}
+        jobs = []
+        for _ in range(count):
+            member_id = min(projected, key=projected.get)
+            if projected[member_id] >= self.high:
+                break
+            projected[member_id] += 1
+            jobs.append(member_id)
+        return jobs
+
+    def _compute(self, jobs: List) -> List[SignatureCommitment]:
+        scheme = self.scheme
+        if not self.processes:
+            return [scheme.commit(member_id, self.epoch) for member_id in jobs]
+        public_key = scheme.public_key
+        if self._executor_key != public_key.fingerprint:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                                 initargs=(public_key,))
+            self._executor_key = public_key.fingerprint
+        futures = []
+        for member_id in jobs:
+            member = scheme.members[member_id]
+            futures.append(self._executor.submit(_commit, member_id, member.A_i, member.x_i,
+                                                 scheme._member_pairing(member), self.epoch))
+        return [future.result() for future in futures]
+
+    def _fill_loop(self):
+        while True:
+            with self._lock:
+                self._wakeup.wait_for(lambda: self._stopped or self._refilling)
+                if self._stopped:
+                    return
+                jobs = self._plan(max(1, self.processes))
+            try:
+                commitments = self._compute(jobs)
+            except Exception:
+                logger.exception("预计算签名承诺失败 members=%s", sorted(set(map(str, jobs))))
+                commitments = []
+                with self._lock:
+                    self._refilling.difference_update(jobs)  # 下次 take 时重新登记，避免空转
+            with self._lock:
+                if self._stopped:
+                    return
+                current = self.scheme.public_key.fingerprint
+                for commitment in commitments:
+                    pool = self._pools.get(commitment.member_id)
+                    if pool is not None and len(pool) < self.high and commitment.key == current:
+                        pool.append(commitment)
+                        self.precomputed += 1
+                for member_id in list(self._refilling):
+                    pool = self._pools.get(member_id)
+                    if pool is None or len(pool) >= self.high:
+                        self._refilling.discard(member_id)
+                if not self._refilling:
+                    self._filled.notify_all()
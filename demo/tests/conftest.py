@@ -0,0 +1,5 @@
+"""demo 下的模块彼此按同级模块导入，测试时把 demo 目录加入 sys.path"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
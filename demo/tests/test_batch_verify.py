@@ -0,0 +1,56 @@
+"""批量验证：signature_codec 解码的签名（不带 R₁..R₅）与完整签名混在一批中"""
+import pytest
+
+from bbs04 import COMMITMENT_FIELDS, GroupSignature
+from signature_codec import SignatureCodec, signature_from_wire, signature_to_wire
+
+
+@pytest.fixture(scope="module")
+def group():
+    gs = GroupSignature()
+    gs.join_many(["alice", "bob"])
+    return gs
+
+
+def test_codec_round_trip_through_verify_batch(group):
+    codec = SignatureCodec(group.group)
+    messages = [f"消息 {i}" for i in range(6)]
+    signatures = [group.sign("alice" if i % 2 else "bob", message) for i, message in enumerate(messages)]
+    decoded = [codec.decode(codec.encode(signature)) for signature in signatures]
+    assert not any(field in decoded[0] for field in COMMITMENT_FIELDS)
+    assert group.verify_batch(decoded, messages=messages) == (True, [])
+
+    views = list(codec.iter_views(b"".join(codec.encode(signature) for signature in signatures), messages))
+    assert group.verify_batch(views) == (True, [])
+
+    mixed = signatures[:3] + [{**signature, 'message': message}
+                              for signature, message in zip(decoded[3:], messages[3:])]
+    mixed[4] = {**mixed[4], 'message': "篡改"}
+    assert group.verify_batch(mixed) == (False, [4])
+    assert group.verify_batch(decoded, messages=messages[:2] + ["篡改"] + messages[3:]) == (False, [2])
+
+
+def test_wire_round_trip_through_verify_batch(group):
+    signatures = [group.sign("alice", f"消息 {i}") for i in range(3)]
+    wires = [signature_to_wire(group.group, signature) for signature in signatures]
+    assert group.verify_batch([signature_from_wire(group.group, wire) for wire in wires]) == (True, [])
+
+
+def negated_R3_signature(gs, message):
+    """R₃ 乘以 2 阶元素 -1 后重新计算挑战值：单独验证不通过，两个这样的签名的 -1 在合并检查中相消"""
+    grp, public_key = gs.group, gs.public_key
+    commitment = gs.commit("alice")
+    minus_one = (grp._num(grp.q - 1),) + grp.gt_one()[1:]
+    values = commitment.values
+    values['R3'] = grp.gt_mul(values['R3'], minus_one)
+    commitment.encoded = public_key.encode_commitment(*(values[field] for field in
+                                                        ('T1', 'T2', 'T3', 'R1', 'R2', 'R3', 'R4', 'R5')))
+    return public_key.respond(commitment, message)
+
+
+def test_R3_outside_subgroup_is_rejected(group):
+    forged = [negated_R3_signature(group, f"伪造 {i}") for i in range(2)]
+    assert not any(group.verify(signature) for signature in forged)
+    assert not group.group.gt_in_subgroup(forged[0]['R3'])
+    assert group.verify_batch(forged) == (False, [0, 1])
+    assert group.verify_batch(forged + [group.sign("bob", "正常")]) == (False, [0, 1])
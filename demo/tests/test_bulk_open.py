@@ -0,0 +1,20 @@
+"""批量追踪：带撤销标签的签名经 open_many 打开（当前进程内与进程池两种路径）"""
+import pytest
+
+from bbs04 import TAG_FIELDS, GroupSignature
+
+
+@pytest.fixture(scope="module")
+def group():
+    gs = GroupSignature()
+    gs.join_many(["alice", "bob"])
+    return gs
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_tagged_signatures_open(group, workers):
+    signatures = [group.sign("alice", "带标签", epoch="2026-10"), group.sign("bob", "不带标签"),
+                  group.sign("bob", "带标签", epoch="2026-11")]
+    assert all(field in signatures[0] for field in TAG_FIELDS)
+    results = list(group.open_many(signatures, workers=workers, chunk_size=2))
+    assert results == [(True, "alice"), (True, "bob"), (True, "bob")]
@@ -0,0 +1,116 @@
+"""命令行流水线：损坏或格式错误的记录输出带 id 的错误行，不中断处理"""
+import json
+import os
+import shutil
+
+import pytest
+
+import cli
+from key_store import load_muo
+from muo import ProxySignatureProtected
+from service import FRAME
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("cli")
+    path = str(directory / "store")
+    assert cli.main(["bbs04", "keygen", "--store", path]) == 0
+    assert cli.main(["bbs04", "join", "--store", path, "alice"]) == 0
+    return directory, path
+
+
+def run(args, directory, name):
+    output = str(directory / name)
+    code = cli.main([*args, "--workers", "0", "--quiet", "-o", output])
+    with open(output, encoding="utf-8") as fh:
+        return code, [json.loads(line) for line in fh]
+
+
+def test_malformed_jsonl_records(store):
+    directory, path = store
+    messages = directory / "messages.jsonl"
+    messages.write_text("\n".join(json.dumps({'id': i, 'message': f"消息 {i}"}) for i in range(3)) + "\n",
+                        encoding="utf-8")
+    code, signed = run(["bbs04", "sign", "--store", path, "--member", "alice", "-i", str(messages)],
+                       directory, "signed.jsonl")
+    assert code == 0
+    lines = [json.dumps(record, ensure_ascii=False) for record in signed]
+    lines += ['{"id": "oops", "signature": "oops"}', '{"id": "list", "signature": [1, 2]}',
+              '{"id": "missing"}', 'not json', '[1, 2, 3]']
+    (directory / "mixed.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    for command in ("verify", "open"):
+        code, results = run(["bbs04", command, "--store", path, "-i", str(directory / "mixed.jsonl")],
+                            directory, f"{command}.jsonl")
+        assert code == 1
+        assert [result['valid'] for result in results[:3]] == [True] * 3
+        assert [result.get('id') for result in results] == [0, 1, 2, "oops", "list", "missing", None, None]
+        assert all('error' in result for result in results[3:])
+
+
+def test_corrupted_binary_log(store):
+    directory, path = store
+    messages = [f"消息 {i}".encode("utf-8") for i in range(3)]
+    frames = directory / "messages.bin"
+    frames.write_bytes(b"".join(FRAME.pack(len(message)) + message for message in messages))
+    code = cli.main(["bbs04", "sign", "--store", path, "--member", "alice", "--format", "binary",
+                     "-i", str(frames), "-o", str(directory / "signatures.bin"), "--workers", "0", "--quiet"])
+    assert code == 0
+    log = bytearray((directory / "signatures.bin").read_bytes())
+    size = len(log) // 3
+    log[size:2 * size] = b"\xff" * size  # 第二条签名损坏到无法解码
+    (directory / "corrupted.bin").write_bytes(bytes(log))
+    code, results = run(["bbs04", "verify", "--store", path, "--format", "binary", "--messages", str(frames),
+                         "-i", str(directory / "corrupted.bin")], directory, "binary.jsonl")
+    assert code == 1
+    assert results[0] == {'valid': True} and results[2] == {'valid': True}
+    assert 'error' in results[1]
+
+
+def test_muo_verify_rejects_malformed_and_non_canonical(tmp_path):
+    store, delegation = str(tmp_path / "muo.bks"), str(tmp_path / "delegation.json")
+    assert cli.main(["muo", "keygen", "--store", store, "alice", "bob"]) == 0
+    assert cli.main(["muo", "delegate", "--store", store, "--from", "alice", "--to", "bob", "-o", delegation]) == 0
+    messages = tmp_path / "messages.jsonl"
+    messages.write_text(json.dumps({'id': "m", 'message': "代理"}) + "\n", encoding="utf-8")
+    code, (signed,) = run(["muo", "proxy-sign", "--store", store, "--delegation", delegation, "-i", str(messages)],
+                          tmp_path, "signed.jsonl")
+    assert code == 0
+    R, s, K = signed['signature']
+    order = ProxySignatureProtected(load_muo(store)[0]).order
+    lines = [json.dumps(signed, ensure_ascii=False),
+             json.dumps({'id': "variant", 'signature': [R, s + order, K], 'message': "代理"}),
+             json.dumps({'id': "short", 'signature': [R, s], 'message': "代理"}),
+             json.dumps({'id': "oops", 'signature': "oops", 'message': "代理"}), '"text"']
+    (tmp_path / "mixed.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    code, results = run(["muo", "verify", "--store", store, "--from", "alice", "--to", "bob",
+                         "-i", str(tmp_path / "mixed.jsonl")], tmp_path, "verified.jsonl")
+    assert code == 1
+    assert results[:2] == [{'id': "m", 'valid': True}, {'id': "variant", 'valid': False}]
+    assert [result.get('id') for result in results[2:]] == ["short", "oops", None]
+    assert all('error' in result for result in results[2:])
+
+
+def test_sign_and_open_workers_do_not_need_issuer_secret(store, tmp_path):
+    _, path = store
+    worker_store = str(tmp_path / "no-issuer")
+    shutil.copytree(path, worker_store)
+    os.remove(os.path.join(worker_store, "issuer.bks"))
+    messages = tmp_path / "messages.jsonl"
+    messages.write_text(json.dumps({'id': 7, 'message': "消息", 'epoch': "2026-10"}) + "\n", encoding="utf-8")
+    code, signed = run(["bbs04", "sign", "--store", worker_store, "--member", "alice", "-i", str(messages)],
+                       tmp_path, "signed.jsonl")
+    assert code == 0 and 'T4' in signed[0]['signature']
+    (tmp_path / "signed-in.jsonl").write_text(json.dumps(signed[0]) + "\n", encoding="utf-8")
+    code, opened = run(["bbs04", "open", "--store", worker_store, "-i", str(tmp_path / "signed-in.jsonl")],
+                       tmp_path, "opened.jsonl")
+    assert code == 0 and opened == [{'id': 7, 'valid': True, 'member': "alice"}]
+
+
+def test_unknown_signing_member_is_rejected_up_front(store, tmp_path):
+    _, path = store
+    frames = tmp_path / "messages.bin"
+    frames.write_bytes(FRAME.pack(2) + b"hi")
+    with pytest.raises(SystemExit, match="nobody"):
+        cli.main(["bbs04", "sign", "--store", path, "--member", "nobody", "--format", "binary",
+                  "-i", str(frames), "-o", str(tmp_path / "out.bin"), "--workers", "0", "--quiet"])
@@ -0,0 +1,16 @@
+"""密钥库：批量加入用的宽窗口表只在已经建立或显式要求时写出"""
+from bbs04 import GroupSignature
+
+
+def test_join_table_written_only_when_built_or_requested(tmp_path):
+    gs = GroupSignature()
+    gs.join_many(["alice", "bob"])
+    gs.save(str(tmp_path / "lazy"))
+    assert gs._join_table is None
+    assert GroupSignature.load(str(tmp_path / "lazy"))._join_table is None
+
+    gs.save(str(tmp_path / "eager"), join_table=True)
+    loaded = GroupSignature.load(str(tmp_path / "eager"))
+    assert loaded._join_table is not None
+    loaded.join_many(["carol"])
+    assert loaded.open_signature(loaded.sign("carol", "消息")) == "carol"
@@ -0,0 +1,68 @@
+"""MUO 代理签名的规范表示：变形签名被单个与批量验证拒绝，重放检测的键与原签名相同"""
+import pytest
+
+from muo import (ProxySignatureProtected, ProxySignatureUnprotected, generate_key_pair, generate_system_params,
+                 signature_in_range)
+from replay_guard import REPLAY_REASON, ReplayGuard, muo_key
+
+MESSAGE = "代理签名的消息"
+
+
+@pytest.fixture(scope="module")
+def signed():
+    params = generate_system_params()
+    scheme = ProxySignatureUnprotected(params)
+    x_A, y_A = generate_key_pair(params)
+    delta, K, _ = scheme.delegate(x_A, y_A)
+    R, s, K = scheme.sign(delta, K, MESSAGE)[:3]
+    return scheme, y_A, (R, s, K)
+
+
+def variants(scheme, signature):
+    R, s, K = signature
+    p, order = scheme.p, scheme.order
+    return [(R, s + order, K), (R, s + (p - 1), K), (R + p * (p - 1), s, K + p * (p - 1))]
+
+
+def test_variants_satisfy_equation_but_are_rejected(signed):
+    scheme, y_A, signature = signed
+    assert scheme.verify(signature, y_A, MESSAGE)[0]
+    for variant in variants(scheme, signature):
+        assert not signature_in_range(scheme.p, scheme.order, variant)
+        assert not scheme.verify(variant, y_A, MESSAGE)[0]
+    batch = [signature] + variants(scheme, signature)
+    ok, bad = scheme.verify_batch(batch, y_A, [MESSAGE] * len(batch))
+    assert not ok and bad == [1, 2, 3]
+
+
+def test_protected_scheme_rejects_variants():
+    params = generate_system_params()
+    scheme = ProxySignatureProtected(params)
+    x_A, y_A = generate_key_pair(params)
+    x_B, y_B = generate_key_pair(params)
+    _, delta_bar, K, _ = scheme.delegate(x_A, y_A, x_B, y_B)
+    signature = scheme.sign(delta_bar, K, MESSAGE)[:3]
+    assert scheme.verify(signature, y_A, y_B, MESSAGE)[0]
+    for variant in variants(scheme, signature):
+        assert not scheme.verify(variant, y_A, y_B, MESSAGE)[0]
+    ok, bad = scheme.verify_batch(variants(scheme, signature), y_A, y_B, [MESSAGE] * 3)
+    assert bad == [0, 1, 2]
+
+
+def test_replay_key_is_canonical(signed, tmp_path):
+    scheme, _, signature = signed
+    assert {muo_key(scheme, variant) for variant in variants(scheme, signature)} == {muo_key(scheme, signature)}
+    guard = ReplayGuard(str(tmp_path))
+    assert guard.record(muo_key(scheme, signature)) is None
+    for variant in variants(scheme, signature):
+        assert guard.check(muo_key(scheme, variant)) == REPLAY_REASON
+    guard.close()
+
+
+def test_single_and_batch_verify_agree_on_range(signed):
+    scheme, y_A, (R, s, K) = signed
+    candidates = [(R, s, K), (R + scheme.p, s, K), (0, s, K), (R, s, 0), (R, s, K + scheme.p), (R, -1, K)]
+    single = [index for index, candidate in enumerate(candidates)
+              if not scheme.verify(candidate, y_A, MESSAGE)[0]]
+    _, bad = scheme.verify_batch(candidates, y_A, [MESSAGE] * len(candidates))
+    assert single == bad == [1, 2, 3, 4, 5]
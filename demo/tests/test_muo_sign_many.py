@@ -0,0 +1,30 @@
+"""批量代理签名：NumPy 与整数两条路径都与逐条 sign 逐字节一致，且与同批的其他消息无关"""
+import pytest
+
+import muo
+from muo import ProxySignatureProtected, ProxySignatureUnprotected, generate_key_pair, generate_system_params
+
+MESSAGES = [f"消息 {i}" for i in range(20)] + ["消息 3"]
+
+
+def signers():
+    params = generate_system_params()
+    x_A, y_A = generate_key_pair(params)
+    x_B, y_B = generate_key_pair(params)
+    unprotected = ProxySignatureUnprotected(params)
+    delta, K, _ = unprotected.delegate(x_A, y_A)
+    protected = ProxySignatureProtected(params)
+    _, delta_bar, K_protected, _ = protected.delegate(x_A, y_A, x_B, y_B)
+    return [(unprotected, delta, K), (protected, delta_bar, K_protected)]
+
+
+@pytest.mark.parametrize("path", ["numpy", "int"])
+def test_sign_many_matches_sign(path, monkeypatch):
+    if path == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(muo, "np", None)
+    for scheme, key, K in signers():
+        batch = scheme.sign_many(key, K, MESSAGES)
+        assert batch == [tuple(scheme.sign(key, K, message)[:3]) for message in MESSAGES]
+        assert scheme.sign_many(key, K, MESSAGES[3:4]) == batch[3:4] == batch[-1:]
@@ -0,0 +1,36 @@
+"""opener 索引：损坏的索引文件在加载时报错，不泄漏文件句柄，查找不会死循环"""
+import pytest
+
+from opener_index import HEADER, MAGIC, DIGEST_SIZE, EMPTY_SLOT, RECORD, OpenerIndex
+
+
+def _write_index(path, capacity, count, slots):
+    data = bytearray(HEADER.pack(MAGIC, DIGEST_SIZE, capacity, count))
+    for slot in slots:
+        data += RECORD.pack(bytes(DIGEST_SIZE), slot)
+    path.write_bytes(bytes(data))
+    return str(path)
+
+
+def test_empty_file_is_rejected_and_closed(tmp_path):
+    path = tmp_path / "empty.idx"
+    path.write_bytes(b"")
+    index = OpenerIndex.load(str(path))
+    with pytest.raises(ValueError):
+        len(index)
+    assert index._file is None
+
+
+def test_capacity_must_be_power_of_two(tmp_path):
+    path = _write_index(tmp_path / "odd.idx", 24, 0, [EMPTY_SLOT] * 24)
+    index = OpenerIndex.load(path)
+    with pytest.raises(ValueError):
+        list(index.lookup(b"A"))
+    assert index._file is None
+
+
+def test_lookup_on_full_table_terminates(tmp_path):
+    path = _write_index(tmp_path / "full.idx", 16, 8, range(16))
+    index = OpenerIndex.load(path)  # 文件头合法，但记录区没有空位
+    assert list(index.lookup(b"A")) == []
+    index.close()
@@ -0,0 +1,82 @@
+"""签名服务：合并批处理中出错的请求只影响自己，格式错误的签名得到错误响应"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from muo import ProxySignatureProtected, generate_key_pair
+from service import Coalescer, SignatureService
+
+
+def echo_batch(items):
+    if "raise" in items:
+        raise RuntimeError("整批失败")
+    return [ValueError(item) if item.startswith("bad") else item.upper() for item in items]
+
+
+async def submit_all(coalescer, items):
+    return await asyncio.gather(*(coalescer.submit(item) for item in items), return_exceptions=True)
+
+
+def test_coalescer_isolates_failures():
+    with ThreadPoolExecutor(1) as executor:
+        coalescer = Coalescer(executor, echo_batch, window=0.01)
+        results = asyncio.run(submit_all(coalescer, ["a", "bad-item", "raise", "b"]))
+    assert results[0] == "A" and results[3] == "B"
+    assert isinstance(results[1], ValueError) and isinstance(results[2], RuntimeError)
+    assert coalescer.batches == 1
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = SignatureService(members=2, muo_params="demo", workers=1, window=0.01, pool_processes=0)
+    yield service
+    service.close()
+
+
+def test_malformed_signatures_fail_alone(service):
+    async def run():
+        signed = await service.handle({'op': 'bbs04.sign', 'member': 'member-0', 'message': "消息"})
+        good = signed['signature']
+        corrupted = {**good, 'T1': "zz"}
+        requests = [good, "oops", [1, 2], corrupted, good]
+        verified = await asyncio.gather(*(service.handle({'op': 'bbs04.verify', 'signature': signature})
+                                          for signature in requests), return_exceptions=True)
+        opened = await asyncio.gather(*(service.handle({'op': 'bbs04.open', 'signature': signature})
+                                        for signature in (good, "oops")), return_exceptions=True)
+        return verified, opened
+
+    verified, opened = asyncio.run(run())
+    assert verified[0] == verified[4] == {'valid': True}
+    assert all(isinstance(result, ValueError) for result in verified[1:4])
+    assert opened[0] == {'valid': True, 'member': 'member-0'}
+    assert isinstance(opened[1], ValueError)
+
+
+def test_muo_verify_queues_stay_bounded(service):
+    p = service.muo['params']['p']
+
+    async def run():
+        signed = await service.handle({'op': 'muo.sign', 'scheme': 'protected', 'message': "代理"})
+        requests = [{'op': 'muo.verify', 'scheme': 'protected', 'signature': signed['signature'], 'message': "代理"}]
+        requests += [{**requests[0], 'y_A': y_A} for y_A in range(2, min(p, 40))]
+        results = await asyncio.gather(*(service.handle(request) for request in requests))
+        with pytest.raises(ValueError):
+            await service.handle({**requests[0], 'y_B': p + 1})
+        return results
+
+    results = asyncio.run(run())
+    assert results[0] == {'valid': True}  # 演示参数 p = 83 太小，其余公钥的结果可能碰巧有效，不逐个断言
+    assert len(service.coalescers) <= 1 + len(("unprotected", "protected"))
+
+
+def test_muo_open_uses_request_keys(service):
+    params = service.muo['params']
+    scheme = ProxySignatureProtected(params)
+    x_A, y_A = generate_key_pair(params)
+    x_B, y_B = generate_key_pair(params)
+    _, delta_bar, K, _ = scheme.delegate(x_A, y_A, x_B, y_B)
+    signature = list(scheme.sign(delta_bar, K, "其他委托")[:3])
+    request = {'op': 'muo.open', 'scheme': 'protected', 'signature': signature, 'message': "其他委托",
+               'y_A': y_A, 'y_B': y_B}
+    assert asyncio.run(service.handle(request)) == {'valid': True, 'signer': "proxy-B"}
@@ -0,0 +1,118 @@
+"""分片 opener：迁移按页进行，超过一帧的迁移不丢记录，失败时回滚"""
+import asyncio
+import os
+
+import pytest
+
+import service
+import sharded_opener
+from bbs04 import GroupSignature
+from sharded_opener import OpenerShard, ShardedOpener
+
+
+@pytest.fixture(scope="module")
+def opener():
+    gs = GroupSignature()
+    gs.join_many(["alice"])
+    return gs.opener
+
+
+class FailingShard(OpenerShard):
+    """第 n 次 put 时失败的分片"""
+
+    def __init__(self, name: str, fail_after: int):
+        super().__init__(name)
+        self._handlers['put'] = self.failing_put
+        self.puts = 0
+        self.fail_after = fail_after
+
+    def failing_put(self, request: dict) -> dict:
+        self.puts += 1
+        if self.puts > self.fail_after:
+            raise ValueError("写入失败")
+        return self.put(request)
+
+
+async def start(shard: OpenerShard, directory: str):
+    path = os.path.join(directory, f"{shard.name}.sock")
+    server = await asyncio.start_unix_server(shard.serve_connection, path=path, limit=service.MAX_FRAME)
+    return server, path
+
+
+def entries(count: int):
+    return [(os.urandom(20), f"member-{i}") for i in range(count)]
+
+
+def test_migration_larger_than_one_frame(opener, tmp_path, monkeypatch):
+    # 帧上限调小到 64 KiB：5000 条记录的一半远超一帧，旧实现会在单个 extract 回复上断开并丢失记录
+    monkeypatch.setattr(service, "MAX_FRAME", 64 << 10)
+    members = entries(5000)
+
+    async def run():
+        shards = [OpenerShard("shard-0"), OpenerShard("shard-1")]
+        servers = [await start(shard, str(tmp_path)) for shard in shards]
+        coordinator = ShardedOpener(opener, page_bytes=16 << 10)
+        await coordinator.add_shard("shard-0", servers[0][1])
+        await coordinator.put_many(members, batch=500)
+        await coordinator.add_shard("shard-1", servers[1][1])
+        counts = (await coordinator.stats())['shards']
+        keys = [encoding for encoding, _ in members]
+        found = [member_id for start in range(0, len(keys), 500)
+                 for member_id in await coordinator.lookup_many(keys[start:start + 500])]
+        await coordinator.close()
+        for server, _ in servers:
+            server.close()
+        return counts, found, coordinator.moved
+
+    counts, found, moved = asyncio.run(run())
+    assert sum(counts.values()) == len(members)
+    assert counts['shard-1'] == moved and moved * 42 > 64 << 10  # 仅十六进制键就超过一帧
+    assert found == [member_id for _, member_id in members]
+
+
+def test_failed_migration_rolls_back(opener, tmp_path):
+    members = entries(3000)
+
+    async def run():
+        source, target = OpenerShard("shard-0"), FailingShard("shard-1", fail_after=1)
+        servers = [await start(shard, str(tmp_path)) for shard in (source, target)]
+        coordinator = ShardedOpener(opener, page_bytes=4 << 10)
+        await coordinator.add_shard("shard-0", servers[0][1])
+        await coordinator.put_many(members)
+        with pytest.raises(service.ServiceError):
+            await coordinator.add_shard("shard-1", servers[1][1])
+        shards = coordinator.shards
+        found = await coordinator.lookup_many([encoding for encoding, _ in members])
+        await coordinator.close()
+        for server, _ in servers:
+            server.close()
+        return shards, found, source, target
+
+    shards, found, source, target = asyncio.run(run())
+    assert shards == ["shard-0"]
+    assert source.stats({})['count'] == len(members) and target.stats({})['count'] == 0
+    assert found == [member_id for _, member_id in members]
+
+
+def test_open_many_routes_tagged_signatures(tmp_path):
+    gs = GroupSignature()
+    gs.join_many([f"member-{i}" for i in range(40)])
+    signatures = [gs.sign(f"member-{i}", "分片追踪", epoch="2026-10" if i % 2 else None) for i in range(0, 40, 5)]
+    tampered = {**signatures[0], 'message': "篡改"}
+
+    async def run():
+        shards = [OpenerShard(f"shard-{i}") for i in range(3)]
+        servers = [await start(shard, str(tmp_path)) for shard in shards]
+        coordinator = ShardedOpener(gs.opener)
+        await coordinator.add_shard("shard-0", servers[0][1])
+        await coordinator.put_many(sharded_opener.registry_entries(gs.members))
+        for shard, (_, path) in zip(shards[1:], servers[1:]):
+            await coordinator.add_shard(shard.name, path)
+        results = await coordinator.open_many(signatures + [tampered])
+        await coordinator.close()
+        for server, _ in servers:
+            server.close()
+        return results
+
+    results = asyncio.run(run())
+    assert results == [(True, f"member-{i}") for i in range(0, 40, 5)] + [(False, None)]
@@ -0,0 +1,90 @@
+"""
+方案类的可选跟踪：logging 结构化日志 + 分阶段计时钩子
+
+核心运算默认不做任何 I/O。需要跟踪时：
+    logging.getLogger("bbs04").setLevel(logging.DEBUG)    # 或 "muo"
+    set_timing_hook(lambda name, seconds: ...)            # 每个阶段结束时回调
+    set_phase_observer(observer)                          # observer.enter(name) / observer.exit(name, seconds)
+日志参数用 %s 延迟格式化，群元素等昂贵的字符串用 Lazy 包装，只有日志真正输出时才计算。
+未开启 DEBUG 且没有钩子时，phase() 返回共享的空上下文，几乎没有额外开销。
+阶段观察者用于需要知道"当前在哪个阶段"的工具（见 instrumentation 模块的原语计数）。
+"""
+import logging
+import time
+from typing import Callable, Optional
+
+TimingHook = Callable[[str, float], None]
+
+_timing_hook: Optional[TimingHook] = None
+_phase_observer = None
+
+
+def set_timing_hook(hook: Optional[TimingHook]):
+    """设置分阶段计时钩子 hook(阶段名, 秒)，传 None 取消"""
+    global _timing_hook
+    _timing_hook = hook
+
+
+def set_phase_observer(observer):
+    """设置阶段观察者（有 enter(name) 与 exit(name, seconds) 方法的对象），传 None 取消"""
+    global _phase_observer
+    _phase_observer = observer
+
+
+class Lazy:
+    """延迟格式化：只有被 str() 时才调用 func(*args)"""
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("logger", "name", "start")
+
+    def __init__(self, logger: logging.Logger, name: str):
+        self.logger = logger
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        observer = _phase_observer
+        if observer is not None:
+            observer.enter(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        observer = _phase_observer
+        if observer is not None:
+            observer.exit(self.name, elapsed)
+        hook = _timing_hook
+        if hook is not None:
+            hook(self.name, elapsed)
+        self.logger.debug("阶段 %s 耗时 %.3f ms", self.name, elapsed * 1e3)
+        return False
+
+
+def phase(logger: logging.Logger, name: str):
+    """计时上下文：with phase(logger, "bbs04.sign"): ..."""
+    if _timing_hook is None and _phase_observer is None and not logger.isEnabledFor(logging.DEBUG):
+        return _NULL_PHASE
+    return _Phase(logger, name)